@@ -14,4 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from src.app import main
 
 if __name__ == "__main__":
+    # Needed for process pools in PyInstaller builds
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -107,10 +107,15 @@ class DuckPromptApp(QApplication):
         self.main_window.generate_tree_btn.clicked.connect(self.controller.generate_directory_tree)
         self.main_window.generate_all_btn.clicked.connect(self.controller.run_all_sequence)
         self.main_window.run_dmp_parser_btn.clicked.connect(self.controller.run_dmp_parser)
+        self.main_window.export_btn.clicked.connect(self.controller.export_prompt)
         
         # --- File tree ---
         # Connect the model's check state change signal to the controller
         self.main_window.checkable_proxy.file_check_state_changed.connect(self.controller.check_file)
+        self.main_window.tree_view.customContextMenuRequested.connect(self.controller.show_file_tree_context_menu)
+        self.main_window.file_filter_timer.timeout.connect(
+            lambda: self.controller.filter_file_tree(self.main_window.file_filter_edit.text())
+        )
 
         if hasattr(self.main_window, 'check_all_btn'): # Assuming a button exists for this
             self.main_window.check_all_btn.clicked.connect(lambda: self.controller.check_all_files(True))
@@ -123,6 +128,7 @@ class DuckPromptApp(QApplication):
         # --- Controller signals to UI ---
         self.controller.project_folder_changed.connect(self._update_project_folder)
         self.controller.prompt_built.connect(self._update_prompt_display)
+        self.controller.prompt_exported.connect(self._update_export_display)
         self.controller.tokens_calculated.connect(self._update_token_display)
         self.controller.status_message.connect(self.main_window.statusBar().showMessage)
         self.controller.error_occurred.connect(self._show_error_messagebox)
@@ -145,6 +151,15 @@ class DuckPromptApp(QApplication):
         if hasattr(self.main_window, 'prompt_output_tab'):
             self.main_window.prompt_output_tab.setPlainText(prompt)
     
+    def _update_export_display(self, export_info: dict):
+        """Show only the preview and location of an exported prompt"""
+        if hasattr(self.main_window, 'prompt_output_tab'):
+            paths = "\n".join(export_info.get('paths', []))
+            preview = export_info.get('preview', '')
+            if export_info.get('truncated'):
+                preview += f"\n\n... ({export_info.get('length', 0):,} characters total)"
+            self.main_window.prompt_output_tab.setPlainText(f"Exported to:\n{paths}\n\n{preview}")
+    
     def _update_token_display(self, token_info: dict):
         """Update token count display"""
         if hasattr(self.main_window, 'token_count_label'):
@@ -169,6 +184,7 @@ class DuckPromptApp(QApplication):
             
             # Populate the model
             self.main_window.cached_model.populate_from_cache(root_node)
+            self.main_window.checkable_proxy.load_line_ranges(root_node)
             logger.info("File tree model updated successfully.")
         except Exception as e:
             logger.error(f"Failed to update file tree model from dictionary: {e}", exc_info=True)
@@ -0,0 +1,62 @@
+"""Concurrent file reader atom - reads many files on a bounded thread pool"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrentFileReader:
+    """Reads files concurrently from async code without blocking the event loop"""
+
+    def __init__(self, max_workers: int = 16):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="file-reader"
+        )
+
+    async def read_files(
+        self,
+        file_paths: List[str],
+        read_fn: Callable[[str], str],
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Tuple[List[Optional[str]], Dict[str, str]]:
+        """Read files with read_fn on the pool.
+
+        Returns contents in the same order as file_paths (None for failures)
+        and a {path: error message} dict for the files that could not be read.
+        progress_callback(done, total, path) is called as each file finishes.
+        """
+        total = len(file_paths)
+        contents: List[Optional[str]] = [None] * total
+        failures: Dict[str, str] = {}
+        if not total:
+            return contents, failures
+
+        loop = asyncio.get_running_loop()
+
+        async def _read(index: int, file_path: str) -> Tuple[int, str]:
+            try:
+                contents[index] = await loop.run_in_executor(self._executor, read_fn, file_path)
+            except Exception as e:
+                failures[file_path] = str(e)
+                logger.error(f"Error reading file {file_path}: {e}")
+            return index, file_path
+
+        done = 0
+        for next_done in asyncio.as_completed([_read(i, p) for i, p in enumerate(file_paths)]):
+            _, file_path = await next_done
+            done += 1
+            if progress_callback:
+                try:
+                    progress_callback(done, total, file_path)
+                except Exception as e:
+                    logger.error(f"Error in read progress callback: {e}")
+
+        return contents, failures
+
+    def shutdown(self):
+        """Shut down the worker pool"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
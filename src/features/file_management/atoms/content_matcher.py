@@ -0,0 +1,103 @@
+"""Content matcher atom - finds literal or regex matches in files with line numbers"""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .encoding_detector import EncodingDetector, detect_bom
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE_LENGTH = 300
+BINARY_SNIFF_BYTES = 8192
+
+_detector = EncodingDetector()
+
+# ASCII letters that re.IGNORECASE also matches to non-ASCII characters:
+# i/I to U+0130 and U+0131, k/K to U+212A (Kelvin sign), s/S to U+017F
+_NON_ASCII_FOLDS = frozenset("iIkKsS")
+
+
+def compile_search_pattern(pattern: str, regex: bool = False, case_sensitive: bool = True) -> "re.Pattern":
+    """Compile a search pattern; raises re.error for invalid regexes"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(pattern if regex else re.escape(pattern), flags)
+
+
+def _byte_prefilter(pattern: str, regex: bool, case_sensitive: bool) -> Optional["re.Pattern"]:
+    """Bytes pattern that every matching file must contain, for ASCII literals only.
+
+    ASCII characters keep their byte values in every ASCII-compatible
+    encoding, so a file without the bytes cannot contain the text. A
+    case-insensitive literal containing a letter that folds to a non-ASCII
+    character (e.g. "k" and the Kelvin sign) gets no prefilter, since the
+    bytes search would miss files that only contain the non-ASCII form.
+    """
+    if regex or not pattern.isascii():
+        return None
+    if not case_sensitive and not _NON_ASCII_FOLDS.isdisjoint(pattern):
+        return None
+    return re.compile(re.escape(pattern.encode('ascii')), 0 if case_sensitive else re.IGNORECASE)
+
+
+def search_files(
+    paths: List[str],
+    pattern: str,
+    regex: bool = False,
+    case_sensitive: bool = True,
+    max_hits_per_file: int = 100
+) -> List[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+    """Search a batch of files; returns (path, hits, error) for files with hits or errors.
+
+    Module-level so batches can run in a process pool. Binary files are
+    skipped; each hit is {"line", "column", "text"} with 1-based numbers.
+    """
+    compiled = compile_search_pattern(pattern, regex, case_sensitive)
+    prefilter = _byte_prefilter(pattern, regex, case_sensitive)
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            bom_encoding, _ = detect_bom(data)
+            wide = bool(bom_encoding) and bom_encoding.startswith(('utf-16', 'utf-32'))
+            if not wide:
+                if b'\x00' in data[:BINARY_SNIFF_BYTES]:
+                    continue
+                if prefilter is not None and not prefilter.search(data):
+                    continue
+            text, _ = _detector.decode(data)
+        except (OSError, UnicodeDecodeError) as e:
+            results.append((path, [], str(e)))
+            continue
+
+        hits = _find_hits(compiled, text, max_hits_per_file)
+        if hits:
+            results.append((path, hits, None))
+    return results
+
+
+def _find_hits(compiled: "re.Pattern", text: str, limit: int) -> List[Dict[str, Any]]:
+    """Matches in text with line numbers, at most one hit per line"""
+    hits = []
+    line = 1
+    position = 0
+    last_line = 0
+    for match in compiled.finditer(text):
+        start = match.start()
+        line += text.count('\n', position, start)
+        position = start
+        if line == last_line:
+            continue
+        last_line = line
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', start)
+        if line_end == -1:
+            line_end = len(text)
+        hits.append({
+            "line": line,
+            "column": start - line_start + 1,
+            "text": text[line_start:line_end][:MAX_LINE_LENGTH].rstrip('\r')
+        })
+        if len(hits) >= limit:
+            break
+    return hits
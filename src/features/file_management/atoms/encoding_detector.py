@@ -0,0 +1,148 @@
+"""Encoding detector atom - decodes source files that are not plain UTF-8"""
+import codecs
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Checked longest first so a UTF-32 BOM is not taken for UTF-16
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# Tried in order when UTF-8 fails; euc-kr before its superset cp949 so
+# files that fit the narrower charset are reported as such
+FALLBACK_ENCODINGS = ('euc-kr', 'cp949', 'shift_jis', 'gb18030', 'cp1252')
+
+SAMPLE_SIZE = 64 * 1024
+
+
+def detect_bom(data: bytes) -> Tuple[Optional[str], int]:
+    """Return (encoding, BOM length) for a byte order mark, or (None, 0)"""
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            return encoding, len(bom)
+    return None, 0
+
+
+# Frequent Chinese characters (also common as Japanese kanji). Text decoded
+# with the wrong double-byte codec lands on these far less often.
+COMMON_HANZI = frozenset(
+    "的一是不了在人有我他这个们中来上大为和国地到以说时要就出会可也你对生能而子"
+    "那得于着下自之年过发后作里用道行所然家种事成方多经么去法学如都同现当没动面"
+    "起看定天分还进好小部其些主样理心她本前开但因只从想实日军者意无力它与长把机"
+    "十民第公此已工使情明性知全三又关点正业外将两高间由问很最重并物手应战向头文"
+    "体政美相见被利什二等产或新己制身果加西斯月话合回特代内信表化老给世位次度门"
+    "任常先海通教儿原东声提立及比员解水名真论处走义各入几口认条平系气题活尔更别"
+    "打女变四神总何电数安少报才结反受目太量再感建务做接必场件计管期市直德资命山"
+    "金指克许统区保至队形社便空决治展马科司五基眼书非则听白却界达光放强即像难且"
+    "权思王象完设式色路记南品住告类求据程北边死张该交规万取拉格望觉术领共确传师"
+    "观清今切院让识候带导争运笔码试编注释用户件值数组库类函"
+)
+
+
+def _is_common_hangul(ch: str) -> bool:
+    """Whether a Hangul syllable is one of the 2,350 in KS X 1001 (EUC-KR)"""
+    try:
+        # Python's codec writes other syllables as 8-byte jamo sequences
+        return len(ch.encode('euc-kr')) == 2
+    except UnicodeEncodeError:
+        return False
+
+
+def _char_weight(ch: str) -> float:
+    """How plausible a non-ASCII character is in real source text"""
+    code = ord(ch)
+    if 0xAC00 <= code <= 0xD7A3:
+        # CP949-only syllables are rare in real text but are what other
+        # double-byte encodings (e.g. Shift_JIS) turn into under cp949
+        return 1.0 if _is_common_hangul(ch) else 0.2
+    if 0x3040 <= code <= 0x30FF:
+        return 1.0
+    if 0x4E00 <= code <= 0x9FFF:
+        return 1.0 if ch in COMMON_HANZI else 0.1
+    if 0xC0 <= code <= 0xFF:
+        return 0.8
+    if 0x3000 <= code <= 0x303F or 0xFF00 <= code <= 0xFFEF:
+        return 0.5
+    if 0xA0 <= code <= 0x2FF or 0x2010 <= code <= 0x206F:
+        return 0.5
+    if code < 0x20 or 0x7F <= code < 0xA0 or 0xE000 <= code <= 0xF8FF:
+        # Control characters and private-use code points mean a wrong guess
+        return -1.0
+    return 0.0
+
+
+def _plausibility(text: str) -> float:
+    """Average plausibility of the non-ASCII characters in a decoded sample"""
+    total = 0.0
+    count = 0
+    for ch in text:
+        if ch < '\x80' and (ch >= ' ' or ch in '\t\n\r'):
+            continue
+        total += _char_weight(ch)
+        count += 1
+    return total / count if count else 1.0
+
+
+class EncodingDetector:
+    """Decodes bytes with a BOM check, a UTF-8 fast path and a statistical fallback.
+
+    The fallback only runs when UTF-8 decoding fails: each candidate that
+    decodes a sample strictly is scored by how plausible the resulting text
+    looks, and the best one decodes the whole file. A hint (the encoding
+    detected on an earlier read) skips the guessing when it still fits.
+    """
+
+    def decode(self, data: bytes, hint: Optional[str] = None) -> Tuple[str, str]:
+        """Return (text, encoding); raises UnicodeDecodeError if nothing fits"""
+        bom_encoding, bom_length = detect_bom(data)
+        if bom_encoding:
+            return data[bom_length:].decode(bom_encoding), bom_encoding
+
+        try:
+            return data.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError as e:
+            utf8_error = e
+
+        if hint and hint != 'utf-8':
+            try:
+                return data.decode(hint), hint
+            except (UnicodeDecodeError, LookupError):
+                pass
+
+        encoding = self.guess(data)
+        if encoding is None:
+            raise utf8_error
+        logger.debug(f"Decoded as {encoding} after UTF-8 failed")
+        try:
+            return data.decode(encoding), encoding
+        except UnicodeDecodeError:
+            # The guess came from a sample; widen EUC-KR to CP949 for the rest
+            if encoding == 'euc-kr':
+                try:
+                    return data.decode('cp949'), 'cp949'
+                except UnicodeDecodeError:
+                    pass
+            return data.decode(encoding, errors='replace'), encoding
+
+    def guess(self, data: bytes) -> Optional[str]:
+        """Pick the most plausible fallback encoding for non-UTF-8 bytes"""
+        sample = data[:SAMPLE_SIZE]
+        best_encoding = None
+        best_score = 0.0
+        for encoding in FALLBACK_ENCODINGS:
+            try:
+                # A sample cut inside a multi-byte character still decodes
+                text = codecs.getincrementaldecoder(encoding)().decode(sample, final=len(sample) == len(data))
+            except UnicodeDecodeError:
+                continue
+            score = _plausibility(text)
+            if score > best_score:
+                best_encoding, best_score = encoding, score
+        return best_encoding
@@ -1,5 +1,6 @@
 """File watcher atom - monitors file system changes"""
 import logging
+import os
 from pathlib import Path
 from typing import Optional, Callable, Set
 from watchdog.observers import Observer
@@ -17,7 +18,10 @@ class FileWatcherHandler(FileSystemEventHandler):
     
     def _should_ignore(self, event: FileSystemEvent) -> bool:
         """Check if event should be ignored"""
-        path_str = str(event.src_path)
+        return self.should_ignore_path(str(event.src_path))
+    
+    def should_ignore_path(self, path_str: str) -> bool:
+        """Check if events for a path would be ignored"""
         for pattern in self.ignore_patterns:
             if pattern in path_str:
                 return True
@@ -71,4 +75,11 @@ class FileWatcher:
     
     def is_watching(self) -> bool:
         """Check if watcher is active"""
-        return bool(self.observer and self.observer.is_alive())
\ No newline at end of file
+        return bool(self.observer and self.observer.is_alive())
+    
+    def covers(self, path: str) -> bool:
+        """Check if changes to an absolute path are reported by this watcher"""
+        if not self.is_watching() or not self.watch_path or not self.handler:
+            return False
+        root = str(self.watch_path).rstrip(os.sep) + os.sep
+        return path.startswith(root) and not self.handler.should_ignore_path(path)
\ No newline at end of file
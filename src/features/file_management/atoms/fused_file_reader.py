@@ -0,0 +1,116 @@
+"""Fused file reader atom - reads a file once and derives its metadata from the same buffer"""
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from .encoding_detector import EncodingDetector, detect_bom
+from .mapped_file_reader import MappedFileReader
+
+logger = logging.getLogger(__name__)
+
+
+class FileRecord:
+    """Metadata gathered while reading a file"""
+
+    def __init__(
+        self,
+        path: str,
+        mtime_ns: int,
+        size: int,
+        content_hash: str,
+        is_binary: bool,
+        encoding: Optional[str],
+        char_count: int,
+        line_count: int,
+        is_excerpt: bool = False
+    ):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.content_hash = content_hash
+        self.is_binary = is_binary
+        self.encoding = encoding
+        self.char_count = char_count
+        self.line_count = line_count
+        self.is_excerpt = is_excerpt
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        return {
+            "path": self.path,
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "hash": self.content_hash,
+            "is_binary": self.is_binary,
+            "encoding": self.encoding,
+            "char_count": self.char_count,
+            "line_count": self.line_count,
+            "is_excerpt": self.is_excerpt
+        }
+
+
+class FusedFileReader:
+    """Reads a file with a single read() and computes its size, hash, binary
+    flag and line count from that buffer before decoding it.
+
+    Binary files (containing NUL bytes without a UTF-16/32 byte order mark)
+    are recorded but not decoded. Text is decoded by the EncodingDetector.
+    Files larger than max_bytes are handed to the MappedFileReader and come
+    back as a head/tail excerpt.
+    """
+
+    def __init__(self):
+        self.encoding_detector = EncodingDetector()
+        self.mapped_reader = MappedFileReader(self.encoding_detector)
+
+    def read(
+        self,
+        file_path: str,
+        encoding_hint: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ) -> Tuple[Optional[str], FileRecord]:
+        """Return (text or None for binary files, record); raises OSError/UnicodeDecodeError"""
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if max_bytes and stat.st_size > max_bytes:
+                text, meta = self.mapped_reader.read_excerpt(f, max_bytes, encoding_hint)
+                return text, FileRecord(
+                    path=file_path,
+                    mtime_ns=stat.st_mtime_ns,
+                    size=meta["size"],
+                    content_hash=meta["hash"],
+                    is_binary=meta["is_binary"],
+                    encoding=meta["encoding"],
+                    char_count=len(text) if text is not None else 0,
+                    line_count=meta["line_count"],
+                    is_excerpt=text is not None
+                )
+            data = f.read()
+
+        bom_encoding, _ = detect_bom(data)
+        wide = bool(bom_encoding) and bom_encoding.startswith(('utf-16', 'utf-32'))
+        is_binary = not wide and b'\x00' in data
+        content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+        text = None
+        encoding = None
+        if not is_binary:
+            text, encoding = self.encoding_detector.decode(data, hint=encoding_hint)
+
+        # Newline bytes only mean line breaks in ASCII-compatible encodings
+        line_count = text.count('\n') if wide else data.count(b'\n')
+        if data and not (text.endswith('\n') if wide else data.endswith(b'\n')):
+            line_count += 1
+
+        record = FileRecord(
+            path=file_path,
+            mtime_ns=stat.st_mtime_ns,
+            size=len(data),
+            content_hash=content_hash,
+            is_binary=is_binary,
+            encoding=encoding,
+            char_count=len(text) if text is not None else 0,
+            line_count=line_count
+        )
+        return text, record
@@ -0,0 +1,77 @@
+"""Fuzzy matcher atom - scores file paths against a typed filter query"""
+import re
+from typing import Iterable, Optional
+
+# Characters after which a match starts a new "word" of the path
+_BOUNDARY_CHARS = '/_-. '
+
+
+def subsequence_pattern(term: str) -> "re.Pattern":
+    """Regex finding term's characters in order within a single line.
+
+    Searched over a newline-joined block of lowercased paths it finds
+    candidates in C instead of a Python loop per path. The first
+    character is a plain literal so the engine can skip ahead to it, and
+    each gap is a possessive "anything but the next character on this
+    line", so a failing attempt cannot backtrack.
+    """
+    escaped = [re.escape(char) for char in term]
+    return re.compile(escaped[0] + ''.join(f'[^\n{e}]*+{e}' for e in escaped[1:]))
+
+
+def score_term(term: str, path: str, name_start: int) -> Optional[float]:
+    """Score one lowercased term against a lowercased relative path, None if it does not match.
+
+    name_start is where the file name begins in path. Substring matches in
+    the file name beat substring matches elsewhere, which beat scattered
+    subsequence matches; within each tier shorter paths and matches at word
+    boundaries rank higher.
+    """
+    length_penalty = len(path) * 0.01
+    position = path.find(term, name_start)
+    if position != -1:
+        score = 100.0
+        if position == name_start:
+            score += 30.0
+        end = position + len(term)
+        if end == len(path) or path[end] == '.':
+            score += 10.0
+        return score - (len(path) - name_start) * 0.1 - length_penalty
+
+    position = path.find(term)
+    if position != -1:
+        score = 60.0
+        if position == 0 or path[position - 1] in _BOUNDARY_CHARS:
+            score += 10.0
+        return score - length_penalty
+
+    score = 20.0
+    previous = -2
+    index = 0
+    for char in term:
+        index = path.find(char, index)
+        if index == -1:
+            return None
+        if index == previous + 1:
+            score += 2.0
+        elif index == 0 or path[index - 1] in _BOUNDARY_CHARS:
+            score += 3.0
+        else:
+            score -= min(index - previous, 10) * 0.1
+        if index >= name_start:
+            score += 1.0
+        previous = index
+        index += 1
+    return score - length_penalty
+
+
+def score_path(terms: Iterable[str], path: str) -> Optional[float]:
+    """Sum of score_term over the query terms; every term must match"""
+    name_start = path.rfind('/') + 1
+    total = 0.0
+    for term in terms:
+        score = score_term(term, path, name_start)
+        if score is None:
+            return None
+        total += score
+    return total
@@ -0,0 +1,41 @@
+"""Import extractor atom - lists the modules a Python source imports"""
+import ast
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def extract_imports(source: str, module_name: str, is_package: bool = False) -> Optional[List[str]]:
+    """Absolute names of every module a source may import, or None if it does not parse.
+
+    Relative imports are resolved against module_name. For
+    "from pkg import name" both "pkg" and "pkg.name" are listed, since name
+    may be a submodule; callers keep whichever exist. Imports inside
+    functions and try blocks count too. Module-level so it can run in a
+    process pool.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    package_parts = module_name.split('.') if is_package else module_name.split('.')[:-1]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                if node.level - 1 > len(package_parts):
+                    continue
+                base_parts = package_parts[:len(package_parts) - (node.level - 1)]
+                base = '.'.join(base_parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ''
+            if base:
+                names.add(base)
+            for alias in node.names:
+                if alias.name != '*':
+                    names.add(f"{base}.{alias.name}" if base else alias.name)
+    return sorted(names)
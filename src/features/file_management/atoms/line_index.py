@@ -0,0 +1,88 @@
+"""Line index atom - line-range specs and block-level line offset tables"""
+import bisect
+import logging
+import mmap
+import os
+import re
+from array import array
+from typing import BinaryIO, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "path:120-480" (1-based, inclusive) or "path:120-" (to the end of the file)
+LINE_RANGE_PATTERN = re.compile(r"^(?P<path>.+):(?P<first>\d+)-(?P<last>\d*)$")
+
+
+def parse_line_range(spec: str) -> Optional[Tuple[str, int, Optional[int]]]:
+    """Split "path:first-last" into (path, first, last); None if spec has no line range"""
+    match = LINE_RANGE_PATTERN.match(spec)
+    if not match:
+        return None
+    first = int(match.group('first'))
+    last = int(match.group('last')) if match.group('last') else None
+    if first < 1 or (last is not None and last < first):
+        return None
+    return match.group('path'), first, last
+
+
+def format_line_range(path: str, first: int, last: Optional[int]) -> str:
+    """Inverse of parse_line_range"""
+    return f"{path}:{first}-{last if last is not None else ''}"
+
+
+class LineOffsetIndex:
+    """Newline counts at fixed byte-block boundaries of a file.
+
+    Building it only runs bytes.count over each block, so no line is
+    visited from Python. To find where a line starts, the block holding
+    the preceding newline is found by bisection and only that block is
+    searched. Valid for ASCII-compatible encodings, where a 0x0A byte is
+    always a newline.
+    """
+
+    def __init__(self, mtime_ns: int, size: int, block_size: int, newlines_before: array, line_count: int):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.block_size = block_size
+        self.newlines_before = newlines_before
+        self.line_count = line_count
+
+    @classmethod
+    def build(cls, f: BinaryIO, block_size: int = 64 * 1024) -> "LineOffsetIndex":
+        """Index an open binary file"""
+        stat = os.fstat(f.fileno())
+        newlines_before = array('Q', [0])
+        total = 0
+        last_byte = b''
+        if stat.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(0, stat.st_size, block_size):
+                    total += mm[offset:offset + block_size].count(b'\n')
+                    newlines_before.append(total)
+                last_byte = mm[stat.st_size - 1:stat.st_size]
+        # The last entry is the total; drop it so entries map to block starts
+        newlines_before.pop()
+        line_count = total + (1 if stat.st_size and last_byte != b'\n' else 0)
+        return cls(stat.st_mtime_ns, stat.st_size, block_size, newlines_before, line_count)
+
+    def line_start(self, f: BinaryIO, line: int) -> int:
+        """Byte offset where 0-based line starts (file size past the last line)"""
+        if line <= 0:
+            return 0
+        if line >= self.line_count:
+            return self.size
+
+        # Block containing the line-th newline
+        block = bisect.bisect_left(self.newlines_before, line) - 1
+        remaining = line - self.newlines_before[block]
+        block_offset = block * self.block_size
+        f.seek(block_offset)
+        data = f.read(self.block_size)
+        position = -1
+        for _ in range(remaining):
+            position = data.find(b'\n', position + 1)
+        return block_offset + position + 1
+
+    def byte_range(self, f: BinaryIO, first: int, end: int) -> Tuple[int, int]:
+        """Byte offsets covering 0-based lines [first, end)"""
+        return self.line_start(f, first), self.line_start(f, end)
@@ -0,0 +1,96 @@
+"""Mapped file reader atom - scans and excerpts large files through mmap"""
+import hashlib
+import logging
+import mmap
+import os
+from typing import Optional, Tuple
+
+from .encoding_detector import EncodingDetector, detect_bom
+
+logger = logging.getLogger(__name__)
+
+
+class MappedFileReader:
+    """Reads files larger than max_bytes without building the full str.
+
+    The binary check, hash and line count run over the mapped pages (line
+    counting in bounded chunks), and only a head and a tail slice, cut at
+    line boundaries, are copied and decoded. The omitted middle is replaced
+    by a marker line.
+    """
+
+    def __init__(self, encoding_detector: Optional[EncodingDetector] = None, chunk_size: int = 1024 * 1024):
+        self.encoding_detector = encoding_detector or EncodingDetector()
+        self.chunk_size = chunk_size
+
+    def read_excerpt(
+        self,
+        f,
+        max_bytes: int,
+        encoding_hint: Optional[str] = None
+    ) -> Tuple[Optional[str], dict]:
+        """Excerpt an open binary file; returns (text or None for binary files, metadata)"""
+        size = os.fstat(f.fileno()).st_size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bom_encoding, _ = detect_bom(mm[:4])
+            wide = bool(bom_encoding) and bom_encoding.startswith(('utf-16', 'utf-32'))
+            is_binary = not wide and mm.find(b'\x00') != -1
+
+            view = memoryview(mm)
+            try:
+                digest = hashlib.blake2b(view, digest_size=16).hexdigest()
+            finally:
+                view.release()
+
+            line_count = 0
+            for start in range(0, size, self.chunk_size):
+                line_count += mm[start:start + self.chunk_size].count(b'\n')
+            if size and mm[size - 1:size] != b'\n':
+                line_count += 1
+
+            meta = {
+                "size": size,
+                "hash": digest,
+                "is_binary": is_binary,
+                "line_count": line_count,
+                "encoding": None
+            }
+            if is_binary:
+                return None, meta
+
+            if wide:
+                # Newline bytes are not line breaks here; decode it all
+                text, meta["encoding"] = self.encoding_detector.decode(mm[:], hint=encoding_hint)
+                return text, meta
+
+            half = max_bytes // 2
+            head_end = mm.rfind(b'\n', 0, half) + 1 or self._char_boundary(mm, half)
+            tail_start = mm.find(b'\n', size - half) + 1 or self._char_boundary(mm, size - half)
+            head = mm[:head_end]
+            tail = mm[tail_start:]
+
+        head_text, encoding = self.encoding_detector.decode(head, hint=encoding_hint)
+        try:
+            tail_text = tail.decode(encoding)
+        except UnicodeDecodeError:
+            tail_text = tail.decode(encoding, errors='replace')
+
+        omitted = line_count - head.count(b'\n') - tail.count(b'\n')
+        if tail and not tail.endswith(b'\n'):
+            omitted -= 1
+        omitted_bytes = tail_start - head_end
+        marker = f"... [{omitted} lines, {omitted_bytes} bytes omitted] ...\n"
+        if not head_text.endswith('\n'):
+            marker = "\n" + marker
+
+        # The hash identifies the excerpt, not just the file
+        meta["hash"] = f"{digest}:{head_end}:{tail_start}"
+        meta["encoding"] = encoding
+        logger.debug(f"Excerpted large file: kept {head_end + size - tail_start} of {size} bytes")
+        return head_text + marker + tail_text, meta
+
+    def _char_boundary(self, mm: mmap.mmap, offset: int) -> int:
+        """Move an offset back off UTF-8 continuation bytes (for files without newlines)"""
+        while offset > 0 and (mm[offset] & 0xC0) == 0x80:
+            offset -= 1
+        return offset
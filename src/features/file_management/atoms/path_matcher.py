@@ -0,0 +1,124 @@
+"""Path matcher atom - compiles glob and regex sets into one matcher for relative paths"""
+import re
+from typing import Iterable, List, Optional, Tuple
+
+
+# Start of a path segment: the start of the path or just after a "/"
+_SEGMENT_START = '(?<![^/])'
+_SEGMENT_END = '(?:/|$)'
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore-style glob into a regex for POSIX relative paths.
+
+    "*" and "?" stay within one path segment and "**" spans segments. A
+    pattern without "/" matches a file or folder name at any depth; one
+    with "/" is anchored at the project root. A pattern that names a
+    folder also matches everything below it, so "tests" selects tests/**.
+    """
+    anchored, body = _translate_glob(pattern)
+    return f"{'^' if anchored else _SEGMENT_START}{body}{_SEGMENT_END}"
+
+
+def _translate_glob(pattern: str) -> Tuple[bool, str]:
+    """(anchored at the root, regex body) for a glob"""
+    pattern = pattern.strip().replace('\\', '/')
+    anchored = '/' in pattern.rstrip('/')
+    pattern = pattern.strip('/')
+
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body + ']')
+                i = end + 1
+                continue
+        else:
+            parts.append(re.escape(char))
+        i += 1
+
+    return anchored, ''.join(parts)
+
+
+def _combine_globs(patterns: List[str]) -> List[str]:
+    """At most two regexes for a glob set, sharing their anchors.
+
+    Factoring the anchors out of the alternation lets the engine test them
+    once per position instead of once per pattern.
+    """
+    anchored = []
+    floating = []
+    for pattern in patterns:
+        is_anchored, body = _translate_glob(pattern)
+        (anchored if is_anchored else floating).append(body)
+    sources = []
+    if anchored:
+        sources.append(f"^(?:{'|'.join(anchored)}){_SEGMENT_END}")
+    if floating:
+        sources.append(f"{_SEGMENT_START}(?:{'|'.join(floating)}){_SEGMENT_END}")
+    return sources
+
+
+def _combine(sources: List[str], case_sensitive: bool) -> Optional["re.Pattern"]:
+    """One alternation over every source regex, or None for an empty set"""
+    if not sources:
+        return None
+    if len(sources) == 1:
+        return re.compile(sources[0], 0 if case_sensitive else re.IGNORECASE)
+    return re.compile('|'.join(f'(?:{s})' for s in sources), 0 if case_sensitive else re.IGNORECASE)
+
+
+class PathMatcher:
+    """Include/exclude pattern sets compiled once into two regexes.
+
+    Each side's patterns are merged into a single alternation, so each
+    path costs at most two regex searches however many patterns were
+    given. A path is selected if it matches any include pattern (or there
+    are none) and no exclude pattern. Raises re.error for invalid regexes.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        regex: bool = False,
+        case_sensitive: bool = True
+    ):
+        translate = list if regex else _combine_globs
+        self.include = _combine(translate([p for p in include if p.strip()]), case_sensitive)
+        self.exclude = _combine(translate([p for p in exclude if p.strip()]), case_sensitive)
+
+    def matches(self, relative_path: str) -> bool:
+        """Whether a POSIX relative path is selected"""
+        if self.include is not None and not self.include.search(relative_path):
+            return False
+        return self.exclude is None or not self.exclude.search(relative_path)
+
+    def filter(self, relative_paths: Iterable[str]) -> List[str]:
+        """The selected paths, in their original order"""
+        include = self.include.search if self.include is not None else None
+        exclude = self.exclude.search if self.exclude is not None else None
+        return [
+            p for p in relative_paths
+            if (include is None or include(p)) and (exclude is None or not exclude(p))
+        ]
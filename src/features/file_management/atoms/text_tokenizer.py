@@ -0,0 +1,42 @@
+"""Text tokenizer atom - splits source text and prose into search terms"""
+import re
+from collections import Counter
+from typing import Iterable, List
+
+WORD_PATTERN = re.compile(r"[^\W\d_][\w]*|\d+")
+# Boundaries inside an identifier: lower->Upper, ACRONYMWord, letter<->digit
+CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+|[^\W\d_a-zA-Z]+")
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'if', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'this', 'to', 'with', 'self', 'none',
+    'true', 'false', 'return', 'def', 'class', 'import', 'var', 'let', 'const',
+})
+
+
+def split_identifier(identifier: str) -> List[str]:
+    """Lower-cased parts of a snake_case / camelCase identifier"""
+    parts = []
+    for chunk in identifier.split('_'):
+        if chunk:
+            parts.extend(p.lower() for p in CAMEL_PATTERN.findall(chunk))
+    return parts
+
+
+def tokenize(text: str) -> List[str]:
+    """Terms of a text: each word or identifier, plus its sub-words when it is compound"""
+    terms = []
+    for word in WORD_PATTERN.findall(text):
+        lowered = word.lower()
+        if len(lowered) > 1 and lowered not in STOPWORDS:
+            terms.append(lowered)
+        if '_' in word or not (word.islower() or word.isupper()):
+            terms.extend(p for p in split_identifier(word) if len(p) > 1 and p != lowered and p not in STOPWORDS)
+    return terms
+
+
+def term_frequencies(text: str, extra_terms: Iterable[str] = ()) -> Counter:
+    """Term counts of a text, with extra_terms (e.g. from the file path) added"""
+    counts = Counter(tokenize(text))
+    counts.update(extra_terms)
+    return counts
@@ -1,5 +1,5 @@
 """File management feature commands"""
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Tuple
 from pathlib import Path
 from src.gateway.bus._base import Command
 
@@ -33,6 +33,12 @@ class CheckFile(Command):
     checked: bool
 
 
+class SetLineRanges(Command):
+    """Command to select only some lines of a file (an empty list clears the selection)"""
+    file_path: str
+    ranges: List[Tuple[int, Optional[int]]]  # 1-based inclusive (first, last); last None = to the end
+
+
 class CheckAllFiles(Command):
     """Command to check all files"""
     checked: bool
@@ -46,6 +52,7 @@ class GetCheckedFiles(Command):
 class GetFileContent(Command):
     """Command to read file content"""
     file_path: str
+    trusted: bool = False  # Serve watched files from the cache without a stat (UI previews)
 
 
 class RefreshFileSystem(Command):
@@ -79,5 +86,58 @@ class GetDirectoryTree(Command):
 class GetFilteredFiles(Command):
     """Command to get files with filtering applied"""
     root_path: str
-    patterns: Optional[List[str]] = None
+    patterns: Optional[List[str]] = None  # Gitignore-style globs on paths relative to root_path
     exclude_patterns: Optional[List[str]] = None
+
+
+class GetFileCacheStats(Command):
+    """Command to get file content cache statistics"""
+    pass
+
+
+class ConfigurePrefetch(Command):
+    """Command to configure background prefetching of checked files"""
+    enabled: bool = True
+    count_tokens_model: Optional[str] = None  # Also warm token counts for this model
+    memory_budget_mb: Optional[int] = None
+
+
+class RankRelevantFiles(Command):
+    """Command to rank project files against a query and propose a selection"""
+    query: Optional[str] = None  # Defaults to the current user prompt
+    token_budget: Optional[int] = None  # Estimated tokens the proposed files may use
+    max_files: int = 30
+    check: bool = False  # Also check the proposed files
+
+
+class SearchContent(Command):
+    """Command to search file contents (hits are also streamed as events)"""
+    pattern: str
+    regex: bool = False
+    case_sensitive: bool = True
+    max_hits: int = 1000
+    file_paths: Optional[List[str]] = None  # Defaults to all scanned, non-ignored files
+    check_matches: bool = False  # Check every file with a hit
+
+
+class ExpandSelection(Command):
+    """Command to add the local imports (or importers) of checked Python files"""
+    direction: str = "imports"  # "imports", "importers" or "both"
+    max_depth: int = 2
+    token_budget: Optional[int] = None  # Estimated tokens the added files may use
+    check: bool = True  # Check the added files (False only reports them)
+
+
+class SearchFileNames(Command):
+    """Command to fuzzy-match scanned file paths (backs the tree filter box)"""
+    query: str
+    limit: int = 200
+
+
+class SelectFilesByPattern(Command):
+    """Command to check or uncheck every scanned file matching glob (or regex) sets"""
+    include: List[str] = []  # e.g. ["src/**/*.py"]; empty matches every file
+    exclude: List[str] = []  # e.g. ["tests", "test_*.py"]
+    regex: bool = False  # Treat the patterns as regexes on the relative path
+    case_sensitive: bool = True
+    action: str = "check"  # "check", "uncheck" or "replace"
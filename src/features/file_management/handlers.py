@@ -1,14 +1,18 @@
 """File management feature command handlers"""
 import logging
+import re
 from src.gateway.bus.file_management_command_bus import FileManagementCommandBus
 from src.gateway import EventBus, ServiceLocator
 from .commands import (
     SetProjectFolder, GetProjectFolder, ScanDirectory, GetFileTree,
     CheckFile, CheckAllFiles, GetCheckedFiles, GetFileContent,
     RefreshFileSystem, ApplyGitignoreFilter, StartFileWatcher,
-    StopFileWatcher, GetDirectoryTree, GetFilteredFiles
+    StopFileWatcher, GetDirectoryTree, GetFilteredFiles, GetFileCacheStats,
+    ConfigurePrefetch, SetLineRanges, RankRelevantFiles, SearchContent,
+    ExpandSelection, SearchFileNames, SelectFilesByPattern
 )
 from .organisms.file_system_service import FileSystemService
+from .atoms.path_matcher import PathMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -47,8 +51,11 @@ async def handle_scan_directory(cmd: ScanDirectory):
         include_hidden=cmd.include_hidden
     )
     
-    # Apply gitignore filter
-    filtered_files = service.gitignore_filter.filter_files(files)
+    # Gitignore patterns are relative to the project root when scanning inside it
+    root = Path(cmd.directory_path)
+    if service.project_folder and root.is_relative_to(service.project_folder):
+        root = service.project_folder
+    filtered_files = service.gitignore_filter.filter_files(files, root)
     
     return {
         "directory": cmd.directory_path,
@@ -78,6 +85,18 @@ async def handle_check_file(cmd: CheckFile):
     return {"file": cmd.file_path, "checked": cmd.checked}
 
 
+@FileManagementCommandBus.register(SetLineRanges)
+async def handle_set_line_ranges(cmd: SetLineRanges):
+    """Select line ranges of a file; they are read as "path:first-last" slices"""
+    service = ServiceLocator.get("file_system")
+    try:
+        ranges = service.set_line_ranges(cmd.file_path, cmd.ranges)
+        line_count = service.get_line_count(cmd.file_path)
+    except (ValueError, OSError) as e:
+        return {"success": False, "file": cmd.file_path, "error": str(e)}
+    return {"success": True, "file": cmd.file_path, "ranges": ranges, "line_count": line_count}
+
+
 @FileManagementCommandBus.register(CheckAllFiles)
 async def handle_check_all_files(cmd: CheckAllFiles):
     """Check or uncheck all files"""
@@ -100,7 +119,7 @@ async def handle_get_checked_files(cmd: GetCheckedFiles):
 async def handle_get_file_content(cmd: GetFileContent):
     """Read file content"""
     service = ServiceLocator.get("file_system")
-    content = service.get_file_content(cmd.file_path)
+    content = service.get_file_content(cmd.file_path, trusted=cmd.trusted)
     
     return {
         "file": cmd.file_path,
@@ -182,26 +201,138 @@ async def handle_get_filtered_files(cmd: GetFilteredFiles):
     service = ServiceLocator.get("file_system")
     from pathlib import Path
     
-    # Scan directory
-    files = service.scanner.scan_directory(
-        Path(cmd.root_path),
-        recursive=True,
-        exclude_patterns=set(cmd.exclude_patterns or [])
-    )
-    
-    # Apply patterns if provided
-    if cmd.patterns:
-        import fnmatch
-        filtered = []
-        for file_path in files:
-            for pattern in cmd.patterns:
-                if fnmatch.fnmatch(str(file_path), pattern):
-                    filtered.append(file_path)
-                    break
-        files = filtered
+    root = Path(cmd.root_path)
+    try:
+        if service.project_folder and root == service.project_folder:
+            # The project is already scanned; match against the in-memory index
+            files = service.match_files(cmd.patterns, cmd.exclude_patterns)
+        else:
+            matcher = PathMatcher(cmd.patterns or [], cmd.exclude_patterns or [])
+            by_relative = {
+                f.relative_to(root).as_posix(): f
+                for f in service.scanner.scan_directory(root, recursive=True)
+            }
+            files = [by_relative[r] for r in matcher.filter(by_relative)]
+    except re.error as e:
+        return {"root": cmd.root_path, "error": f"Invalid pattern: {e}", "files": [], "count": 0}
     
     return {
         "root": cmd.root_path,
         "files": [str(f) for f in files],
         "count": len(files)
     }
+
+
+@FileManagementCommandBus.register(GetFileCacheStats)
+async def handle_get_file_cache_stats(cmd: GetFileCacheStats):
+    """Get file content cache statistics"""
+    service = ServiceLocator.get("file_system")
+    stats = service.content_cache.get_stats()
+    stats["scan_index"] = service.scan_index.get_stats()
+    stats["line_index"] = service.slice_reader.get_stats()
+    stats["filename_index"] = service.filename_index.get_stats()
+    stats["prefetch"] = service.prefetcher.get_stats()
+    return stats
+
+
+@FileManagementCommandBus.register(ConfigurePrefetch)
+async def handle_configure_prefetch(cmd: ConfigurePrefetch):
+    """Configure background prefetching"""
+    service = ServiceLocator.get("file_system")
+    service.configure_prefetch(
+        enabled=cmd.enabled,
+        token_model=cmd.count_tokens_model,
+        memory_budget=cmd.memory_budget_mb * 1024 * 1024 if cmd.memory_budget_mb else None
+    )
+    return {
+        "enabled": cmd.enabled,
+        "count_tokens_model": cmd.count_tokens_model,
+        "memory_budget": service.prefetcher.memory_budget
+    }
+
+
+@FileManagementCommandBus.register(RankRelevantFiles)
+async def handle_rank_relevant_files(cmd: RankRelevantFiles):
+    """Rank files by BM25 relevance and propose a checked set within a token budget"""
+    service = ServiceLocator.get("file_system")
+    
+    query = cmd.query
+    if query is None:
+        query = ServiceLocator.get("prompt_builder").get_user_prompt()
+    if not query.strip():
+        return {"success": False, "error": "Empty query", "ranked": [], "proposed": []}
+    
+    result = service.rank_relevant_files(query, token_budget=cmd.token_budget, max_files=cmd.max_files)
+    if cmd.check:
+        service.check_files(result["proposed"], True)
+    return {"success": True, **result}
+
+
+@FileManagementCommandBus.register(SearchContent)
+async def handle_search_content(cmd: SearchContent):
+    """Search file contents with a literal or regex pattern"""
+    service = ServiceLocator.get("file_system")
+    try:
+        result = await service.search_content(
+            cmd.pattern,
+            regex=cmd.regex,
+            case_sensitive=cmd.case_sensitive,
+            max_hits=cmd.max_hits,
+            file_paths=cmd.file_paths,
+            check_matches=cmd.check_matches
+        )
+    except re.error as e:
+        return {"success": False, "error": f"Invalid pattern: {e}", "matches": []}
+    
+    return {
+        "success": True,
+        "matches": [{"path": path, "hits": hits} for path, hits in result["matches"].items()],
+        "hit_count": result["hit_count"],
+        "files_searched": result["files_searched"],
+        "truncated": result["truncated"],
+        "errors": result["errors"]
+    }
+
+
+@FileManagementCommandBus.register(ExpandSelection)
+async def handle_expand_selection(cmd: ExpandSelection):
+    """Expand the checked Python files along the import graph"""
+    if cmd.direction not in ("imports", "importers", "both"):
+        return {"success": False, "error": f"Invalid direction: {cmd.direction}", "added": []}
+    
+    service = ServiceLocator.get("file_system")
+    result = await service.expand_selection(
+        direction=cmd.direction,
+        max_depth=cmd.max_depth,
+        token_budget=cmd.token_budget,
+        check=cmd.check
+    )
+    return {"success": True, **result}
+
+
+@FileManagementCommandBus.register(SearchFileNames)
+async def handle_search_file_names(cmd: SearchFileNames):
+    """Fuzzy-match file names for the tree filter box"""
+    service = ServiceLocator.get("file_system")
+    matches = service.search_file_names(cmd.query, limit=cmd.limit)
+    return {"success": True, "query": cmd.query, "matches": matches}
+
+
+@FileManagementCommandBus.register(SelectFilesByPattern)
+async def handle_select_files_by_pattern(cmd: SelectFilesByPattern):
+    """Check or uncheck every file matching the pattern sets"""
+    if cmd.action not in ("check", "uncheck", "replace"):
+        return {"success": False, "error": f"Invalid action: {cmd.action}", "matched": []}
+    
+    service = ServiceLocator.get("file_system")
+    try:
+        result = service.select_by_patterns(
+            include=cmd.include,
+            exclude=cmd.exclude,
+            regex=cmd.regex,
+            case_sensitive=cmd.case_sensitive,
+            action=cmd.action
+        )
+    except re.error as e:
+        return {"success": False, "error": f"Invalid pattern: {e}", "matched": []}
+    return {"success": True, **result}
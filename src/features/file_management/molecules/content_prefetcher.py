@@ -0,0 +1,102 @@
+"""Content prefetcher molecule - warms file contents in the background"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ContentPrefetcher:
+    """Loads checked files ahead of a build on a small background pool.
+
+    load_fn reads (and caches) a file; on_loaded(path, content) is an
+    optional hook for follow-up work such as token counting. Prefetching
+    stops while resident_bytes() plus the next file would exceed the
+    memory budget, so it never evicts content a build is about to use.
+    A single worker keeps it from competing with foreground reads.
+    """
+
+    def __init__(
+        self,
+        load_fn: Callable[[str], str],
+        resident_bytes: Callable[[], int],
+        on_loaded: Optional[Callable[[str, str], None]] = None,
+        memory_budget: int = 128 * 1024 * 1024,
+        max_workers: int = 1
+    ):
+        self.load_fn = load_fn
+        self.resident_bytes = resident_bytes
+        self.on_loaded = on_loaded
+        self.memory_budget = memory_budget
+        self.enabled = True
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="prefetch"
+        )
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self.stats: Dict[str, int] = {"loaded": 0, "skipped": 0, "failed": 0}
+
+    def prefetch(self, paths: Iterable[str]) -> int:
+        """Queue files for background loading; returns the number queued"""
+        if not self.enabled:
+            return 0
+
+        with self._lock:
+            new_paths = [p for p in paths if p not in self._pending]
+            self._pending.update(new_paths)
+
+        for path in new_paths:
+            self._executor.submit(self._run, path)
+        return len(new_paths)
+
+    def discard(self, paths: Iterable[str]):
+        """Drop queued files that are no longer wanted"""
+        with self._lock:
+            self._pending.difference_update(paths)
+
+    def cancel(self):
+        """Drop every queued file"""
+        with self._lock:
+            self._pending.clear()
+
+    def pending_count(self) -> int:
+        """Number of files still queued"""
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters and queue length, read under the lock the worker updates them with"""
+        with self._lock:
+            return {**self.stats, "pending": len(self._pending)}
+
+    def _count(self, name: str):
+        """Bump one stats counter"""
+        with self._lock:
+            self.stats[name] += 1
+
+    def _run(self, path: str):
+        """Load one queued file unless it was discarded or over budget"""
+        with self._lock:
+            if path not in self._pending:
+                return
+
+        try:
+            size = os.path.getsize(path)
+            if self.resident_bytes() + size > self.memory_budget:
+                self._count("skipped")
+                return
+
+            content = self.load_fn(path)
+            self._count("loaded")
+            if self.on_loaded:
+                self.on_loaded(path, content)
+        except Exception as e:
+            self._count("failed")
+            logger.debug(f"Prefetch failed for {path}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(path)
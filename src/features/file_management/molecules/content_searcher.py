@@ -0,0 +1,109 @@
+"""Content searcher molecule - searches many files on a process pool and streams hits"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..atoms.content_matcher import search_files
+
+logger = logging.getLogger(__name__)
+
+
+class ContentSearcher:
+    """Runs content searches over a file list.
+
+    Files are searched in batches on a process pool (started on first use)
+    so regex matching uses every core; small file lists are searched on a
+    thread instead. on_hits(path, hits, searched, total) is called as each
+    file with hits comes back, so callers can stream results. Remaining
+    batches are cancelled once max_hits is reached.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, batch_size: int = 64, inline_threshold: int = 64):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.inline_threshold = inline_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    async def search(
+        self,
+        paths: List[str],
+        pattern: str,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        max_hits: int = 1000,
+        on_hits: Optional[Callable[[str, List[Dict[str, Any]], int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """Search paths and return {"matches", "hit_count", "files_searched", "errors", "truncated"}"""
+        total = len(paths)
+        batches = [paths[i:i + self.batch_size] for i in range(0, total, self.batch_size)]
+        per_file = max(1, min(max_hits, 100))
+
+        matches: Dict[str, List[Dict[str, Any]]] = {}
+        errors: Dict[str, str] = {}
+        hit_count = 0
+        searched = 0
+        truncated = False
+
+        loop = asyncio.get_running_loop()
+        # A few files are cheaper to search on a thread than to ship to the pool
+        pool = None if total <= self.inline_threshold else self._get_pool()
+        if pool is None:
+            batches = [paths]
+        pending = []
+        sizes = {}
+        for batch in batches:
+            future = loop.run_in_executor(pool, search_files, batch, pattern, regex, case_sensitive, per_file)
+            sizes[id(future)] = len(batch)
+            pending.append(future)
+
+        remaining = set(pending)
+        try:
+            while remaining and not truncated:
+                done, remaining = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    searched += sizes[id(future)]
+                    for path, hits, error in future.result():
+                        if error:
+                            errors[path] = error
+                            continue
+                        hits = hits[:max_hits - hit_count]
+                        matches[path] = hits
+                        hit_count += len(hits)
+                        if on_hits:
+                            try:
+                                on_hits(path, hits, searched, total)
+                            except Exception as e:
+                                logger.error(f"Error in search hit callback: {e}")
+                        if hit_count >= max_hits:
+                            truncated = True
+                            break
+                    if truncated:
+                        break
+        finally:
+            for future in remaining:
+                future.cancel()
+
+        return {
+            "matches": matches,
+            "hit_count": hit_count,
+            "files_searched": searched,
+            "errors": errors,
+            "truncated": truncated
+        }
+
+    def shutdown(self):
+        """Shut down the process pool"""
+        with self._pool_lock:
+            if self._pool:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Process pool, created on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
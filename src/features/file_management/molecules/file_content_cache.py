@@ -0,0 +1,89 @@
+"""File content cache molecule - memory-bounded LRU cache of decoded file contents"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FileContentCache:
+    """LRU cache of file contents keyed by (path, mtime_ns, size).
+
+    Entries are only returned when the caller's stat result matches the one
+    recorded at read time, or through get_trusted() when a file watcher
+    guarantees that changed files are invalidated. The cache is capped by
+    the total byte size of the cached files.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, mtime_ns: int, size: int) -> Optional[str]:
+        """Return cached content if it was read at the given mtime and size"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == mtime_ns and entry[1] == size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def get_trusted(self, path: str) -> Optional[str]:
+        """Return cached content without validation (caller guarantees freshness)"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            return None
+
+    def put(self, path: str, mtime_ns: int, size: int, content: str):
+        """Store content read at the given mtime and size"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old:
+                self.total_bytes -= old[1]
+            self._entries[path] = (mtime_ns, size, content)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def invalidate(self, path: str, recursive: bool = False):
+        """Drop the entry for a path, or every entry under it if recursive"""
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry:
+                self.total_bytes -= entry[1]
+            if recursive:
+                prefix = path.rstrip(os.sep) + os.sep
+                for key in [k for k in self._entries if k.startswith(prefix)]:
+                    self.total_bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
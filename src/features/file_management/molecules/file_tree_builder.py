@@ -1,7 +1,9 @@
 """File tree builder molecule - builds hierarchical file structures"""
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from ..atoms.line_index import format_line_range
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,7 @@ class FileTreeNode:
         self.is_dir = is_dir
         self.children: List[FileTreeNode] = []
         self.checked = False
+        self.line_ranges: List[Tuple[int, Optional[int]]] = []
         self.parent: Optional[FileTreeNode] = None
     
     def add_child(self, child: 'FileTreeNode'):
@@ -29,6 +32,7 @@ class FileTreeNode:
             'name': self.name,
             'is_dir': self.is_dir,
             'checked': self.checked,
+            'line_ranges': [list(r) for r in self.line_ranges],
             'children': [child.to_dict() for child in self.children]
         }
 
@@ -40,6 +44,8 @@ class FileTreeBuilder:
         self.root_node: Optional[FileTreeNode] = None
         self.path_to_node: Dict[str, FileTreeNode] = {}
         self.checked_paths: Set[str] = set()
+        # Partial selections of files that are not checked as a whole
+        self.line_ranges: Dict[str, List[Tuple[int, Optional[int]]]] = {}
     
     def build_tree(self, root_path: Path, file_paths: List[Path]) -> FileTreeNode:
         """Build a file tree from a list of file paths"""
@@ -96,6 +102,16 @@ class FileTreeBuilder:
         if file_path in self.path_to_node:
             self.path_to_node[file_path].checked = checked
     
+    def set_line_ranges(self, file_path: str, ranges: List[Tuple[int, Optional[int]]]):
+        """Replace the selected line ranges of a file (an empty list clears them)"""
+        if ranges:
+            self.line_ranges[file_path] = list(ranges)
+        else:
+            self.line_ranges.pop(file_path, None)
+        
+        if file_path in self.path_to_node:
+            self.path_to_node[file_path].line_ranges = list(ranges)
+    
     def check_all(self, checked: bool):
         """Check or uncheck all files"""
         if checked:
@@ -105,20 +121,33 @@ class FileTreeBuilder:
                     self.checked_paths.add(path_str)
                     node.checked = True
         else:
-            # Clear all checked paths
+            # Clear all checked paths and partial selections
             self.checked_paths.clear()
+            self.line_ranges.clear()
             for node in self.path_to_node.values():
                 node.checked = False
+                node.line_ranges = []
     
     def get_checked_paths(self) -> List[str]:
-        """Get list of all checked paths (files and directories)."""
-        return sorted(list(self.checked_paths))
+        """Get list of all checked paths (files and directories).
+        
+        Line ranges of files not checked as a whole are included as
+        "path:first-last" specs.
+        """
+        paths = set(self.checked_paths)
+        for file_path, ranges in self.line_ranges.items():
+            if file_path not in self.checked_paths:
+                paths.update(format_line_range(file_path, first, last) for first, last in ranges)
+        return sorted(paths)
     
     def _apply_checked_states(self):
         """Apply checked states to nodes"""
         for path_str in self.checked_paths:
             if path_str in self.path_to_node:
                 self.path_to_node[path_str].checked = True
+        for path_str, ranges in self.line_ranges.items():
+            if path_str in self.path_to_node:
+                self.path_to_node[path_str].line_ranges = list(ranges)
     
     def generate_tree_text(self, node: Optional[FileTreeNode] = None, prefix: str = "", is_last: bool = True) -> str:
         """Generate text representation of the tree"""
@@ -135,6 +164,8 @@ class FileTreeBuilder:
             line += "/"
         if node.checked:
             line += " ✓"
+        elif node.line_ranges:
+            line += " [" + ", ".join(f"{first}-{last or ''}" for first, last in node.line_ranges) + "]"
         
         lines = [line]
         
@@ -0,0 +1,131 @@
+"""Filename index molecule - fuzzy search over the project's relative file paths"""
+import heapq
+import logging
+import os
+import sys
+import threading
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..atoms.fuzzy_matcher import score_path, subsequence_pattern
+
+logger = logging.getLogger(__name__)
+
+
+class FilenameIndex:
+    """Relative paths of every scanned file, ready for as-you-type filtering.
+
+    Paths are interned POSIX-style strings kept in scan order, so a
+    rescan only adds and drops the difference. Lowercased paths are joined
+    into one newline-separated block, rebuilt with each changing sync, that
+    the longest query term scans with a single compiled regex; only the
+    lines it hits are scored in Python. Scanning stops after
+    max_candidates matches so one-letter queries on huge trees stay fast.
+    """
+
+    def __init__(self, max_candidates: int = 2000):
+        self.max_candidates = max_candidates
+        self.root: Optional[Path] = None
+
+        self._paths: Dict[str, str] = {}  # relative path -> lowercased relative path
+        self._order: List[str] = []
+        self._block = ""
+        self._starts: List[int] = []
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    def sync(self, root: Path, paths: Iterable[Path]):
+        """Bring the index in line with a fresh scan of root"""
+        root = Path(root)
+        prefix = os.path.join(str(root), '')
+        cut = len(prefix)
+        relative = []
+        for path in paths:
+            path = str(path)
+            if path.startswith(prefix):
+                relative.append(path[cut:].replace(os.sep, '/'))
+
+        with self._lock:
+            if root != self.root:
+                self.root = root
+                self._paths.clear()
+            current = set(relative)
+            removed = [p for p in self._paths if p not in current]
+            for path in removed:
+                del self._paths[path]
+            added = 0
+            for path in relative:
+                if path not in self._paths:
+                    path = sys.intern(path)
+                    self._paths[path] = sys.intern(path.lower())
+                    added += 1
+            if added or removed:
+                self._dirty = True
+                self._rebuild_block()
+        if added or removed:
+            logger.debug(f"Filename index synced: +{added} -{len(removed)} ({len(self._paths)} paths)")
+
+    def clear(self):
+        """Forget every path"""
+        with self._lock:
+            self.root = None
+            self._paths.clear()
+            self._dirty = True
+
+    def relative_paths(self) -> List[str]:
+        """Every indexed relative path, in scan order"""
+        with self._lock:
+            return list(self._paths)
+
+    def search(self, query: str, limit: int = 200) -> List[Tuple[str, float]]:
+        """(relative path, score) pairs matching every whitespace-separated term, best first"""
+        terms = query.lower().replace('\\', '/').split()
+        if not terms:
+            return []
+
+        with self._lock:
+            self._rebuild_block()
+            block, starts, order = self._block, self._starts, self._order
+        if not order:
+            return []
+
+        # The longest term filters hardest; the others are checked while scoring
+        pattern = subsequence_pattern(max(terms, key=len))
+        scored = []
+        position = 0
+        while len(scored) < self.max_candidates:
+            match = pattern.search(block, position)
+            if match is None:
+                break
+            line = bisect_right(starts, match.start()) - 1
+            end = block.find('\n', match.end())
+            if end == -1:
+                end = len(block)
+            score = score_path(terms, block[starts[line]:end])
+            if score is not None:
+                scored.append((score, order[line]))
+            position = end + 1
+
+        best = heapq.nlargest(limit, scored, key=lambda item: (item[0], -len(item[1])))
+        return [(path, score) for score, path in best]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        with self._lock:
+            return {
+                "paths": len(self._paths),
+                "block_chars": len(self._block),
+                "dirty": self._dirty
+            }
+
+    def _rebuild_block(self):
+        """Re-join the lowercased paths after a change; caller holds the lock"""
+        if not self._dirty:
+            return
+        self._order = list(self._paths)
+        lowered = [self._paths[p] for p in self._order]
+        self._block = '\n'.join(lowered)
+        self._starts = [0, *accumulate(len(p) + 1 for p in lowered[:-1])] if lowered else []
+        self._dirty = False
@@ -0,0 +1,274 @@
+"""Import graph molecule - cached, incrementally updated Python import graph"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..atoms.import_extractor import extract_imports
+
+logger = logging.getLogger(__name__)
+
+# Layout directories whose contents are imported without the directory name
+SOURCE_ROOTS = ('src', 'lib')
+
+
+class ImportGraph:
+    """Local import edges between the Python files of a project.
+
+    Parsing runs in a process pool (started on first use), or inline for a
+    handful of files. Parse results are cached by content hash and module
+    name, so an edited file is re-parsed only if its bytes changed. Changed
+    paths are only marked dirty; the graph catches up on the next refresh,
+    which touches nothing but the dirty files.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, inline_threshold: int = 8, max_entries: int = 16384):
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        self.max_entries = max_entries
+        self.root: Optional[Path] = None
+
+        self._modules: Dict[str, str] = {}  # module name -> path
+        self._files: Dict[str, Tuple[str, List[str]]] = {}  # path -> (content hash, imported names)
+        self._imports: Dict[str, Set[str]] = {}  # path -> local paths it imports
+        self._importers: Dict[str, Set[str]] = {}  # path -> local paths importing it
+        self._parsed: "OrderedDict[Tuple[str, str], Optional[List[str]]]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._built = False
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def reset(self, root: Optional[Path]):
+        """Forget the graph (the parse cache is kept) and use a new project root"""
+        with self._lock:
+            self.root = Path(root) if root else None
+            self._modules.clear()
+            self._files.clear()
+            self._imports.clear()
+            self._importers.clear()
+            self._dirty.clear()
+            self._built = False
+
+    def mark_dirty(self, path: str):
+        """Note a changed, added or removed path for the next refresh"""
+        if path.endswith(('.py', '.pyi')) or not os.path.splitext(path)[1]:
+            with self._lock:
+                self._dirty.add(path)
+
+    async def refresh(self, all_files: Callable[[], Iterable[str]]):
+        """Build the graph on first use, afterwards re-read only dirty paths"""
+        with self._lock:
+            built = self._built
+            dirty = set(self._dirty)
+            self._dirty.clear()
+
+        if not built:
+            paths = [p for p in all_files() if p.endswith(('.py', '.pyi'))]
+            for path in paths:
+                self._register_module(path)
+            await self._update_files(paths)
+            with self._lock:
+                self._built = True
+            logger.info(f"Import graph built: {len(self._files)} modules")
+            return
+
+        if not dirty:
+            return
+        changed = []
+        scanned: Optional[List[str]] = None
+        for path in dirty:
+            if os.path.isfile(path):
+                self._register_module(path)
+                changed.append(path)
+            elif os.path.isdir(path):
+                # A directory event (e.g. a file saved inside it) must not
+                # drop its modules; pick up new files and drop vanished ones
+                if scanned is None:
+                    scanned = [p for p in all_files() if p.endswith(('.py', '.pyi'))]
+                changed.extend(self._rescan_directory(path, scanned))
+            elif not os.path.exists(path):
+                self._drop(path)
+        await self._update_files(changed)
+        # Added or removed modules can change how other files' imports resolve
+        self._relink_all()
+
+    def expand(
+        self,
+        seeds: Iterable[str],
+        direction: str = "imports",
+        max_depth: int = 2,
+        token_budget: Optional[int] = None,
+        token_fn: Optional[Callable[[str], int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Files reachable from seeds, breadth first, that are not seeds themselves.
+
+        direction is "imports", "importers" or "both". Files are taken in
+        BFS order while they fit token_budget (measured with token_fn).
+        """
+        with self._lock:
+            seeds = [s for s in seeds if s in self._files]
+            seen = set(seeds)
+            frontier = list(seeds)
+            added = []
+            used = 0
+            for depth in range(1, max_depth + 1):
+                next_frontier = []
+                for path in frontier:
+                    neighbours = set()
+                    if direction in ("imports", "both"):
+                        neighbours |= self._imports.get(path, set())
+                    if direction in ("importers", "both"):
+                        neighbours |= self._importers.get(path, set())
+                    for neighbour in sorted(neighbours - seen):
+                        seen.add(neighbour)
+                        tokens = token_fn(neighbour) if token_fn else 0
+                        if token_budget is not None and used + tokens > token_budget:
+                            continue
+                        used += tokens
+                        added.append({"path": neighbour, "depth": depth, "via": path, "estimated_tokens": tokens})
+                        next_frontier.append(neighbour)
+                frontier = next_frontier
+                if not frontier:
+                    break
+        return added
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get graph statistics"""
+        with self._lock:
+            return {
+                "modules": len(self._files),
+                "edges": sum(len(v) for v in self._imports.values()),
+                "parse_cache": len(self._parsed),
+                "dirty": len(self._dirty),
+                "built": self._built
+            }
+
+    def shutdown(self):
+        """Shut down the process pool"""
+        with self._pool_lock:
+            if self._pool:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    async def _update_files(self, paths: List[str]):
+        """Hash files, parse the ones not in the parse cache and relink them"""
+        jobs = {}
+        entries = {}
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                logger.debug(f"Could not read {path} for the import graph: {e}")
+                continue
+            module, is_package = self._module_name(path)
+            key = (hashlib.blake2b(data, digest_size=16).hexdigest(), module)
+            entries[path] = key
+            with self._lock:
+                cached = key in self._parsed
+            if not cached and key not in jobs:
+                jobs[key] = (data.decode('utf-8', errors='replace'), module, is_package)
+
+        if jobs:
+            keys = list(jobs)
+            if len(keys) <= self.inline_threshold:
+                results = [extract_imports(*jobs[k]) for k in keys]
+            else:
+                loop = asyncio.get_running_loop()
+                pool = self._get_pool()
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(pool, extract_imports, *jobs[k]) for k in keys)
+                )
+            with self._lock:
+                for key, names in zip(keys, results):
+                    self._parsed[key] = names
+                while len(self._parsed) > self.max_entries:
+                    self._parsed.popitem(last=False)
+
+        with self._lock:
+            for path, key in entries.items():
+                names = self._parsed.get(key) or []
+                self._files[path] = (key[0], names)
+                self._link(path)
+
+    def _relink_all(self):
+        """Recompute every file's local edges from its cached import names"""
+        with self._lock:
+            self._imports.clear()
+            self._importers.clear()
+            for path in self._files:
+                self._link(path)
+
+    def _link(self, path: str):
+        """Resolve a file's imported names to local files; caller holds the lock"""
+        for target in self._imports.pop(path, set()):
+            self._importers.get(target, set()).discard(path)
+        targets = set()
+        for name in self._files[path][1]:
+            target = self._modules.get(name)
+            if target and target != path:
+                targets.add(target)
+        self._imports[path] = targets
+        for target in targets:
+            self._importers.setdefault(target, set()).add(path)
+
+    def _drop(self, path: str):
+        """Remove a deleted file (or everything under a deleted directory)"""
+        prefix = path.rstrip(os.sep) + os.sep
+        with self._lock:
+            gone = [p for p in self._files if p == path or p.startswith(prefix)]
+            for p in gone:
+                del self._files[p]
+                for target in self._imports.pop(p, set()):
+                    self._importers.get(target, set()).discard(p)
+            for name in [n for n, p in self._modules.items() if p == path or p.startswith(prefix)]:
+                del self._modules[name]
+
+    def _rescan_directory(self, path: str, scanned: List[str]) -> List[str]:
+        """Register scanned files under a directory the graph does not know yet and drop vanished ones"""
+        prefix = path.rstrip(os.sep) + os.sep
+        with self._lock:
+            known = [p for p in self._files if p.startswith(prefix)]
+        for gone in [p for p in known if not os.path.exists(p)]:
+            self._drop(gone)
+        known_set = set(known)
+        new = [p for p in scanned if p.startswith(prefix) and p not in known_set]
+        for new_path in new:
+            self._register_module(new_path)
+        return new
+
+    def _register_module(self, path: str):
+        """Map every dotted name a file can be imported as to its path"""
+        module, _ = self._module_name(path)
+        if not module:
+            return
+        with self._lock:
+            self._modules[module] = path
+            first, _, rest = module.partition('.')
+            if first in SOURCE_ROOTS and rest:
+                self._modules.setdefault(rest, path)
+
+    def _module_name(self, path: str) -> Tuple[str, bool]:
+        """Dotted module name of a file relative to the project root, and whether it is a package"""
+        try:
+            relative = Path(path).relative_to(self.root) if self.root else Path(path)
+        except ValueError:
+            relative = Path(path)
+        parts = list(relative.with_suffix('').parts)
+        is_package = bool(parts) and parts[-1] == '__init__'
+        if is_package:
+            parts = parts[:-1]
+        return '.'.join(parts), is_package
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Process pool, created on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
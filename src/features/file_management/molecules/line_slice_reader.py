@@ -0,0 +1,101 @@
+"""Line slice reader molecule - reads line ranges of files through cached line indexes"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..atoms.encoding_detector import EncodingDetector, detect_bom
+from ..atoms.line_index import LineOffsetIndex
+
+logger = logging.getLogger(__name__)
+
+
+class LineSliceReader:
+    """Reads "path:first-last" slices without decoding the whole file.
+
+    A LineOffsetIndex is kept per file (LRU, validated against mtime and
+    size), so a slice costs one bisection, one block search per end and a
+    single seek+read of the slice bytes. UTF-16/32 files, where newline
+    bytes cannot be found reliably, are decoded in full instead.
+    """
+
+    def __init__(self, encoding_detector: Optional[EncodingDetector] = None, max_indexes: int = 256):
+        self.encoding_detector = encoding_detector or EncodingDetector()
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, LineOffsetIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "builds": 0, "slices": 0}
+
+    def read_slice(
+        self,
+        path: str,
+        first_line: int,
+        last_line: Optional[int],
+        encoding_hint: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """Read 1-based inclusive lines first_line..last_line (None = to the end).
+
+        Returns (text, total line count of the file). Raises OSError on read errors.
+        """
+        with open(path, 'rb') as f:
+            bom_encoding, _ = detect_bom(f.read(4))
+            if bom_encoding and bom_encoding.startswith(('utf-16', 'utf-32')):
+                f.seek(0)
+                text, _ = self.encoding_detector.decode(f.read(), encoding_hint)
+                lines = text.splitlines(keepends=True)
+                end = len(lines) if last_line is None else min(last_line, len(lines))
+                return "".join(lines[first_line - 1:end]), len(lines)
+
+            index = self._get_index(path, f)
+            end = index.line_count if last_line is None else min(last_line, index.line_count)
+            start_byte, end_byte = index.byte_range(f, first_line - 1, end)
+            f.seek(start_byte)
+            data = f.read(max(0, end_byte - start_byte))
+
+        text, _ = self.encoding_detector.decode(data, encoding_hint)
+        with self._lock:
+            self.stats["slices"] += 1
+        return text, index.line_count
+
+    def line_count(self, path: str) -> int:
+        """Number of lines in a file, from its (cached) index"""
+        with open(path, 'rb') as f:
+            return self._get_index(path, f).line_count
+
+    def invalidate(self, path: str, recursive: bool = False):
+        """Drop the index for a path, or every index under it if recursive"""
+        with self._lock:
+            self._indexes.pop(path, None)
+            if recursive:
+                prefix = path.rstrip(os.sep) + os.sep
+                for key in [k for k in self._indexes if k.startswith(prefix)]:
+                    del self._indexes[key]
+
+    def clear(self):
+        """Drop all indexes"""
+        with self._lock:
+            self._indexes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reader statistics"""
+        with self._lock:
+            return {**self.stats, "indexes": len(self._indexes)}
+
+    def _get_index(self, path: str, f) -> LineOffsetIndex:
+        """Cached index for an open file, rebuilt if the file changed"""
+        stat = os.fstat(f.fileno())
+        with self._lock:
+            index = self._indexes.get(path)
+            if index and index.mtime_ns == stat.st_mtime_ns and index.size == stat.st_size:
+                self._indexes.move_to_end(path)
+                self.stats["hits"] += 1
+                return index
+
+        index = LineOffsetIndex.build(f)
+        with self._lock:
+            self._indexes[path] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+            self.stats["builds"] += 1
+        return index
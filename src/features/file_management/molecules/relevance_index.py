@@ -0,0 +1,166 @@
+"""Relevance index molecule - BM25 inverted index over project files"""
+import logging
+import math
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..atoms.text_tokenizer import term_frequencies, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Terms from a file's path count this many times, so names weigh more than bodies
+PATH_TERM_WEIGHT = 3
+
+
+class RelevanceIndex:
+    """Ranks files against a free-text query with Okapi BM25.
+
+    Each file's term counts are kept so it can be removed again, which makes
+    updates incremental: a changed file is removed and re-added, nothing
+    else is touched. Builds and updates run on a single background worker
+    so they never compete with foreground reads; queries can run at any
+    time and see whatever has been indexed so far.
+    """
+
+    def __init__(
+        self,
+        load_fn: Callable[[str], Optional[str]],
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.load_fn = load_fn
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="relevance-index")
+        self._generation = 0
+        self.building = False
+        self.stats: Dict[str, int] = {"indexed": 0, "removed": 0, "failed": 0}
+
+    def schedule_build(self, paths: Iterable[str]):
+        """Replace the index with the given files, in the background"""
+        paths = list(paths)
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self.building = True
+        self._executor.submit(self._build, generation, paths)
+
+    def schedule_update(self, path: str):
+        """Re-index one file (or drop it if it can no longer be read), in the background"""
+        self._executor.submit(self._update, path)
+
+    def schedule_remove(self, path: str, recursive: bool = False):
+        """Drop a file, or everything under a directory, in the background"""
+        self._executor.submit(self._remove_paths, path, recursive)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(path, score) pairs for files matching the query, best first"""
+        terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count or not terms:
+                return []
+            average_length = self._total_length / doc_count
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for path, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[path] / average_length)
+                    scores[path] = scores.get(path, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        with self._lock:
+            return {
+                **self.stats,
+                "files": len(self._doc_lengths),
+                "terms": len(self._postings),
+                "building": self.building
+            }
+
+    def shutdown(self):
+        """Stop the background worker"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _build(self, generation: int, paths: List[str]):
+        """Index every path; abandoned if a newer build was scheduled"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0
+        for path in paths:
+            if self._generation != generation:
+                return
+            self._update(path)
+        with self._lock:
+            if self._generation == generation:
+                self.building = False
+        logger.info(f"Relevance index built: {len(self._doc_lengths)} files, {len(self._postings)} terms")
+
+    def _update(self, path: str):
+        """Read and (re-)index one file"""
+        try:
+            text = self.load_fn(path)
+        except Exception as e:
+            logger.debug(f"Could not index {path}: {e}")
+            text = None
+            with self._lock:
+                self.stats["failed"] += 1
+
+        # Tokenize before taking the lock so queries are not held up by it
+        terms = None
+        length = 0
+        if text is not None:
+            terms = term_frequencies(text, tokenize(os.path.basename(path)) * PATH_TERM_WEIGHT)
+            length = sum(terms.values())
+
+        with self._lock:
+            self._remove(path)
+            if terms is None:
+                return
+            self._doc_terms[path] = terms
+            self._doc_lengths[path] = length
+            self._total_length += length
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[path] = tf
+            self.stats["indexed"] += 1
+
+    def _remove_paths(self, path: str, recursive: bool):
+        """Drop a path (and everything under it if recursive)"""
+        with self._lock:
+            self._remove(path)
+            if recursive:
+                prefix = path.rstrip(os.sep) + os.sep
+                for key in [k for k in self._doc_terms if k.startswith(prefix)]:
+                    self._remove(key)
+
+    def _remove(self, path: str):
+        """Drop one file's postings; caller holds the lock"""
+        terms = self._doc_terms.pop(path, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(path, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(path, 0)
+        self.stats["removed"] += 1
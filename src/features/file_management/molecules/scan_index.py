@@ -0,0 +1,64 @@
+"""Scan index molecule - per-file metadata recorded by the fused read pipeline"""
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from ..atoms.fused_file_reader import FileRecord
+
+logger = logging.getLogger(__name__)
+
+
+class ScanIndex:
+    """FileRecords keyed by absolute path.
+
+    Records are written once per read and reused by the validator, the
+    formatter and the token cache so none of them has to rescan a file.
+    Invalidation mirrors FileContentCache.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, FileRecord] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[FileRecord]:
+        """Return the last record for a path"""
+        with self._lock:
+            return self._records.get(path)
+
+    def get_valid(self, path: str, mtime_ns: int, size: int) -> Optional[FileRecord]:
+        """Return the record if it was taken at the given mtime and size"""
+        with self._lock:
+            record = self._records.get(path)
+        if record and record.mtime_ns == mtime_ns and record.size == size:
+            return record
+        return None
+
+    def put(self, record: FileRecord):
+        """Store a record"""
+        with self._lock:
+            self._records[record.path] = record
+
+    def invalidate(self, path: str, recursive: bool = False):
+        """Drop the record for a path, or every record under it if recursive"""
+        with self._lock:
+            self._records.pop(path, None)
+            if recursive:
+                prefix = path.rstrip(os.sep) + os.sep
+                for key in [k for k in self._records if k.startswith(prefix)]:
+                    del self._records[key]
+
+    def clear(self):
+        """Drop all records"""
+        with self._lock:
+            self._records.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        with self._lock:
+            records = list(self._records.values())
+        return {
+            "files": len(records),
+            "binary_files": sum(1 for r in records if r.is_binary),
+            "total_bytes": sum(r.size for r in records)
+        }
@@ -1,14 +1,28 @@
 """File system service organism - manages all file operations"""
 import logging
+import os
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Callable, Tuple
 from watchdog.events import FileSystemEvent
 
 from src.gateway import EventBus, Event, ServiceLocator
 from ..atoms.file_scanner import FileScanner
+from ..atoms.concurrent_file_reader import ConcurrentFileReader
+from ..atoms.fused_file_reader import FusedFileReader, FileRecord
 from ..atoms.file_watcher import FileWatcher
+from ..atoms.line_index import parse_line_range
+from ..atoms.content_matcher import compile_search_pattern
+from ..atoms.path_matcher import PathMatcher
 from ..molecules.file_tree_builder import FileTreeBuilder, FileTreeNode
 from ..molecules.gitignore_filter import GitignoreFilter
+from ..molecules.file_content_cache import FileContentCache
+from ..molecules.content_prefetcher import ContentPrefetcher
+from ..molecules.scan_index import ScanIndex
+from ..molecules.line_slice_reader import LineSliceReader
+from ..molecules.relevance_index import RelevanceIndex
+from ..molecules.content_searcher import ContentSearcher
+from ..molecules.import_graph import ImportGraph
+from ..molecules.filename_index import FilenameIndex
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +42,31 @@ class ProjectFolderChangedEvent(Event):
         self.new_path = new_path
 
 
+class FileReadProgressEvent(Event):
+    """Event emitted as files are loaded by read_files"""
+    def __init__(self, done: int, total: int, path: str):
+        self.done = done
+        self.total = total
+        self.path = path
+
+
+class FileSelectionChangedEvent(Event):
+    """Event emitted when the service checks or unchecks files in bulk"""
+    def __init__(self, paths: Optional[List[str]], checked: bool):
+        self.paths = paths  # None means every file
+        self.checked = checked
+
+
+class ContentSearchHitsEvent(Event):
+    """Event emitted for each file with hits while a content search runs"""
+    def __init__(self, pattern: str, path: str, hits: List[Dict[str, Any]], searched: int, total: int):
+        self.pattern = pattern
+        self.path = path
+        self.hits = hits
+        self.searched = searched
+        self.total = total
+
+
 class FileSystemService:
     """High-level file system service"""
     
@@ -36,6 +75,29 @@ class FileSystemService:
         self.watcher = FileWatcher()
         self.tree_builder = FileTreeBuilder()
         self.gitignore_filter = GitignoreFilter()
+        self.reader = ConcurrentFileReader()
+        self.file_reader = FusedFileReader()
+        self.content_cache = FileContentCache()
+        self.scan_index = ScanIndex()
+        self.slice_reader = LineSliceReader(self.file_reader.encoding_detector)
+        self.prefetcher = ContentPrefetcher(
+            load_fn=lambda path: self._read_file(path, trusted=True),
+            resident_bytes=lambda: self.content_cache.total_bytes,
+            on_loaded=self._on_prefetched
+        )
+        # Model to warm token counts for while prefetching (None disables)
+        self.prefetch_token_model: Optional[str] = None
+        # Opt-in: files larger than this are read through mmap as a head/tail
+        # excerpt (None reads every file in full)
+        self.max_content_bytes: Optional[int] = None
+        # Relevance index over the project, built in the background (only the
+        # head and tail of files over max_index_bytes are indexed)
+        self.relevance_index = RelevanceIndex(load_fn=self._load_for_index)
+        self.relevance_index_enabled = True
+        self.max_index_bytes = 1024 * 1024
+        self.content_searcher = ContentSearcher()
+        self.import_graph = ImportGraph()
+        self.filename_index = FilenameIndex()
         
         self.project_folder: Optional[Path] = None
         self.file_cache: List[Path] = []
@@ -73,6 +135,11 @@ class FileSystemService:
         # Clear cache
         self.file_cache.clear()
         self.tree_cache = None
+        # Changes made while no watcher was running would go unnoticed
+        self.content_cache.clear()
+        self.scan_index.clear()
+        self.slice_reader.clear()
+        self.import_graph.reset(new_path)
         
         # Emit event
         EventBus.emit(ProjectFolderChangedEvent(old_path=old_path, new_path=str(new_path)))
@@ -82,6 +149,8 @@ class FileSystemService:
         
         # Scan the new folder
         self.refresh_file_system()
+        if self.relevance_index_enabled:
+            self.relevance_index.schedule_build(str(p) for p in self.file_cache)
         
         logger.info(f"Project folder set to: {new_path}")
         return True
@@ -108,6 +177,7 @@ class FileSystemService:
             self.file_cache,
             self.project_folder
         )
+        self.filename_index.sync(self.project_folder, self.file_cache)
         
         # Rebuild tree
         self.tree_cache = self.tree_builder.build_tree(
@@ -130,41 +200,269 @@ class FileSystemService:
         """Check or uncheck a file"""
         self.tree_builder.check_file(file_path, checked)
         
+        # Start loading newly checked files before the user builds
+        if checked:
+            self.prefetcher.prefetch(self._files_under(file_path))
+        else:
+            self.prefetcher.discard(self._files_under(file_path))
+        
         # Update tree cache if it exists
         if self.tree_cache:
             node = self.tree_builder.path_to_node.get(file_path)
             if node:
                 node.checked = checked
     
+    def set_line_ranges(self, file_path: str, ranges: List[Tuple[int, Optional[int]]]) -> List[Tuple[int, Optional[int]]]:
+        """Select only some lines of a file; overlapping ranges are merged.
+        
+        Ranges are 1-based and inclusive, with None as "to the end of the file".
+        Returns the ranges as stored.
+        """
+        merged: List[Tuple[int, Optional[int]]] = []
+        for first, last in sorted(ranges, key=lambda r: r[0]):
+            if first < 1 or (last is not None and last < first):
+                raise ValueError(f"Invalid line range: {first}-{last}")
+            if merged:
+                prev_first, prev_last = merged[-1]
+                if prev_last is None or first <= prev_last + 1:
+                    merged[-1] = (prev_first, None if prev_last is None or last is None else max(prev_last, last))
+                    continue
+            merged.append((first, last))
+        
+        self.tree_builder.set_line_ranges(file_path, merged)
+        if self.tree_cache:
+            node = self.tree_builder.path_to_node.get(file_path)
+            if node:
+                node.line_ranges = list(merged)
+        return merged
+    
+    def get_line_count(self, file_path: str) -> int:
+        """Number of lines in a file, from its cached line index"""
+        return self.slice_reader.line_count(os.path.abspath(file_path))
+    
     def check_all_files(self, checked: bool):
         """Check or uncheck all files"""
         self.tree_builder.check_all(checked)
         
+        if checked:
+            self.prefetcher.prefetch(str(p) for p in self.file_cache)
+        else:
+            self.prefetcher.cancel()
+        
         # Update tree cache if it exists
         if self.tree_cache:
             for node in self.tree_builder.path_to_node.values():
                 if not node.is_dir:
                     node.checked = checked
+        
+        EventBus.emit(FileSelectionChangedEvent(paths=None, checked=checked))
+    
+    def check_files(self, file_paths: List[str], checked: bool):
+        """Check or uncheck many files at once, with a single prefetch request"""
+        for file_path in file_paths:
+            self.tree_builder.check_file(file_path, checked)
+        
+        if checked:
+            self.prefetcher.prefetch(file_paths)
+        else:
+            self.prefetcher.discard(file_paths)
+        
+        if self.tree_cache:
+            for file_path in file_paths:
+                node = self.tree_builder.path_to_node.get(file_path)
+                if node:
+                    node.checked = checked
+        
+        EventBus.emit(FileSelectionChangedEvent(paths=list(file_paths), checked=checked))
+    
+    def match_files(
+        self,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        regex: bool = False,
+        case_sensitive: bool = True
+    ) -> List[str]:
+        """Scanned files whose project-relative path matches the pattern sets.
+        
+        Globs (or regexes) are compiled once and run against the in-memory
+        filename index; the disk is not rescanned. Raises re.error for
+        invalid regexes.
+        """
+        if not self.project_folder:
+            return []
+        if not self.file_cache:
+            self.refresh_file_system()
+        
+        matcher = PathMatcher(include or [], exclude or [], regex=regex, case_sensitive=case_sensitive)
+        root = str(self.project_folder)
+        return [
+            os.path.join(root, relative.replace('/', os.sep))
+            for relative in matcher.filter(self.filename_index.relative_paths())
+        ]
+    
+    def select_by_patterns(
+        self,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        action: str = "check"
+    ) -> Dict[str, Any]:
+        """Apply a pattern match to the selection.
+        
+        action is "check" (add to the selection), "uncheck" (remove from it)
+        or "replace" (clear the selection, including line ranges, first).
+        """
+        paths = self.match_files(include, exclude, regex=regex, case_sensitive=case_sensitive)
+        if action == "replace":
+            self.check_all_files(False)
+        self.check_files(paths, action != "uncheck")
+        
+        logger.info(f"Pattern selection ({action}) matched {len(paths)} files")
+        return {"matched": paths, "count": len(paths), "checked_total": len(self.tree_builder.checked_paths)}
     
     def get_checked_paths(self) -> List[str]:
         """Get list of checked file and directory paths"""
         return self.tree_builder.get_checked_paths()
     
-    def get_file_content(self, file_path: str) -> Optional[str]:
-        """Read file content"""
-        path = Path(file_path)
-        
-        if not path.exists() or not path.is_file():
+    def get_file_content(self, file_path: str, trusted: bool = False) -> Optional[str]:
+        """Read file content (trusted skips the stat for watched files; for previews only)"""
+        try:
+            return self._read_file(file_path, trusted=trusted)
+        except FileNotFoundError:
             logger.error(f"File not found: {file_path}")
             return None
-        
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
             return None
     
+    async def read_files(
+        self,
+        file_paths: List[str],
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Any]:
+        """Read many files concurrently, preserving order and reporting failures"""
+        def on_progress(done: int, total: int, path: str):
+            EventBus.emit(FileReadProgressEvent(done=done, total=total, path=path))
+            if progress_callback:
+                progress_callback(done, total, path)
+        
+        contents, failures = await self.reader.read_files(file_paths, self._read_file, on_progress)
+        files = []
+        for path, content in zip(file_paths, contents):
+            if content is None:
+                continue
+            file_info = {"path": path, "content": content}
+            # Metadata from the read pass, so consumers need not rescan content
+            record = self.scan_index.get(os.path.abspath(path))
+            if record:
+                file_info.update(
+                    hash=record.content_hash,
+                    is_binary=record.is_binary,
+                    size=record.size,
+                    encoding=record.encoding,
+                    is_excerpt=record.is_excerpt
+                )
+            files.append(file_info)
+        return {"files": files, "failures": failures}
+    
+    def get_file_record(self, file_path: str) -> Optional[FileRecord]:
+        """Metadata recorded the last time a file was read"""
+        return self.scan_index.get(os.path.abspath(file_path))
+    
+    def _read_file(self, file_path: str, trusted: bool = False) -> str:
+        """Read a file as text through the content cache; raises on failure.
+        
+        Cache misses go through the fused reader, which records size, hash,
+        binary flag, line count and detected encoding in the scan index
+        from the same read. Cache hits are validated against a fresh stat
+        unless trusted is set, which only prefetching and UI previews use:
+        a write is not seen until the watcher has handled its event.
+        """
+        key = os.path.abspath(file_path)
+        
+        line_range = parse_line_range(file_path)
+        if line_range and not os.path.exists(key):
+            return self._read_slice(*line_range)
+        
+        # Entries under an active watcher are invalidated by its events,
+        # so they can be served without touching the disk at all
+        if trusted and self.watcher.covers(key):
+            content = self.content_cache.get_trusted(key)
+            if content is not None:
+                return content
+        
+        stat = os.stat(key)
+        content = self.content_cache.get(key, stat.st_mtime_ns, stat.st_size)
+        if content is not None:
+            return content
+        
+        # Reuse the encoding detected on an earlier read of this file
+        previous = self.scan_index.get(key)
+        content, record = self.file_reader.read(
+            key,
+            encoding_hint=previous.encoding if previous else None,
+            max_bytes=self.max_content_bytes
+        )
+        self.scan_index.put(record)
+        if content is None:
+            raise ValueError(f"Binary file: {file_path}")
+        self.content_cache.put(key, record.mtime_ns, record.size, content)
+        return content
+    
+    def _read_slice(self, file_path: str, first_line: int, last_line: Optional[int]) -> str:
+        """Read a line range of a file with a seek through its line index"""
+        key = os.path.abspath(file_path)
+        record = self.scan_index.get(key)
+        if record and record.is_binary:
+            raise ValueError(f"Binary file: {file_path}")
+        content, _ = self.slice_reader.read_slice(
+            key, first_line, last_line, encoding_hint=record.encoding if record else None
+        )
+        return content
+    
+    def configure_prefetch(
+        self,
+        enabled: bool = True,
+        token_model: Optional[str] = None,
+        memory_budget: Optional[int] = None
+    ):
+        """Configure background prefetching of checked files"""
+        self.prefetcher.enabled = enabled
+        if not enabled:
+            self.prefetcher.cancel()
+        self.prefetch_token_model = token_model
+        if memory_budget is not None:
+            self.prefetcher.memory_budget = memory_budget
+    
+    def _on_prefetched(self, file_path: str, content: str):
+        """Warm the token count for a prefetched file if configured"""
+        if not self.prefetch_token_model:
+            return
+        try:
+            token_service = ServiceLocator.get("tokens")
+            record = self.scan_index.get(os.path.abspath(file_path))
+            token_service.count_content_tokens(
+                file_path, content, self.prefetch_token_model,
+                content_hash=record.content_hash if record else None
+            )
+        except Exception as e:
+            logger.debug(f"Could not prefetch token count for {file_path}: {e}")
+    
+    def _files_under(self, path: str) -> List[str]:
+        """Scanned files at or below a path"""
+        prefix = path.rstrip(os.sep) + os.sep
+        return [
+            str(p) for p in self.file_cache
+            if str(p) == path or str(p).startswith(prefix)
+        ]
+    
+    def invalidate_content(self, path: str, recursive: bool = False):
+        """Drop cached content for a path (and everything under it if recursive)"""
+        self.content_cache.invalidate(os.path.abspath(path), recursive=recursive)
+        self.scan_index.invalidate(os.path.abspath(path), recursive=recursive)
+        self.slice_reader.invalidate(os.path.abspath(path), recursive=recursive)
+    
     def generate_directory_tree(self, include_files: bool = True, max_depth: Optional[int] = None) -> str:
         """Generate directory tree text for all files."""
         if not self.tree_cache:
@@ -184,7 +482,15 @@ class FileSystemService:
             return "(No items checked)"
 
         temp_tree_builder = FileTreeBuilder()
-        checked_path_objects = [Path(p) for p in checked_paths]
+        checked_path_objects = []
+        for p in checked_paths:
+            line_range = parse_line_range(p)
+            if line_range and not os.path.exists(p):
+                path, first, last = line_range
+                temp_tree_builder.line_ranges.setdefault(path, []).append((first, last))
+                checked_path_objects.append(Path(path))
+            else:
+                checked_path_objects.append(Path(p))
         
         temp_root_node = temp_tree_builder.build_tree(self.project_folder, checked_path_objects)
         
@@ -199,6 +505,21 @@ class FileSystemService:
             """Handle file system change"""
             logger.debug(f"File system event: {event.event_type} - {event.src_path}")
             
+            # Invalidate cached contents before anyone can read them again
+            self.invalidate_content(event.src_path, recursive=event.is_directory)
+            dest_path = getattr(event, 'dest_path', None)
+            if dest_path:
+                self.invalidate_content(dest_path, recursive=event.is_directory)
+            
+            self.import_graph.mark_dirty(event.src_path)
+            if dest_path:
+                self.import_graph.mark_dirty(dest_path)
+            
+            if self.relevance_index_enabled:
+                self._update_relevance_index(event.src_path, event.is_directory)
+                if dest_path:
+                    self._update_relevance_index(dest_path, event.is_directory)
+            
             # Emit event
             EventBus.emit(FileSystemChangedEvent(
                 event_type=event.event_type,
@@ -217,6 +538,162 @@ class FileSystemService:
         except Exception as e:
             logger.error(f"Failed to start file watcher: {e}")
     
+    def _update_relevance_index(self, path: str, is_directory: bool):
+        """Bring the relevance index up to date for a changed path"""
+        if is_directory:
+            if not os.path.isdir(path):
+                self.relevance_index.schedule_remove(path, recursive=True)
+            return
+        if os.path.isfile(path) and self.gitignore_filter.filter_files([Path(path)], self.project_folder):
+            self.relevance_index.schedule_update(path)
+        else:
+            self.relevance_index.schedule_remove(path)
+    
+    def _load_for_index(self, file_path: str) -> Optional[str]:
+        """Text to index for a file (None for binaries), recording its metadata"""
+        text, record = self.file_reader.read(os.path.abspath(file_path), max_bytes=self.max_index_bytes)
+        if not record.is_excerpt:
+            self.scan_index.put(record)
+        return text
+    
+    def rank_relevant_files(
+        self,
+        query: str,
+        token_budget: Optional[int] = None,
+        max_files: int = 30,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """Rank indexed files against a query and propose a selection within a token budget.
+        
+        Token counts are estimated from the recorded character counts
+        (~4 characters per token).
+        """
+        ranked = []
+        for path, score in self.relevance_index.search(query, limit=limit):
+            record = self.scan_index.get(os.path.abspath(path))
+            if record and record.is_binary:
+                continue
+            ranked.append({"path": path, "score": round(score, 4), "estimated_tokens": self._estimated_tokens(path)})
+        
+        proposed = []
+        used = 0
+        for entry in ranked:
+            if len(proposed) >= max_files:
+                break
+            if token_budget is not None and used + entry["estimated_tokens"] > token_budget:
+                continue
+            proposed.append(entry["path"])
+            used += entry["estimated_tokens"]
+        
+        return {
+            "ranked": ranked,
+            "proposed": proposed,
+            "proposed_tokens": used,
+            "index": self.relevance_index.get_stats()
+        }
+    
+    def search_file_names(self, query: str, limit: int = 200) -> List[Dict[str, Any]]:
+        """Fuzzy-match scanned file paths against a filter query, best first"""
+        if not self.project_folder:
+            return []
+        return [
+            {"path": str(self.project_folder / relative), "relative": relative, "score": round(score, 2)}
+            for relative, score in self.filename_index.search(query, limit=limit)
+        ]
+    
+    async def search_content(
+        self,
+        pattern: str,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        max_hits: int = 1000,
+        file_paths: Optional[List[str]] = None,
+        check_matches: bool = False
+    ) -> Dict[str, Any]:
+        """Search the scanned (non-ignored) files for a literal or regex pattern.
+        
+        Hits are streamed as ContentSearchHitsEvents while the search runs.
+        Files the scan index knows to be binary are not searched at all.
+        With check_matches every matching file is checked. Raises re.error
+        for an invalid regex.
+        """
+        compile_search_pattern(pattern, regex, case_sensitive)
+        if file_paths is None:
+            if not self.file_cache:
+                self.refresh_file_system()
+            file_paths = [str(p) for p in self.file_cache]
+        
+        candidates = []
+        for path in file_paths:
+            record = self.scan_index.get(os.path.abspath(path))
+            if not (record and record.is_binary):
+                candidates.append(path)
+        
+        def on_hits(path: str, hits: List[Dict[str, Any]], searched: int, total: int):
+            EventBus.emit(ContentSearchHitsEvent(
+                pattern=pattern, path=path, hits=hits, searched=searched, total=total
+            ))
+        
+        result = await self.content_searcher.search(
+            candidates, pattern, regex=regex, case_sensitive=case_sensitive,
+            max_hits=max_hits, on_hits=on_hits
+        )
+        
+        if check_matches:
+            self.check_files(result["matches"], True)
+        
+        logger.info(
+            f"Content search for {pattern!r}: {result['hit_count']} hits in "
+            f"{len(result['matches'])} of {len(candidates)} files"
+        )
+        return result
+    
+    async def expand_selection(
+        self,
+        direction: str = "imports",
+        max_depth: int = 2,
+        token_budget: Optional[int] = None,
+        check: bool = True
+    ) -> Dict[str, Any]:
+        """Add the local modules that checked Python files import (or are imported by).
+        
+        direction is "imports", "importers" or "both". The import graph is
+        built on first use and afterwards only re-reads files changed since.
+        Token counts are estimated (~4 characters per token).
+        """
+        if not self.file_cache:
+            self.refresh_file_system()
+        await self.import_graph.refresh(lambda: (str(p) for p in self.file_cache))
+        
+        seeds = [p for p in self.get_checked_paths() if p.endswith(('.py', '.pyi'))]
+        added = self.import_graph.expand(
+            seeds,
+            direction=direction,
+            max_depth=max_depth,
+            token_budget=token_budget,
+            token_fn=self._estimated_tokens
+        )
+        if check:
+            self.check_files([entry["path"] for entry in added], True)
+        
+        logger.info(f"Expanded selection of {len(seeds)} files by {len(added)} {direction}")
+        return {
+            "seeds": seeds,
+            "added": added,
+            "added_tokens": sum(entry["estimated_tokens"] for entry in added),
+            "graph": self.import_graph.get_stats()
+        }
+    
+    def _estimated_tokens(self, path: str) -> int:
+        """Rough token count from the recorded character count, or the file size"""
+        record = self.scan_index.get(os.path.abspath(path))
+        if record and not record.is_excerpt:
+            return record.char_count // 4
+        try:
+            return os.path.getsize(path) // 4
+        except OSError:
+            return 0
+    
     def stop_watching(self):
         """Stop file system watcher"""
         self.watcher.stop()
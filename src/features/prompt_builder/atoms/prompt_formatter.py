@@ -1,6 +1,7 @@
 """Prompt formatter atom - formats prompt components"""
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+from .template_compiler import TemplateCompiler
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +12,11 @@ class PromptFormatter:
     def __init__(self):
         self.file_separator = "\n\n" + "="*60 + "\n\n"
         self.section_separator = "\n\n"
+        self.template_compiler = TemplateCompiler()
+    
+    def settings_key(self) -> tuple:
+        """Formatting settings that affect rendered output (used as a memo key)"""
+        return (self.file_separator, self.section_separator)
     
     def format_file_content(self, file_path: str, content: str) -> str:
         """Format a single file's content for inclusion in prompt"""
@@ -19,6 +25,12 @@ class PromptFormatter:
         
         return f"{header}\n{separator}\n{content}"
     
+    def iter_file_content(self, file_path: str, content: str) -> Iterator[str]:
+        """Yield a file block in pieces so the content is never copied"""
+        header = f"File: {file_path}"
+        yield f"{header}\n{'-' * len(header)}\n"
+        yield content
+    
     def format_attachment(self, attachment_info: Dict[str, Any]) -> str:
         """Format an attachment for inclusion in prompt"""
         name = attachment_info.get('name', 'Unnamed')
@@ -47,42 +59,149 @@ class PromptFormatter:
         attachments: Optional[List[Dict[str, Any]]] = None
     ) -> str:
         """Build an enhanced prompt with all components in a specific order."""
-        sections = []
+        final_prompt = "".join(self.iter_enhanced_prompt(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            file_contents=file_contents,
+            directory_tree=directory_tree,
+            attachments=attachments
+        ))
+        
+        logger.debug(f"Built enhanced prompt: {len(final_prompt)} characters")
+        return final_prompt
+    
+    def iter_enhanced_prompt(
+        self,
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        file_contents: Optional[Iterable[Dict[str, str]]] = None,
+        directory_tree: Optional[str] = None,
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        file_section: Optional[str] = None
+    ) -> Iterator[str]:
+        """Yield the enhanced prompt piece by piece, in the same order as build_enhanced_prompt.
+        
+        file_contents may be any iterable, so files can be read lazily while
+        the prompt is being written. file_section is an already joined file
+        block body (e.g. from SectionMemo) and takes precedence over file_contents.
+        """
+        has_previous = False
         
         # 1. System Prompt
         if system_prompt:
-            sections.append(f"=== SYSTEM PROMPT ===\n{system_prompt}")
+            yield "=== SYSTEM PROMPT ===\n"
+            yield system_prompt
+            has_previous = True
         
         # 2. User Prompt
         if user_prompt:
-            sections.append(f"=== USER PROMPT ===\n{user_prompt}")
+            if has_previous:
+                yield self.section_separator
+            yield "=== USER PROMPT ===\n"
+            yield user_prompt
+            has_previous = True
             
         # 3. File Contents
-        if file_contents:
-            file_section = "=== FILE CONTENTS ===\n"
-            formatted_files = [
-                self.format_file_content(f.get('path', 'Unknown'), f.get('content', ''))
-                for f in file_contents
-            ]
-            file_section += self.file_separator.join(formatted_files)
-            sections.append(file_section)
+        file_pieces = self._file_section_pieces(file_contents, file_section)
+        if file_pieces is not None:
+            if has_previous:
+                yield self.section_separator
+            yield "=== FILE CONTENTS ===\n"
+            yield from file_pieces
+            has_previous = True
         
         # 4. Directory Tree
         if directory_tree:
-            sections.append(f"=== DIRECTORY TREE ===\n{directory_tree}")
+            if has_previous:
+                yield self.section_separator
+            yield "=== DIRECTORY TREE ===\n"
+            yield directory_tree
+            has_previous = True
             
         # 5. Attachments (last)
         if attachments:
-            attachment_section = "=== ATTACHMENTS ===\n"
-            formatted_attachments = [self.format_attachment(a) for a in attachments]
-            attachment_section += self.section_separator.join(formatted_attachments)
-            sections.append(attachment_section)
+            if has_previous:
+                yield self.section_separator
+            yield "=== ATTACHMENTS ===\n"
+            yield self.section_separator.join(self.format_attachment(a) for a in attachments)
+    
+    def iter_stable_prefix(
+        self,
+        system_prompt: Optional[str] = None,
+        file_contents: Optional[Iterable[Dict[str, str]]] = None,
+        directory_tree: Optional[str] = None,
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        file_section: Optional[str] = None
+    ) -> Iterator[str]:
+        """Yield the slow-changing part of a cache-stable prompt.
         
-        # Join all sections
-        final_prompt = self.section_separator.join(sections)
+        Order is system prompt, files, directory tree, attachments; the
+        caller is expected to pass files already sorted by path.
+        """
+        has_previous = False
         
-        logger.debug(f"Built enhanced prompt with {len(sections)} sections")
-        return final_prompt
+        if system_prompt:
+            yield "=== SYSTEM PROMPT ===\n"
+            yield system_prompt
+            has_previous = True
+        
+        file_pieces = self._file_section_pieces(file_contents, file_section)
+        if file_pieces is not None:
+            if has_previous:
+                yield self.section_separator
+            yield "=== FILE CONTENTS ===\n"
+            yield from file_pieces
+            has_previous = True
+        
+        if directory_tree:
+            if has_previous:
+                yield self.section_separator
+            yield "=== DIRECTORY TREE ===\n"
+            yield directory_tree
+            has_previous = True
+        
+        if attachments:
+            if has_previous:
+                yield self.section_separator
+            yield "=== ATTACHMENTS ===\n"
+            yield self.section_separator.join(self.format_attachment(a) for a in attachments)
+    
+    def iter_volatile_suffix(self, user_prompt: Optional[str], after_prefix: bool = True) -> Iterator[str]:
+        """Yield the user prompt section that closes a cache-stable prompt"""
+        if user_prompt:
+            if after_prefix:
+                yield self.section_separator
+            yield "=== USER PROMPT ===\n"
+            yield user_prompt
+    
+    def iter_split_part(self, number: int, total: int, pieces: Iterable[str]) -> Iterator[str]:
+        """Yield one part of a split prompt, prefixed with its part marker"""
+        yield f"=== PART {number} OF {total} ===\n"
+        yield self.section_separator
+        yield from pieces
+    
+    def _file_section_pieces(
+        self,
+        file_contents: Optional[Iterable[Dict[str, str]]],
+        file_section: Optional[str]
+    ) -> Optional[Iterator[str]]:
+        """Pieces of the file section body, or None if there are no files"""
+        if file_section:
+            return iter((file_section,))
+        if not file_contents:
+            return None
+        files = iter(file_contents)
+        first = next(files, None)
+        if first is None:
+            return None
+        return self._iter_file_blocks(first, files)
+    
+    def _iter_file_blocks(self, first: Dict[str, str], rest: Iterator[Dict[str, str]]) -> Iterator[str]:
+        """Yield file blocks joined by the file separator"""
+        yield from self.iter_file_content(first.get('path', 'Unknown'), first.get('content', ''))
+        for f in rest:
+            yield self.file_separator
+            yield from self.iter_file_content(f.get('path', 'Unknown'), f.get('content', ''))
     
     def build_metaprompt(
         self,
@@ -91,17 +210,33 @@ class PromptFormatter:
         variables: Optional[Dict[str, str]] = None
     ) -> str:
         """Build a metaprompt using a template"""
-        # Replace variables in template
-        if variables:
-            for key, value in variables.items():
-                placeholder = f"{{{{{key}}}}}"
-                template = template.replace(placeholder, value)
-        
-        # Replace main content placeholder
-        template = template.replace("{{CONTENT}}", content)
+        unresolved: List[str] = []
+        result = "".join(self.iter_metaprompt(template, [content], variables, unresolved))
         
+        if unresolved:
+            logger.warning(f"Unresolved template variables: {', '.join(unresolved)}")
         logger.debug("Built metaprompt from template")
-        return template
+        return result
+    
+    def iter_metaprompt(
+        self,
+        template: str,
+        content_parts: Iterable[str],
+        variables: Optional[Dict[str, str]] = None,
+        unresolved: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """Yield a metaprompt that wraps streamed content without joining it first.
+        
+        The template is compiled once and rendered in a single pass, so values
+        containing {{...}} are not substituted again. Placeholders without a
+        value are left as is and reported through unresolved.
+        """
+        values: Dict[str, Any] = {"CONTENT": content_parts}
+        if variables:
+            values.update(variables)
+        
+        compiled = self.template_compiler.compile(template)
+        yield from compiled.render_iter(values, unresolved)
     
     def truncate_prompt(self, prompt: str, max_length: int) -> str:
         """Truncate prompt to maximum length"""
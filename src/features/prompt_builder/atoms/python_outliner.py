@@ -0,0 +1,61 @@
+"""Python outliner atom - reduces Python sources to imports, signatures and docstrings"""
+import ast
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+OUTLINE_HEADER = "# [outline] function bodies omitted\n"
+
+
+def _docstring_body(node: ast.AST) -> List[ast.stmt]:
+    """The node's docstring statement, if any, as a new body"""
+    docstring = ast.get_docstring(node, clean=False)
+    if docstring is None:
+        return []
+    return [ast.Expr(value=ast.Constant(value=docstring))]
+
+
+def _outline_function(node: ast.AST) -> ast.AST:
+    """Keep a function's decorators, signature and docstring"""
+    node.body = _docstring_body(node) + [ast.Expr(value=ast.Constant(value=Ellipsis))]
+    return node
+
+
+def _outline_class(node: ast.ClassDef) -> ast.ClassDef:
+    """Keep a class's bases, docstring, attributes and member signatures"""
+    body = _docstring_body(node)
+    for child in node.body:
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            body.append(_outline_function(child))
+        elif isinstance(child, ast.ClassDef):
+            body.append(_outline_class(child))
+        elif isinstance(child, (ast.AnnAssign, ast.Assign)):
+            body.append(child)
+    if not body:
+        body = [ast.Expr(value=ast.Constant(value=Ellipsis))]
+    node.body = body
+    return node
+
+
+def outline_python_source(source: str) -> Optional[str]:
+    """Return an outline of a Python module, or None if it does not parse.
+
+    Module-level so it can run in a process pool.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    body = _docstring_body(tree)
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            body.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            body.append(_outline_function(node))
+        elif isinstance(node, ast.ClassDef):
+            body.append(_outline_class(node))
+
+    tree.body = body
+    return OUTLINE_HEADER + ast.unparse(tree) + "\n"
@@ -0,0 +1,256 @@
+"""Source minifier atom - strips comments and redundant whitespace from source code"""
+import io
+import logging
+import re
+import tokenize
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python', '.pyi': 'python', '.pyw': 'python',
+    '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript', '.cjs': 'javascript',
+    '.ts': 'javascript', '.tsx': 'javascript', '.mts': 'javascript', '.cts': 'javascript',
+    '.java': 'java',
+    '.sql': 'sql',
+}
+
+# Characters after which a '/' in JavaScript starts a regex literal, not a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_LEADING_WS = re.compile(r'[ \t]*')
+
+
+def language_for_path(path: str) -> Optional[str]:
+    """Minifier language for a file path, or None if unsupported"""
+    dot = path.rfind('.')
+    if dot == -1:
+        return None
+    return LANGUAGE_BY_EXTENSION.get(path[dot:].lower())
+
+
+def minify_source(content: str, language: str) -> str:
+    """Strip comments, drop blank lines and normalize indentation.
+
+    Works at the tokenizer level: strings (including multi-line ones) are
+    never altered. Python indentation is rewritten to one space per block
+    level; other languages get one space per detected indent step.
+    """
+    if language == 'python':
+        result = _minify_python(content)
+        if result is not None:
+            return result
+        # Does not tokenize; fall back to whitespace-only cleanup
+        return _normalize_lines(content.split('\n'), set(), None)
+
+    if language == 'javascript':
+        text, protected, open_ends = _strip_c_style(content, line_comment='//', quotes='\'"`', regex_literals=True)
+    elif language == 'java':
+        text, protected, open_ends = _strip_c_style(content, line_comment='//', quotes='\'"', text_blocks=True)
+    elif language == 'sql':
+        text, protected, open_ends = _strip_c_style(content, line_comment='--', quotes='\'"', doubled_quote_escape=True)
+    else:
+        return content
+    lines = text.split('\n')
+    return _normalize_lines(lines, protected, _indent_unit(lines, protected), open_ends)
+
+
+def _minify_python(content: str) -> Optional[str]:
+    """Minify Python with the tokenize module; None if it does not tokenize"""
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(content).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+
+    lines = content.split('\n')
+    protected: Set[int] = set()
+    open_ends: Set[int] = set()
+    comment_cols = {}
+    levels = {}
+    depth = 0
+    at_line_start = True
+    for tok in tokens:
+        kind, _, (start_row, start_col), (end_row, _), _ = tok
+        if kind == tokenize.INDENT:
+            depth += 1
+        elif kind == tokenize.DEDENT:
+            depth -= 1
+        elif kind == tokenize.COMMENT:
+            comment_cols[start_row - 1] = start_col
+        elif kind in (tokenize.NEWLINE, tokenize.NL):
+            at_line_start = kind == tokenize.NEWLINE or at_line_start
+        elif kind != tokenize.ENDMARKER:
+            if at_line_start:
+                levels[start_row - 1] = depth
+                at_line_start = False
+            if end_row > start_row:
+                # Lines inside a multi-line string are left verbatim, and so
+                # is the end of the line it opens on
+                protected.update(range(start_row, end_row))
+                open_ends.add(start_row - 1)
+
+    for index, col in comment_cols.items():
+        if index not in protected:
+            lines[index] = lines[index][:col]
+    for index, level in levels.items():
+        if index not in protected:
+            lines[index] = ' ' * level + lines[index].lstrip(' \t')
+    return _normalize_lines(lines, protected, None, open_ends)
+
+
+def _strip_c_style(
+    content: str,
+    line_comment: str,
+    quotes: str,
+    regex_literals: bool = False,
+    text_blocks: bool = False,
+    doubled_quote_escape: bool = False
+) -> Tuple[str, Set[int], Set[int]]:
+    """Remove // or -- line comments and /* */ block comments outside strings.
+
+    Returns the text, the indexes of lines that start inside a string and
+    the indexes of lines that end inside one.
+    """
+    out: List[str] = []
+    protected: Set[int] = set()
+    open_ends: Set[int] = set()
+    i = 0
+    n = len(content)
+    line = 0
+    last_significant = ''
+
+    while i < n:
+        ch = content[i]
+
+        if content.startswith(line_comment, i):
+            end = content.find('\n', i)
+            i = n if end == -1 else end
+            continue
+
+        if content.startswith('/*', i):
+            end = content.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            newlines = content.count('\n', i, end)
+            # Keep line structure so blank-run collapsing can tidy up
+            out.append('\n' * newlines if newlines else ' ')
+            line += newlines
+            i = end
+            continue
+
+        if text_blocks and content.startswith('"""', i):
+            end = content.find('"""', i + 3)
+            end = n if end == -1 else end + 3
+            segment = content[i:end]
+            out.append(segment)
+            newlines = segment.count('\n')
+            if newlines:
+                open_ends.add(line)
+            protected.update(range(line + 1, line + 1 + newlines))
+            line += newlines
+            i = end
+            last_significant = '"'
+            continue
+
+        if ch in quotes:
+            j = i + 1
+            while j < n:
+                c = content[j]
+                if c == '\\' and not doubled_quote_escape:
+                    j += 2
+                    continue
+                if c == ch:
+                    if doubled_quote_escape and j + 1 < n and content[j + 1] == ch:
+                        j += 2
+                        continue
+                    break
+                if c == '\n' and ch != '`' and not doubled_quote_escape:
+                    # Unterminated single-line string; stop at the line end
+                    break
+                j += 1
+            end = min(j + 1, n)
+            segment = content[i:end]
+            out.append(segment)
+            newlines = segment.count('\n')
+            if newlines:
+                open_ends.add(line)
+            protected.update(range(line + 1, line + 1 + newlines))
+            line += newlines
+            i = end
+            last_significant = ch
+            continue
+
+        if regex_literals and ch == '/' and (not last_significant or last_significant in _REGEX_PRECEDERS):
+            j = i + 1
+            in_class = False
+            while j < n and content[j] != '\n':
+                c = content[j]
+                if c == '\\':
+                    j += 2
+                    continue
+                if c == '[':
+                    in_class = True
+                elif c == ']':
+                    in_class = False
+                elif c == '/' and not in_class:
+                    break
+                j += 1
+            end = min(j + 1, n)
+            out.append(content[i:end])
+            i = end
+            last_significant = '/'
+            continue
+
+        if ch == '\n':
+            line += 1
+        elif not ch.isspace():
+            last_significant = ch
+        out.append(ch)
+        i += 1
+
+    return ''.join(out), protected, open_ends
+
+
+def _indent_unit(lines: List[str], protected: Set[int]) -> int:
+    """Smallest indent step used in the file (tabs count as 4).
+
+    Widths seen on a single line only (e.g. an odd continuation line) are
+    ignored unless nothing else is indented.
+    """
+    counts: Dict[int, int] = {}
+    for index, text in enumerate(lines):
+        if index in protected or not text.strip():
+            continue
+        width = len(_LEADING_WS.match(text).group().expandtabs(4))
+        if width:
+            counts[width] = counts.get(width, 0) + 1
+    if not counts:
+        return 4
+    repeated = [width for width, count in counts.items() if count > 1]
+    return min(repeated or counts)
+
+
+def _normalize_lines(
+    lines: List[str],
+    protected: Set[int],
+    indent_unit: Optional[int],
+    open_ends: Set[int] = frozenset()
+) -> str:
+    """Strip trailing whitespace, drop blank lines and re-indent unprotected lines.
+
+    Lines in open_ends end inside a multi-line literal, so their trailing
+    whitespace belongs to the literal and is kept.
+    """
+    result = []
+    for index, text in enumerate(lines):
+        if index in protected:
+            result.append(text)
+            continue
+        if index not in open_ends:
+            text = text.rstrip()
+        if not text:
+            continue
+        if indent_unit:
+            leading = _LEADING_WS.match(text).group()
+            level = len(leading.expandtabs(4)) // indent_unit
+            text = ' ' * level + text[len(leading):]
+        result.append(text)
+    return '\n'.join(result) + '\n' if result else ''
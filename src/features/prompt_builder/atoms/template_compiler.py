@@ -0,0 +1,116 @@
+"""Template compiler atom - compiles {{NAME}} templates for single-pass rendering"""
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
+
+TemplateValue = Union[str, Iterable[str]]
+
+
+class CompiledTemplate:
+    """A template split once into literal and placeholder parts.
+
+    parts is a tuple of (is_placeholder, text) pairs. unmatched holds the
+    offsets of '{{' or '}}' markers that do not form a placeholder.
+    """
+
+    def __init__(self, parts: Tuple[Tuple[bool, str], ...], unmatched: List[int]):
+        self.parts = parts
+        self.unmatched = unmatched
+        self.placeholders = tuple(dict.fromkeys(text for is_ph, text in parts if is_ph))
+
+    def render_iter(
+        self,
+        values: Dict[str, TemplateValue],
+        unresolved: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """Yield the rendered template in one pass.
+
+        A value may be a string or an iterable of string pieces, which is
+        streamed in place. Substituted values are never scanned for
+        placeholders again. Placeholders without a value are kept verbatim
+        and their names appended to unresolved.
+        """
+        counts: Dict[str, int] = {}
+        for is_placeholder, text in self.parts:
+            if is_placeholder:
+                counts[text] = counts.get(text, 0) + 1
+
+        values = dict(values)
+        for name, value in values.items():
+            if not isinstance(value, str) and counts.get(name, 0) > 1:
+                # Streamed value used more than once; keep its pieces
+                values[name] = list(value)
+
+        for is_placeholder, text in self.parts:
+            if not is_placeholder:
+                yield text
+                continue
+            value = values.get(text)
+            if value is None:
+                if unresolved is not None and text not in unresolved:
+                    unresolved.append(text)
+                yield f"{{{{{text}}}}}"
+            elif isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def render(self, values: Dict[str, TemplateValue], unresolved: Optional[List[str]] = None) -> str:
+        """Render the template to a string"""
+        return "".join(self.render_iter(values, unresolved))
+
+
+class TemplateCompiler:
+    """Compiles templates and caches the result by template hash"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+
+    def compile(self, template: str) -> CompiledTemplate:
+        """Return the compiled form of a template"""
+        key = hashlib.blake2b(template.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            self._cache.move_to_end(key)
+            return compiled
+
+        compiled = self._tokenize(template)
+        self._cache[key] = compiled
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def _tokenize(self, template: str) -> CompiledTemplate:
+        """Split a template into literal and placeholder parts"""
+        parts: List[Tuple[bool, str]] = []
+        unmatched: List[int] = []
+        position = 0
+
+        for match in PLACEHOLDER_PATTERN.finditer(template):
+            if match.start() > position:
+                self._add_literal(parts, unmatched, template, position, match.start())
+            parts.append((True, match.group(1)))
+            position = match.end()
+        if position < len(template):
+            self._add_literal(parts, unmatched, template, position, len(template))
+
+        unmatched.sort()
+        logger.debug(f"Compiled template: {len(parts)} parts, {len(unmatched)} unmatched markers")
+        return CompiledTemplate(tuple(parts), unmatched)
+
+    def _add_literal(self, parts: List[Tuple[bool, str]], unmatched: List[int], template: str, start: int, end: int):
+        """Append a literal part and record stray '{{' / '}}' markers in it"""
+        literal = template[start:end]
+        for marker in ("{{", "}}"):
+            index = literal.find(marker)
+            while index != -1:
+                unmatched.append(start + index)
+                index = literal.find(marker, index + 2)
+        parts.append((False, literal))
@@ -32,6 +32,58 @@ class BuildPrompt(Command):
     mode: str = "enhanced"  # "enhanced" or "metaprompt"
     files_to_include: Optional[List[str]] = None # Specify files to include
     directory_tree: Optional[str] = None # Override for directory tree
+    outline_files: Optional[List[str]] = None # Python files to include as signature outlines
+    minify: bool = False # Strip comments and blank lines from supported languages
+    dedup: bool = False # Emit identical file bodies once; later copies become aliases
+    near_dup_threshold: Optional[float] = None # Collapse near duplicates (0-1 similarity) into diffs
+    layout: str = "default" # "default" or "cache-stable" (stable content first, user prompt last)
+
+
+class ExportPrompt(Command):
+    """Command to build the prompt straight into file(s) instead of memory"""
+    output_dir: str
+    file_name: Optional[str] = None  # Defaults to a timestamped prompt_*.txt
+    compress: bool = False  # gzip each output file
+    split_size_mb: Optional[float] = None  # Split into parts of at most this size
+    preview_length: int = 2000
+    include_files: bool = True
+    include_attachments: bool = True
+    include_system_prompt: bool = True
+    include_user_prompt: bool = True
+    mode: str = "enhanced"  # "enhanced" or "metaprompt"
+    files_to_include: Optional[List[str]] = None
+    directory_tree: Optional[str] = None
+    outline_files: Optional[List[str]] = None
+    minify: bool = False
+    dedup: bool = False
+    near_dup_threshold: Optional[float] = None
+    layout: str = "default"
+
+
+class ExportSplitPrompt(Command):
+    """Command to split the prompt into parts under a token budget and write one file per part"""
+    output_dir: str
+    max_tokens: int  # Token budget per part, including the shared header
+    model: str = "gpt-4"  # Model whose tokenizer is used for the budget
+    file_name: Optional[str] = None  # Parts are named <stem>.partNNN<suffix>
+    compress: bool = False
+    include_files: bool = True
+    include_attachments: bool = True
+    include_system_prompt: bool = True
+    include_user_prompt: bool = True
+    mode: str = "enhanced"  # "enhanced" or "metaprompt"
+    files_to_include: Optional[List[str]] = None
+    directory_tree: Optional[str] = None
+    outline_files: Optional[List[str]] = None
+    minify: bool = False
+    dedup: bool = False
+    near_dup_threshold: Optional[float] = None
+
+
+class FindDuplicateFiles(Command):
+    """Command to report exact and near-duplicate files"""
+    files: Optional[List[str]] = None  # Defaults to the checked files
+    threshold: float = 0.85  # Minimum estimated similarity for near duplicates
 
 
 class GetPromptComponents(Command):
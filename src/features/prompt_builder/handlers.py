@@ -5,7 +5,8 @@ from src.gateway import EventBus, ServiceLocator
 from .commands import (
     SetSystemPrompt, GetSystemPrompt, SetUserPrompt, GetUserPrompt,
     BuildPrompt, GetPromptComponents, ValidatePrompt, GetPromptPreview,
-    ClearPrompts, SetPromptMode, GetPromptMode, ApplyTemplate
+    ClearPrompts, SetPromptMode, GetPromptMode, ApplyTemplate, ExportPrompt,
+    FindDuplicateFiles, ExportSplitPrompt
 )
 from .organisms.prompt_service import PromptService
 
@@ -64,15 +65,117 @@ async def handle_build_prompt(cmd: BuildPrompt):
         include_system_prompt=cmd.include_system_prompt,
         include_user_prompt=cmd.include_user_prompt,
         files_to_include=cmd.files_to_include,
-        directory_tree=cmd.directory_tree
+        directory_tree=cmd.directory_tree,
+        outline_files=cmd.outline_files,
+        minify=cmd.minify,
+        dedup=cmd.dedup,
+        near_dup_threshold=cmd.near_dup_threshold,
+        layout=cmd.layout
     )
     
-    return {
+    result = {
         "success": success,
         "prompt": prompt if success else None,
         "errors": errors,
         "length": len(prompt) if success else 0
     }
+    if success:
+        result["unresolved_variables"] = service.get_unresolved_variables()
+        result["excerpted_files"] = service.get_excerpted_files()
+    if success and cmd.layout == "cache-stable":
+        result["prefix"] = service.get_prefix_stats()
+    return result
+
+
+@PromptBuilderCommandBus.register(ExportPrompt)
+async def handle_export_prompt(cmd: ExportPrompt):
+    """Stream the built prompt to file(s) and return only paths, size and a preview"""
+    service = ServiceLocator.get("prompt_builder")
+    
+    if cmd.mode != service.get_mode():
+        service.set_mode(cmd.mode)
+    
+    split_size = int(cmd.split_size_mb * 1024 * 1024) if cmd.split_size_mb else None
+    success, info, errors = await service.export_prompt(
+        output_dir=cmd.output_dir,
+        file_name=cmd.file_name,
+        compress=cmd.compress,
+        split_size=split_size,
+        preview_length=cmd.preview_length,
+        include_files=cmd.include_files,
+        include_attachments=cmd.include_attachments,
+        include_system_prompt=cmd.include_system_prompt,
+        include_user_prompt=cmd.include_user_prompt,
+        files_to_include=cmd.files_to_include,
+        directory_tree=cmd.directory_tree,
+        outline_files=cmd.outline_files,
+        minify=cmd.minify,
+        dedup=cmd.dedup,
+        near_dup_threshold=cmd.near_dup_threshold,
+        layout=cmd.layout
+    )
+    
+    result = {
+        "success": success,
+        "paths": info.get("paths", []),
+        "size": info.get("size", 0),
+        "length": info.get("char_count", 0),
+        "estimated_tokens": info.get("estimated_tokens", 0),
+        "preview": info.get("preview", ""),
+        "truncated": info.get("char_count", 0) > len(info.get("preview", "")),
+        "errors": errors
+    }
+    if success:
+        result["unresolved_variables"] = service.get_unresolved_variables()
+        result["excerpted_files"] = service.get_excerpted_files()
+    if success and cmd.layout == "cache-stable":
+        result["prefix"] = service.get_prefix_stats()
+    return result
+
+
+@PromptBuilderCommandBus.register(ExportSplitPrompt)
+async def handle_export_split_prompt(cmd: ExportSplitPrompt):
+    """Write a prompt split into token-budgeted parts, one file per part"""
+    service = ServiceLocator.get("prompt_builder")
+    
+    if cmd.mode != service.get_mode():
+        service.set_mode(cmd.mode)
+    
+    success, info, errors = await service.export_split_prompts(
+        output_dir=cmd.output_dir,
+        max_tokens=cmd.max_tokens,
+        file_name=cmd.file_name,
+        compress=cmd.compress,
+        model=cmd.model,
+        include_files=cmd.include_files,
+        include_attachments=cmd.include_attachments,
+        include_system_prompt=cmd.include_system_prompt,
+        include_user_prompt=cmd.include_user_prompt,
+        files_to_include=cmd.files_to_include,
+        directory_tree=cmd.directory_tree,
+        outline_files=cmd.outline_files,
+        minify=cmd.minify,
+        dedup=cmd.dedup,
+        near_dup_threshold=cmd.near_dup_threshold
+    )
+    
+    return {
+        "success": success,
+        "paths": info.get("paths", []),
+        "part_count": info.get("part_count", 0),
+        "parts": info.get("parts", []),
+        "part_stats": info.get("part_stats", []),
+        "unresolved_variables": service.get_unresolved_variables() if success else [],
+        "excerpted_files": service.get_excerpted_files() if success else [],
+        "errors": errors
+    }
+
+
+@PromptBuilderCommandBus.register(FindDuplicateFiles)
+async def handle_find_duplicate_files(cmd: FindDuplicateFiles):
+    """Report exact and near-duplicate files"""
+    service = ServiceLocator.get("prompt_builder")
+    return await service.find_duplicate_files(file_paths=cmd.files, threshold=cmd.threshold)
 
 
 @PromptBuilderCommandBus.register(GetPromptComponents)
@@ -0,0 +1,167 @@
+"""Dedup stage molecule - collapses identical and near-identical file bodies"""
+import difflib
+import hashlib
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DedupStage:
+    """Finds duplicate file bodies in a prompt's file list.
+
+    Exact duplicates are grouped by content hash: the first file keeps its
+    body and later copies become a one-line alias. Near duplicates are
+    found with bottom-k MinHash sketches over the set of stripped lines;
+    candidate pairs come from sketches sharing one of their band_size
+    smallest values, so thousands of files are compared without an
+    all-pairs scan. A bucket with more than max_bucket members (many
+    copies of one generated file, or a line every file has) is not
+    compared all-pairs: each later member is only compared against the
+    bucket's first max_bucket members. A collapsed near duplicate is replaced by a unified diff
+    against its canonical file when that is shorter.
+    """
+
+    def __init__(self, sketch_size: int = 128, band_size: int = 8, max_bucket: int = 64):
+        self.sketch_size = sketch_size
+        self.band_size = band_size
+        self.max_bucket = max_bucket
+
+    def apply(
+        self,
+        file_contents: List[Dict[str, Any]],
+        exact: bool = True,
+        near_threshold: Optional[float] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Return (deduplicated file_contents, report)"""
+        report: Dict[str, Any] = {"exact": {}, "near": []}
+        if exact:
+            file_contents, report["exact"] = self.dedup_exact(file_contents)
+        if near_threshold is not None:
+            file_contents, report["near"] = self.collapse_near_duplicates(file_contents, near_threshold)
+        return file_contents, report
+
+    def dedup_exact(self, file_contents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, List[str]]]:
+        """Replace byte-identical bodies after the first by an alias line"""
+        canonical_by_hash: Dict[str, str] = {}
+        aliases: Dict[str, List[str]] = {}
+        result = []
+        for file_info in file_contents:
+            path = file_info.get('path', 'Unknown')
+            key = self._content_hash(file_info)
+            canonical = canonical_by_hash.get(key)
+            if canonical is None:
+                canonical_by_hash[key] = path
+                result.append(file_info)
+                continue
+            aliases.setdefault(canonical, []).append(path)
+            result.append({
+                "path": path,
+                "content": f"[Identical to {canonical}]",
+                "mode": "duplicate",
+                "hash": f"{key}:duplicate"
+            })
+
+        if aliases:
+            logger.info(f"Collapsed {sum(len(a) for a in aliases.values())} exact duplicate files")
+        return result, aliases
+
+    def find_near_duplicates(self, file_contents: List[Dict[str, Any]], threshold: float) -> List[Tuple[str, str, float]]:
+        """Return (canonical path, duplicate path, estimated similarity) pairs at or above threshold"""
+        pairs = self._near_pairs(file_contents, threshold)
+        return [
+            (file_contents[i]['path'], file_contents[j]['path'], similarity)
+            for i, j, similarity in pairs
+        ]
+
+    def collapse_near_duplicates(
+        self,
+        file_contents: List[Dict[str, Any]],
+        threshold: float
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Replace near duplicates by a diff against their canonical file where that is shorter"""
+        result = list(file_contents)
+        collapsed = set()
+        report = []
+        for i, j, similarity in self._near_pairs(file_contents, threshold):
+            if i in collapsed or j in collapsed:
+                continue
+            canonical, duplicate = file_contents[i], file_contents[j]
+            diff = "\n".join(difflib.unified_diff(
+                canonical['content'].splitlines(),
+                duplicate['content'].splitlines(),
+                fromfile=canonical['path'],
+                tofile=duplicate['path'],
+                lineterm="",
+                n=1
+            ))
+            entry = {"canonical": canonical['path'], "duplicate": duplicate['path'], "similarity": round(similarity, 3), "collapsed": False}
+            if len(diff) < len(duplicate['content']) * 0.8:
+                result[j] = {
+                    "path": duplicate['path'],
+                    "content": f"[Near-duplicate of {canonical['path']} (~{similarity:.0%} similar); unified diff:]\n{diff}",
+                    "mode": "near-duplicate",
+                    "hash": f"{self._content_hash(duplicate)}:near:{self._content_hash(canonical)}"
+                }
+                collapsed.add(j)
+                entry["collapsed"] = True
+            report.append(entry)
+
+        if collapsed:
+            logger.info(f"Collapsed {len(collapsed)} near-duplicate files")
+        return result, report
+
+    def _near_pairs(self, file_contents: List[Dict[str, Any]], threshold: float) -> List[Tuple[int, int, float]]:
+        """Index pairs (earlier, later) with estimated line-set Jaccard similarity >= threshold"""
+        sketches: Dict[int, List[int]] = {}
+        buckets: Dict[int, List[int]] = {}
+        for index, file_info in enumerate(file_contents):
+            if file_info.get('mode') in ('duplicate', 'near-duplicate'):
+                continue
+            sketch = self._sketch(file_info.get('content', ''))
+            if not sketch:
+                continue
+            sketches[index] = sketch
+            for value in sketch[:self.band_size]:
+                buckets.setdefault(value, []).append(index)
+
+        candidates = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # Members are in file order, so representatives always come first
+            representatives = members[:self.max_bucket]
+            for b in range(1, len(members)):
+                for a in range(min(b, len(representatives))):
+                    candidates.add((representatives[a], members[b]))
+
+        pairs = []
+        for i, j in candidates:
+            similarity = self._similarity(sketches[i], sketches[j])
+            if similarity >= threshold:
+                pairs.append((i, j, similarity))
+        pairs.sort(key=lambda p: (-p[2], p[0], p[1]))
+        return pairs
+
+    def _sketch(self, content: str) -> List[int]:
+        """Bottom-k MinHash sketch of a file's distinct non-blank lines"""
+        lines = {hash(line.strip()) for line in content.splitlines()}
+        lines.discard(hash(""))
+        return heapq.nsmallest(self.sketch_size, lines)
+
+    def _similarity(self, a: List[int], b: List[int]) -> float:
+        """Estimated Jaccard similarity of two bottom-k sketches"""
+        set_a, set_b = set(a), set(b)
+        union = heapq.nsmallest(self.sketch_size, set_a | set_b)
+        if not union:
+            return 0.0
+        shared = sum(1 for value in union if value in set_a and value in set_b)
+        return shared / len(union)
+
+    def _content_hash(self, file_info: Dict[str, Any]) -> str:
+        """Content hash for a file, reusing the one from the read pass if present"""
+        content_hash = file_info.get('hash')
+        if content_hash:
+            return content_hash
+        return hashlib.blake2b(file_info.get('content', '').encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
@@ -0,0 +1,66 @@
+"""Minify stage molecule - applies the source minifier to loaded files with a cache"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from ..atoms.source_minifier import language_for_path, minify_source
+
+logger = logging.getLogger(__name__)
+
+
+class MinifyStage:
+    """Minifies file contents between loading and formatting.
+
+    Results are cached by content hash. Files in unsupported languages and
+    outlined files are passed through unchanged.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "minified": 0, "chars_saved": 0}
+
+    def apply(self, file_contents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return file_contents with supported files minified"""
+        result = []
+        for file_info in file_contents:
+            path = file_info.get('path', '')
+            language = language_for_path(path)
+            if language is None or file_info.get('mode') == 'outline':
+                result.append(file_info)
+                continue
+
+            content = file_info.get('content', '')
+            key = f"{self._content_hash(file_info)}:{language}"
+            with self._lock:
+                minified = self._cache.get(key)
+                if minified is not None:
+                    self._cache.move_to_end(key)
+                    self.stats["hits"] += 1
+
+            if minified is None:
+                try:
+                    minified = minify_source(content, language)
+                except Exception as e:
+                    logger.warning(f"Could not minify {path}: {e}")
+                    result.append(file_info)
+                    continue
+                with self._lock:
+                    self._cache[key] = minified
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+                    self.stats["minified"] += 1
+                    self.stats["chars_saved"] += len(content) - len(minified)
+
+            result.append({**file_info, "content": minified, "mode": "minified", "hash": f"{key}:minified"})
+        return result
+
+    def _content_hash(self, file_info: Dict[str, Any]) -> str:
+        """Content hash for a file, reusing the one from the read pass if present"""
+        content_hash = file_info.get('hash')
+        if content_hash:
+            return content_hash
+        return hashlib.blake2b(file_info['content'].encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
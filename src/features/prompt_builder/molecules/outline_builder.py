@@ -0,0 +1,101 @@
+"""Outline builder molecule - replaces selected files with cached Python outlines"""
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..atoms.python_outliner import outline_python_source
+
+logger = logging.getLogger(__name__)
+
+OUTLINE_EXTENSIONS = ('.py', '.pyi')
+
+
+class OutlineBuilder:
+    """Turns Python files into signature-only outlines.
+
+    Parsing runs in a process pool (started on first use) so large
+    selections use every core; a handful of small files is parsed inline
+    where the pool would cost more than it saves. Outlines are cached by
+    content hash. Files that are not Python or do not parse stay as they are.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, inline_threshold: int = 4, max_entries: int = 4096):
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        self.max_entries = max_entries
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._cache: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    async def apply(self, file_contents: List[Dict[str, Any]], outline_paths: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return file_contents with the files in outline_paths replaced by their outlines"""
+        wanted = set(outline_paths)
+        targets = [
+            (i, f) for i, f in enumerate(file_contents)
+            if f.get('path') in wanted and f.get('path', '').endswith(OUTLINE_EXTENSIONS)
+        ]
+        if not targets:
+            return file_contents
+
+        keys = [self._cache_key(f) for _, f in targets]
+        with self._cache_lock:
+            outlines = {k: self._cache[k] for k in keys if k in self._cache}
+        missing = {k: f['content'] for k, (_, f) in zip(keys, targets) if k not in outlines}
+
+        if missing:
+            outlines.update(await self._outline_many(missing))
+
+        result = list(file_contents)
+        for key, (index, f) in zip(keys, targets):
+            outline = outlines.get(key)
+            if outline is None:
+                continue
+            result[index] = {"path": f['path'], "content": outline, "mode": "outline", "hash": f"{key}:outline"}
+        logger.info(f"Outlined {len(targets)} files ({len(missing)} parsed)")
+        return result
+
+    def shutdown(self):
+        """Shut down the process pool"""
+        with self._pool_lock:
+            if self._pool:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    async def _outline_many(self, sources: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Parse sources inline or in the process pool and cache the results"""
+        keys = list(sources)
+        if len(keys) <= self.inline_threshold:
+            results = [outline_python_source(sources[k]) for k in keys]
+        else:
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, outline_python_source, sources[k]) for k in keys)
+            )
+
+        outlines = dict(zip(keys, results))
+        with self._cache_lock:
+            for key, outline in outlines.items():
+                self._cache[key] = outline
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return outlines
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Process pool, created on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _cache_key(self, file_info: Dict[str, Any]) -> str:
+        """Content hash for a file, reusing the one from the read pass if present"""
+        content_hash = file_info.get('hash')
+        if content_hash:
+            return content_hash
+        return hashlib.blake2b(file_info['content'].encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
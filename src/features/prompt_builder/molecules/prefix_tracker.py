@@ -0,0 +1,60 @@
+"""Prefix tracker molecule - hashes the stable prompt prefix and compares it with the previous build"""
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixTracker:
+    """Measures how much of a prompt prefix survives between builds.
+
+    Pieces are passed through unchanged while a running hash of the whole
+    prefix and a short hash per piece are recorded. Comparing the piece
+    hashes with the previous build gives the unchanged prefix length at
+    piece granularity (a file header, a file body, a section), which is what
+    a provider-side prompt cache can reuse. Only hashes are kept, never the
+    prefix text.
+    """
+
+    def __init__(self, chars_per_token: int = 4):
+        self.chars_per_token = chars_per_token
+        self._previous: List[Tuple[int, bytes]] = []
+        self._lock = threading.Lock()
+        self.last_stats: Dict[str, Any] = {}
+
+    def observe(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Yield pieces while recording them; stats are final once the iterator is exhausted"""
+        hasher = hashlib.blake2b(digest_size=16)
+        records: List[Tuple[int, bytes]] = []
+        for piece in pieces:
+            if not piece:
+                continue
+            data = piece.encode('utf-8', errors='surrogatepass')
+            hasher.update(data)
+            records.append((len(piece), hashlib.blake2b(data, digest_size=8).digest()))
+            yield piece
+
+        with self._lock:
+            unchanged = 0
+            for current, previous in zip(records, self._previous):
+                if current != previous:
+                    break
+                unchanged += current[0]
+            prefix_chars = sum(length for length, _ in records)
+            self._previous = records
+            self.last_stats = {
+                "prefix_hash": hasher.hexdigest(),
+                "prefix_chars": prefix_chars,
+                "prefix_tokens": prefix_chars // self.chars_per_token,
+                "unchanged_prefix_chars": unchanged,
+                "unchanged_prefix_tokens": unchanged // self.chars_per_token
+            }
+        logger.debug(f"Stable prefix: {prefix_chars} chars, {unchanged} unchanged since last build")
+
+    def reset(self):
+        """Forget the previous build"""
+        with self._lock:
+            self._previous = []
+            self.last_stats = {}
@@ -0,0 +1,90 @@
+"""Prompt file writer molecule - streams prompt text into (optionally gzipped, split) files"""
+import gzip
+import logging
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PromptFileWriter:
+    """Text stream that writes UTF-8 prompt output to one or more files.
+
+    With max_part_bytes set, output rolls over to numbered part files
+    (prompt.part001.txt, prompt.part002.txt, ...) without splitting a
+    UTF-8 character. With compress=True every part is gzip compressed.
+    Use it as a PromptSink stream so the prompt is never held in memory.
+    """
+
+    def __init__(self, base_path: Path, compress: bool = False, max_part_bytes: Optional[int] = None):
+        self.base_path = Path(base_path)
+        self.compress = compress
+        self.max_part_bytes = max_part_bytes if max_part_bytes and max_part_bytes > 0 else None
+
+        self.paths: List[Path] = []
+        self.total_bytes = 0
+        self._file: Optional[BinaryIO] = None
+        self._part_bytes = 0
+
+    def __enter__(self) -> "PromptFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, text: str) -> int:
+        """Encode and write text, rolling over to a new part when full"""
+        data = text.encode('utf-8')
+        view = memoryview(data)
+        while view:
+            if self._file is None or (self.max_part_bytes and self._part_bytes >= self.max_part_bytes):
+                self._open_next_part()
+
+            room = len(view)
+            if self.max_part_bytes:
+                room = min(room, self.max_part_bytes - self._part_bytes)
+                # Back off to a UTF-8 character boundary
+                while 0 < room < len(view) and (view[room] & 0xC0) == 0x80:
+                    room -= 1
+                if room == 0 and self._part_bytes:
+                    # The next character does not fit; start a new part
+                    self._open_next_part()
+                    continue
+                if room == 0:
+                    # Part size smaller than one character
+                    room = 1
+                    while room < len(view) and (view[room] & 0xC0) == 0x80:
+                        room += 1
+
+            self._file.write(view[:room])
+            self._part_bytes += room
+            self.total_bytes += room
+            view = view[room:]
+        return len(text)
+
+    def close(self):
+        """Close the current part file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        logger.info(f"Wrote {self.total_bytes} bytes to {len(self.paths)} file(s)")
+
+    def _open_next_part(self):
+        """Close the current part and open the next one"""
+        if self._file is not None:
+            self._file.close()
+
+        path = self._part_path(len(self.paths) + 1)
+        self._file = gzip.open(path, 'wb') if self.compress else open(path, 'wb')
+        self.paths.append(path)
+        self._part_bytes = 0
+
+    def _part_path(self, index: int) -> Path:
+        """Path of the given part number"""
+        stem, suffix = self.base_path.stem, self.base_path.suffix or ".txt"
+        if self.max_part_bytes:
+            stem = f"{stem}.part{index:03d}"
+        name = f"{stem}{suffix}"
+        if self.compress:
+            name += ".gz"
+        return self.base_path.with_name(name)
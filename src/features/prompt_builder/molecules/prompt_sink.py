@@ -0,0 +1,56 @@
+"""Prompt sink molecule - writes streamed prompt pieces with running totals"""
+import logging
+from typing import Any, Dict, Iterable, TextIO
+
+logger = logging.getLogger(__name__)
+
+
+class PromptSink:
+    """Writes prompt pieces to a text stream as they are produced.
+
+    The stream can be anything with a write(str) method (an open text file,
+    io.StringIO, an io.TextIOBase subclass), so a prompt never has to exist
+    as a single string. The token estimate uses the same ~4 characters per
+    token heuristic as PromptFormatter.estimate_token_count, and the first
+    preview_length characters are kept for display.
+    """
+
+    def __init__(self, stream: TextIO, chars_per_token: int = 4, preview_length: int = 0):
+        self.stream = stream
+        self.chars_per_token = chars_per_token
+        self.preview_length = preview_length
+        self.preview = ""
+        self.char_count = 0
+        self.piece_count = 0
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Rough token estimate for everything written so far"""
+        return self.char_count // self.chars_per_token
+
+    def write(self, piece: str) -> int:
+        """Write one piece and return its length"""
+        if not piece:
+            return 0
+        self.stream.write(piece)
+        if len(self.preview) < self.preview_length:
+            self.preview += piece[:self.preview_length - len(self.preview)]
+        self.char_count += len(piece)
+        self.piece_count += 1
+        return len(piece)
+
+    def write_all(self, pieces: Iterable[str]) -> int:
+        """Drain a piece generator into the stream and return the total length"""
+        for piece in pieces:
+            self.write(piece)
+        logger.debug(f"Streamed {self.char_count} characters in {self.piece_count} pieces")
+        return self.char_count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get running totals"""
+        return {
+            "char_count": self.char_count,
+            "estimated_tokens": self.estimated_tokens,
+            "piece_count": self.piece_count,
+            "preview": self.preview
+        }
@@ -0,0 +1,128 @@
+"""Prompt splitter molecule - spreads file blocks over prompts that each fit a token budget"""
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (index into file_contents, (first line, end line, first char, end char) or
+# None for the whole file); the character offsets let a range be sliced
+# without splitting the file into lines again
+PartEntry = Tuple[int, Optional[Tuple[int, int, int, int]]]
+
+
+def _line_lengths(content: str) -> List[int]:
+    """Length of each line including its "\n".
+
+    Only "\n" ends a line, as in the line index behind path:first-last
+    specs; str.splitlines would also break on "\r", "\x0c", "\u2028" and
+    others and number the lines differently.
+    """
+    lengths = [len(line) + 1 for line in content.split('\n')]
+    if content.endswith('\n'):
+        lengths.pop()
+    elif lengths:
+        lengths[-1] -= 1
+    return lengths
+
+
+class PromptSplitter:
+    """Plans and renders a multi-part prompt.
+
+    Planning only needs a token count per file, so it runs before any part
+    is rendered and the number of parts is known up front. Files are packed
+    greedily and kept whole when they fit in a part; a file larger than a
+    whole part is cut into line ranges, with line costs scaled from the
+    file's token count. Parts are rendered one at a time from the plan, so
+    at most one part's file list exists at once.
+    """
+
+    def __init__(self, file_separator: str, chars_per_token: int = 4):
+        self.file_separator = file_separator
+        self.chars_per_token = chars_per_token
+
+    def plan(
+        self,
+        file_contents: List[Dict[str, Any]],
+        file_tokens: List[int],
+        part_budget: int,
+        first_part_reserve: int = 0
+    ) -> List[List[PartEntry]]:
+        """Assign files (or line ranges of files) to parts of at most part_budget tokens"""
+        parts: List[List[PartEntry]] = []
+        current: List[PartEntry] = []
+        remaining = part_budget - first_part_reserve
+
+        def close():
+            nonlocal current, remaining
+            if current:
+                parts.append(current)
+            current = []
+            remaining = part_budget
+
+        for index, file_info in enumerate(file_contents):
+            path = file_info.get('path', 'Unknown')
+            cost = file_tokens[index] + self._block_overhead(path)
+            if cost <= remaining:
+                current.append((index, None))
+                remaining -= cost
+                continue
+            if cost <= part_budget:
+                close()
+                current.append((index, None))
+                remaining -= cost
+                continue
+
+            # Larger than a whole part: split by line ranges
+            content = file_info.get('content', '')
+            lines = _line_lengths(content)
+            ratio = file_tokens[index] / max(1, len(content))
+            overhead = self._block_overhead(f"{path}:{len(lines)}-{len(lines)}")
+            start = 0
+            offset = 0
+            while start < len(lines):
+                if remaining - overhead < part_budget // 4 and current:
+                    close()
+                available = remaining - overhead
+                end = start
+                end_offset = offset
+                used = 0
+                while end < len(lines):
+                    line_cost = int(lines[end] * ratio) + 1
+                    if used + line_cost > available:
+                        break
+                    used += line_cost
+                    end_offset += lines[end]
+                    end += 1
+                if end == start:
+                    logger.warning(f"Line {start + 1} of {path} alone exceeds the part budget")
+                    used = int(lines[start] * ratio) + 1
+                    end_offset += lines[start]
+                    end = start + 1
+                current.append((index, (start, end, offset, end_offset)))
+                remaining -= used + overhead
+                start = end
+                offset = end_offset
+                if start < len(lines):
+                    close()
+
+        close()
+        return parts
+
+    def iter_part_files(self, file_contents: List[Dict[str, Any]], part: List[PartEntry]) -> Iterator[Dict[str, str]]:
+        """Yield the file dicts of one part, slicing line ranges as they are reached"""
+        for index, line_range in part:
+            file_info = file_contents[index]
+            if line_range is None:
+                yield file_info
+                continue
+            start, end, first_char, end_char = line_range
+            yield {
+                "path": f"{file_info.get('path', 'Unknown')}:{start + 1}-{end}",
+                "content": file_info.get('content', '')[first_char:end_char]
+            }
+
+    def _block_overhead(self, label: str) -> int:
+        """Tokens used by a file block's header and separator"""
+        header_chars = 2 * len(f"File: {label}\n") + len(self.file_separator)
+        return header_chars // self.chars_per_token + 1
+
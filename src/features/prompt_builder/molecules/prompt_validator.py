@@ -1,6 +1,7 @@
 """Prompt validator molecule - validates prompt components"""
 import logging
 from typing import Dict, List, Tuple, Optional
+from ..atoms.template_compiler import TemplateCompiler
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,7 @@ class PromptValidator:
         self.max_file_size = 100_000  # 100K per file
         self.max_attachment_size = 10_000_000  # 10MB
         self.supported_image_types = {'image/jpeg', 'image/png', 'image/gif', 'image/webp'}
+        self.template_compiler = TemplateCompiler()
     
     def validate_system_prompt(self, prompt: str) -> Tuple[bool, Optional[str]]:
         """Validate system prompt"""
@@ -26,6 +28,15 @@ class PromptValidator:
         if prompt.count('{{') != prompt.count('}}'):
             return False, "Unmatched template variables in system prompt"
         
+        # Balanced but stray markers (e.g. JSON or Jinja in the prompt) are
+        # rendered verbatim, so they are only worth a warning
+        compiled = self.template_compiler.compile(prompt)
+        if compiled.unmatched:
+            logger.warning(
+                f"System prompt has {len(compiled.unmatched)} '{{{{'/'}}}}' markers outside "
+                f"placeholders (first at offset {compiled.unmatched[0]}); they are kept as text"
+            )
+        
         return True, None
     
     def validate_user_prompt(self, prompt: str) -> Tuple[bool, Optional[str]]:
@@ -38,7 +49,7 @@ class PromptValidator:
         
         return True, None
     
-    def validate_file_content(self, file_info: Dict[str, str]) -> Tuple[bool, Optional[str]]:
+    def validate_file_content(self, file_info: Dict[str, str], check_size: bool = True) -> Tuple[bool, Optional[str]]:
         """Validate file content for inclusion"""
         file_path = file_info.get('path', 'Unknown')
         content = file_info.get('content', '')
@@ -46,15 +57,29 @@ class PromptValidator:
         if not content:
             return False, f"File {file_path} has no content"
         
-        if len(content) > self.max_file_size:
-            return False, f"File {file_path} too large: {len(content)} characters (max: {self.max_file_size})"
+        if check_size:
+            valid, error = self.validate_file_size(file_path, len(content))
+            if not valid:
+                return False, error
         
-        # Check if file appears to be binary
-        if '\x00' in content:
+        # Check if file appears to be binary (reuse the flag from the read pass if present)
+        is_binary = file_info.get('is_binary')
+        if is_binary is None:
+            is_binary = '\x00' in content
+        if is_binary:
             return False, f"File {file_path} appears to be binary"
         
         return True, None
     
+    def validate_file_size(self, file_path: str, char_count: int) -> Tuple[bool, Optional[str]]:
+        """Validate a file's length in characters without needing its content"""
+        if char_count > self.max_file_size:
+            return False, (
+                f"File {file_path} too large: {char_count} characters (max: {self.max_file_size}); "
+                f"select a line range such as {file_path}:1-2000 instead"
+            )
+        return True, None
+    
     def validate_attachment(self, attachment: Dict[str, any]) -> Tuple[bool, Optional[str]]:
         """Validate attachment"""
         name = attachment.get('name', 'Unknown')
@@ -76,9 +101,14 @@ class PromptValidator:
         system_prompt: Optional[str] = None,
         user_prompt: Optional[str] = None,
         file_contents: Optional[List[Dict[str, str]]] = None,
-        attachments: Optional[List[Dict[str, any]]] = None
+        attachments: Optional[List[Dict[str, any]]] = None,
+        check_sizes: bool = True
     ) -> Tuple[bool, List[str]]:
-        """Validate complete prompt with all components"""
+        """Validate complete prompt with all components.
+        
+        check_sizes=False skips the per-file and total size limits, for
+        prompts that are split into token-budgeted parts afterwards.
+        """
         errors = []
         total_size = 0
         
@@ -99,7 +129,7 @@ class PromptValidator:
         # Validate file contents
         if file_contents:
             for file_info in file_contents:
-                valid, error = self.validate_file_content(file_info)
+                valid, error = self.validate_file_content(file_info, check_size=check_sizes)
                 if not valid:
                     errors.append(error)
                 else:
@@ -113,7 +143,7 @@ class PromptValidator:
                     errors.append(error)
         
         # Check total size
-        if total_size > self.max_prompt_length:
+        if check_sizes and total_size > self.max_prompt_length:
             errors.append(f"Total prompt size too large: {total_size} characters (max: {self.max_prompt_length})")
         
         return len(errors) == 0, errors
@@ -0,0 +1,111 @@
+"""Section memo molecule - reuses formatted file blocks between prompt builds"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SectionMemo:
+    """Caches formatted file blocks and the last joined FILE CONTENTS body.
+
+    Blocks are keyed by (path, content length, content hash, formatter
+    settings). The hash is the blake2b digest recorded by the file reader's
+    read pass; file infos without one fall back to Python's str hash. Keys
+    still come from reading every selected file, which the content cache
+    turns into a stat per file. When nothing changed the previous section
+    is returned as is. Otherwise the unchanged leading and trailing blocks
+    are sliced out of the previous section in one piece each, and only the
+    blocks between them are looked up or formatted and joined.
+    """
+
+    def __init__(self, max_chars: int = 64 * 1024 * 1024):
+        self.max_chars = max_chars
+        self.total_chars = 0
+        self.hits = 0
+        self.misses = 0
+        self._blocks: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._section_key: Optional[Tuple] = None
+        self._section: str = ""
+        self._block_lengths: List[int] = []
+
+    def render_file_section(self, formatter, file_contents: List[Dict[str, str]]) -> str:
+        """Return the joined file blocks for file_contents, re-formatting only changed files"""
+        settings = formatter.settings_key()
+        keys = [self._block_key(f, settings) for f in file_contents]
+        section_key = tuple(keys)
+        if section_key == self._section_key:
+            self.hits += len(keys)
+            return self._section
+
+        separator = formatter.file_separator
+        old_keys = self._section_key or ()
+        old_lengths = self._block_lengths
+        prefix = 0
+        limit = min(len(keys), len(old_keys))
+        while prefix < limit and keys[prefix] == old_keys[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and keys[-1 - suffix] == old_keys[-1 - suffix]:
+            suffix += 1
+
+        pieces = []
+        lengths = old_lengths[:prefix]
+        if prefix:
+            end = sum(lengths) + len(separator) * (prefix - 1)
+            pieces.append(self._section[:end])
+        for key, f in zip(keys[prefix:len(keys) - suffix], file_contents[prefix:len(keys) - suffix]):
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+                block = formatter.format_file_content(f.get('path', 'Unknown'), f.get('content', ''))
+                self._store(key, block)
+            else:
+                self.hits += 1
+                self._blocks.move_to_end(key)
+            pieces.append(block)
+            lengths.append(len(block))
+        if suffix:
+            suffix_lengths = old_lengths[len(old_lengths) - suffix:]
+            start = len(self._section) - sum(suffix_lengths) - len(separator) * (suffix - 1)
+            pieces.append(self._section[start:])
+            lengths.extend(suffix_lengths)
+        self.hits += prefix + suffix
+
+        self._section = separator.join(pieces)
+        self._section_key = section_key
+        self._block_lengths = lengths
+        return self._section
+
+    def clear(self):
+        """Drop all memoized sections"""
+        self._blocks.clear()
+        self.total_chars = 0
+        self._section_key = None
+        self._section = ""
+        self._block_lengths = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memo statistics"""
+        return {
+            "blocks": len(self._blocks),
+            "total_chars": self.total_chars,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _block_key(self, file_info: Dict[str, str], settings: Tuple) -> Tuple:
+        """Memo key for one file block, preferring the digest from the read pass"""
+        content = file_info.get('content', '')
+        content_hash = file_info.get('hash') or hash(content)
+        return (file_info.get('path', 'Unknown'), len(content), content_hash, settings)
+
+    def _store(self, key: Tuple, block: str):
+        """Store a block, evicting the least recently used ones over the size cap"""
+        if len(block) > self.max_chars:
+            return
+        self._blocks[key] = block
+        self.total_chars += len(block)
+        while self.total_chars > self.max_chars and self._blocks:
+            _, evicted = self._blocks.popitem(last=False)
+            self.total_chars -= len(evicted)
@@ -1,12 +1,25 @@
 """Prompt service organism - manages prompt building operations"""
 import logging
-from typing import Optional, List, Dict, Any, Tuple
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, Iterator, TextIO, Union, Callable
 from src.gateway import ServiceLocator, EventBus, Event
 from ..atoms.prompt_formatter import PromptFormatter
 from ..molecules.prompt_validator import PromptValidator
+from ..molecules.prompt_sink import PromptSink
+from ..molecules.prompt_file_writer import PromptFileWriter
+from ..molecules.section_memo import SectionMemo
+from ..molecules.outline_builder import OutlineBuilder
+from ..molecules.minify_stage import MinifyStage
+from ..molecules.dedup_stage import DedupStage
+from ..molecules.prefix_tracker import PrefixTracker
+from ..molecules.prompt_splitter import PartEntry, PromptSplitter
 
 logger = logging.getLogger(__name__)
 
+LAYOUTS = ("default", "cache-stable")
+
 
 # Prompt events
 class PromptBuiltEvent(Event):
@@ -28,6 +41,12 @@ class PromptService:
     def __init__(self):
         self.formatter = PromptFormatter()
         self.validator = PromptValidator()
+        self.section_memo = SectionMemo()
+        self.outline_builder = OutlineBuilder()
+        self.minify_stage = MinifyStage()
+        self.dedup_stage = DedupStage()
+        self.prefix_tracker = PrefixTracker()
+        self.splitter = PromptSplitter(self.formatter.file_separator)
         
         self.system_prompt: str = ""
         self.user_prompt: str = ""
@@ -36,6 +55,12 @@ class PromptService:
         # Cache for file contents and attachments
         self._file_contents_cache: List[Dict[str, str]] = []
         self._attachments_cache: List[Dict[str, Any]] = []
+        self._file_read_failures: Dict[str, str] = {}
+        self._dedup_report: Dict[str, Any] = {"exact": {}, "near": []}
+        # Template placeholders without a value, filled in while the last build renders
+        self._unresolved_variables: List[str] = []
+        # Files the last build only had a head/tail excerpt of
+        self._excerpted_files: List[str] = []
     
     def set_system_prompt(self, content: str) -> bool:
         """Set system prompt content"""
@@ -88,22 +113,171 @@ class PromptService:
         include_system_prompt: bool = True,
         include_user_prompt: bool = True,
         files_to_include: Optional[List[str]] = None,
-        directory_tree: Optional[str] = None
+        directory_tree: Optional[str] = None,
+        outline_files: Optional[List[str]] = None,
+        minify: bool = False,
+        dedup: bool = False,
+        near_dup_threshold: Optional[float] = None,
+        layout: str = "default"
     ) -> Tuple[bool, str, List[str]]:
         """Build the final prompt"""
-        errors = []
+        success, parts, errors = await self.iter_prompt(
+            include_files=include_files,
+            include_attachments=include_attachments,
+            include_system_prompt=include_system_prompt,
+            include_user_prompt=include_user_prompt,
+            files_to_include=files_to_include,
+            directory_tree=directory_tree,
+            outline_files=outline_files,
+            minify=minify,
+            dedup=dedup,
+            near_dup_threshold=near_dup_threshold,
+            layout=layout,
+            use_section_memo=True
+        )
+        if not success:
+            return False, "", errors
         
-        system = self.system_prompt if include_system_prompt else None
-        user = self.user_prompt if include_user_prompt else None
+        prompt = "".join(parts)
+        self._warn_unresolved()
         
-        file_contents = []
-        if include_files:
-            target_files = files_to_include if files_to_include is not None else await self._get_checked_files_from_service()
-            file_contents = await self._get_file_contents(target_files)
-
-        attachments = []
-        if include_attachments:
-            attachments = await self._get_attachments()
+        EventBus.emit(PromptBuiltEvent(mode=self.current_mode, total_length=len(prompt)))
+        logger.info(f"Prompt built successfully: {len(prompt)} characters")
+        return True, prompt, []
+    
+    async def stream_prompt(
+        self,
+        target: Union[str, Path, TextIO],
+        include_files: bool = True,
+        include_attachments: bool = True,
+        include_system_prompt: bool = True,
+        include_user_prompt: bool = True,
+        files_to_include: Optional[List[str]] = None,
+        directory_tree: Optional[str] = None,
+        outline_files: Optional[List[str]] = None,
+        minify: bool = False,
+        dedup: bool = False,
+        near_dup_threshold: Optional[float] = None,
+        layout: str = "default",
+        preview_length: int = 0
+    ) -> Tuple[bool, Dict[str, Any], List[str]]:
+        """Build the prompt straight into a text stream or file without joining it.
+        
+        Returns (success, sink stats, errors).
+        """
+        success, parts, errors = await self.iter_prompt(
+            include_files=include_files,
+            include_attachments=include_attachments,
+            include_system_prompt=include_system_prompt,
+            include_user_prompt=include_user_prompt,
+            files_to_include=files_to_include,
+            directory_tree=directory_tree,
+            outline_files=outline_files,
+            minify=minify,
+            dedup=dedup,
+            near_dup_threshold=near_dup_threshold,
+            layout=layout
+        )
+        if not success:
+            return False, {}, errors
+        
+        try:
+            if isinstance(target, (str, Path)):
+                with open(target, 'w', encoding='utf-8', newline='') as f:
+                    sink = PromptSink(f, preview_length=preview_length)
+                    sink.write_all(parts)
+            else:
+                sink = PromptSink(target, preview_length=preview_length)
+                sink.write_all(parts)
+        except OSError as e:
+            logger.error(f"Error writing prompt: {e}")
+            return False, {}, [f"Error writing prompt: {e}"]
+        self._warn_unresolved()
+        
+        EventBus.emit(PromptBuiltEvent(mode=self.current_mode, total_length=sink.char_count))
+        logger.info(f"Prompt streamed successfully: {sink.char_count} characters")
+        return True, sink.get_stats(), []
+    
+    async def export_prompt(
+        self,
+        output_dir: str,
+        file_name: Optional[str] = None,
+        compress: bool = False,
+        split_size: Optional[int] = None,
+        preview_length: int = 2000,
+        **build_options
+    ) -> Tuple[bool, Dict[str, Any], List[str]]:
+        """Stream the prompt into file(s) under output_dir.
+        
+        Returns (success, export info with paths/size/preview, errors).
+        """
+        output_path = Path(output_dir)
+        if not output_path.is_dir():
+            return False, {}, [f"Output directory does not exist: {output_dir}"]
+        
+        if not file_name:
+            file_name = f"prompt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        
+        writer = PromptFileWriter(output_path / file_name, compress=compress, max_part_bytes=split_size)
+        try:
+            success, stats, errors = await self.stream_prompt(
+                writer, preview_length=preview_length, **build_options
+            )
+        finally:
+            writer.close()
+        
+        if not success:
+            for path in writer.paths:
+                path.unlink(missing_ok=True)
+            return False, {}, errors
+        
+        return True, {
+            "paths": [str(p) for p in writer.paths],
+            "size": writer.total_bytes,
+            **stats
+        }, []
+    
+    async def iter_prompt(
+        self,
+        include_files: bool = True,
+        include_attachments: bool = True,
+        include_system_prompt: bool = True,
+        include_user_prompt: bool = True,
+        files_to_include: Optional[List[str]] = None,
+        directory_tree: Optional[str] = None,
+        outline_files: Optional[List[str]] = None,
+        minify: bool = False,
+        dedup: bool = False,
+        near_dup_threshold: Optional[float] = None,
+        layout: str = "default",
+        use_section_memo: bool = False
+    ) -> Tuple[bool, Iterator[str], List[str]]:
+        """Gather and validate prompt inputs, then return a generator of prompt pieces.
+        
+        With use_section_memo the file blocks are rendered through the section
+        memo, which is worth it when the prompt is joined into one string anyway.
+        dedup turns byte-identical files into aliases of the first copy;
+        near_dup_threshold (0-1) collapses near duplicates into diffs.
+        The "cache-stable" layout sorts files by path and moves the user
+        prompt to the end; see get_prefix_stats for the resulting prefix.
+        """
+        errors = []
+        self._unresolved_variables = []
+        if layout not in LAYOUTS:
+            return False, iter(()), [f"Invalid layout: {layout}"]
+        
+        system, user, file_contents, attachments = await self._gather_inputs(
+            include_files=include_files,
+            include_attachments=include_attachments,
+            include_system_prompt=include_system_prompt,
+            include_user_prompt=include_user_prompt,
+            files_to_include=files_to_include,
+            outline_files=outline_files,
+            minify=minify,
+            dedup=dedup,
+            near_dup_threshold=near_dup_threshold,
+            sort_files=layout == "cache-stable"
+        )
         
         valid, validation_errors = self.validator.validate_complete_prompt(
             system, user, file_contents, attachments
@@ -111,38 +285,384 @@ class PromptService:
         if not valid:
             errors.extend(validation_errors)
             EventBus.emit(PromptValidationFailedEvent(errors=errors))
-            return False, "", errors
+            return False, iter(()), errors
         
-        # Build prompt based on mode
-        if self.current_mode == "enhanced":
-            prompt = self.formatter.build_enhanced_prompt(
+        file_section = None
+        # The cache-stable layout keeps per-file pieces so the prefix tracker
+        # can tell which file blocks changed
+        if use_section_memo and file_contents and layout == "default":
+            file_section = self.section_memo.render_file_section(self.formatter, file_contents)
+        
+        # Build prompt based on layout and mode
+        if layout == "cache-stable":
+            content = self._iter_cache_stable(
+                system_prompt=system if self.current_mode == "enhanced" else None,
+                user_prompt=user,
+                file_contents=file_contents,
+                directory_tree=directory_tree,
+                attachments=attachments,
+                file_section=file_section
+            )
+            if self.current_mode == "enhanced":
+                parts = content
+            else:
+                parts = self.formatter.iter_metaprompt(
+                    system or "{{CONTENT}}", content, unresolved=self._unresolved_variables
+                )
+        elif self.current_mode == "enhanced":
+            parts = self.formatter.iter_enhanced_prompt(
                 system_prompt=system,
                 user_prompt=user,
                 file_contents=file_contents,
                 directory_tree=directory_tree,
-                attachments=attachments
+                attachments=attachments,
+                file_section=file_section
             )
         else:
-            base_content = self.formatter.build_enhanced_prompt(
+            base_parts = self.formatter.iter_enhanced_prompt(
                 system_prompt=None,
                 user_prompt=user,
                 file_contents=file_contents,
                 directory_tree=directory_tree,
-                attachments=attachments
+                attachments=attachments,
+                file_section=file_section
             )
             template = system or "{{CONTENT}}"
-            prompt = self.formatter.build_metaprompt(template, base_content)
+            parts = self.formatter.iter_metaprompt(template, base_parts, unresolved=self._unresolved_variables)
         
-        EventBus.emit(PromptBuiltEvent(mode=self.current_mode, total_length=len(prompt)))
-        logger.info(f"Prompt built successfully: {len(prompt)} characters")
-        return True, prompt, []
+        return True, parts, []
     
-    async def get_prompt_preview(self, max_length: int = 1000) -> str:
-        """Get a preview of the prompt"""
-        success, prompt, errors = await self.build_prompt()
+    async def iter_split_prompts(
+        self,
+        max_tokens: int,
+        model: str = "gpt-4",
+        include_files: bool = True,
+        include_attachments: bool = True,
+        include_system_prompt: bool = True,
+        include_user_prompt: bool = True,
+        files_to_include: Optional[List[str]] = None,
+        directory_tree: Optional[str] = None,
+        outline_files: Optional[List[str]] = None,
+        minify: bool = False,
+        dedup: bool = False,
+        near_dup_threshold: Optional[float] = None
+    ) -> Tuple[bool, Iterator[Iterator[str]], Dict[str, Any], List[str]]:
+        """Plan a prompt split into parts of at most max_tokens and return a generator of parts.
+        
+        Every part repeats the system and user prompt; the directory tree and
+        attachments go into the first part only. Each yielded part is itself
+        a generator of prompt pieces. Returns (success, parts, plan info, errors).
+        """
+        self._unresolved_variables = []
+        system, user, file_contents, attachments = await self._gather_inputs(
+            include_files=include_files,
+            include_attachments=include_attachments,
+            include_system_prompt=include_system_prompt,
+            include_user_prompt=include_user_prompt,
+            files_to_include=files_to_include,
+            outline_files=outline_files,
+            minify=minify,
+            dedup=dedup,
+            near_dup_threshold=near_dup_threshold
+        )
+        
+        # Size limits do not apply: the token budget bounds every part instead
+        valid, errors = self.validator.validate_complete_prompt(
+            system, user, file_contents, attachments, check_sizes=False
+        )
+        if not valid:
+            EventBus.emit(PromptValidationFailedEvent(errors=errors))
+            return False, iter(()), {}, errors
+        
+        count_tokens = self._token_counter(model)
+        header_tokens = (
+            count_tokens("<system_prompt>", system or "")
+            + count_tokens("<user_prompt>", user or "")
+            + 32  # Part marker and section headers
+        )
+        part_budget = max_tokens - header_tokens
+        if part_budget <= 0:
+            return False, iter(()), {}, [
+                f"Token budget {max_tokens} is too small for the shared header ({header_tokens} tokens)"
+            ]
+        
+        first_part_reserve = count_tokens("<directory_tree>", directory_tree or "")
+        for attachment in attachments:
+            first_part_reserve += count_tokens(
+                f"<attachment:{attachment.get('name', '')}>", self.formatter.format_attachment(attachment)
+            )
+        if first_part_reserve >= part_budget:
+            return False, iter(()), {}, [
+                f"Token budget {max_tokens} is too small for the directory tree and attachments"
+            ]
+        
+        file_tokens = [
+            count_tokens(f['path'], f['content'], f.get('hash'))
+            for f in file_contents
+        ]
+        plan = self.splitter.plan(file_contents, file_tokens, part_budget, first_part_reserve) or [[]]
+        
+        info = {
+            "part_count": len(plan),
+            "max_tokens": max_tokens,
+            "header_tokens": header_tokens,
+            "parts": [
+                [f['path'] for f in self._describe_part(file_contents, part)]
+                for part in plan
+            ]
+        }
+        logger.info(f"Prompt split into {len(plan)} parts of at most {max_tokens} tokens")
+        
+        parts = self._iter_split_parts(plan, system, user, file_contents, directory_tree, attachments)
+        return True, parts, info, []
+    
+    async def export_split_prompts(
+        self,
+        output_dir: str,
+        max_tokens: int,
+        file_name: Optional[str] = None,
+        compress: bool = False,
+        **build_options
+    ) -> Tuple[bool, Dict[str, Any], List[str]]:
+        """Write each part of a split prompt to its own file under output_dir.
+        
+        Parts are streamed one after another, so only the part being written
+        is ever rendered.
+        """
+        output_path = Path(output_dir)
+        if not output_path.is_dir():
+            return False, {}, [f"Output directory does not exist: {output_dir}"]
+        
+        success, parts, info, errors = await self.iter_split_prompts(max_tokens, **build_options)
         if not success:
+            return False, {}, errors
+        
+        if not file_name:
+            file_name = f"prompt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        stem = Path(file_name)
+        
+        written: List[Path] = []
+        part_stats = []
+        try:
+            for number, pieces in enumerate(parts, 1):
+                part_path = output_path / f"{stem.stem}.part{number:03d}{stem.suffix or '.txt'}"
+                with PromptFileWriter(part_path, compress=compress) as writer:
+                    sink = PromptSink(writer)
+                    sink.write_all(pieces)
+                written.extend(writer.paths)
+                part_stats.append({"path": str(writer.paths[0]), "size": writer.total_bytes, **sink.get_stats()})
+        except OSError as e:
+            logger.error(f"Error writing split prompt: {e}")
+            for path in written:
+                path.unlink(missing_ok=True)
+            return False, {}, [f"Error writing prompt: {e}"]
+        self._warn_unresolved()
+        
+        return True, {**info, "paths": [str(p) for p in written], "part_stats": part_stats}, []
+    
+    def _iter_split_parts(
+        self,
+        plan: List[List[Tuple[int, Optional[Tuple[int, int]]]]],
+        system: Optional[str],
+        user: Optional[str],
+        file_contents: List[Dict[str, Any]],
+        directory_tree: Optional[str],
+        attachments: List[Dict[str, Any]]
+    ) -> Iterator[Iterator[str]]:
+        """Yield one piece generator per planned part"""
+        total = len(plan)
+        for number, part in enumerate(plan, 1):
+            first = number == 1
+            files = self.splitter.iter_part_files(file_contents, part)
+            if self.current_mode == "enhanced":
+                body = self.formatter.iter_enhanced_prompt(
+                    system_prompt=system,
+                    user_prompt=user,
+                    file_contents=files,
+                    directory_tree=directory_tree if first else None,
+                    attachments=attachments if first else None
+                )
+            else:
+                base_parts = self.formatter.iter_enhanced_prompt(
+                    system_prompt=None,
+                    user_prompt=user,
+                    file_contents=files,
+                    directory_tree=directory_tree if first else None,
+                    attachments=attachments if first else None
+                )
+                body = self.formatter.iter_metaprompt(
+                    system or "{{CONTENT}}", base_parts, unresolved=self._unresolved_variables
+                )
+            yield self.formatter.iter_split_part(number, total, body)
+    
+    def _describe_part(
+        self,
+        file_contents: List[Dict[str, Any]],
+        part: List[PartEntry]
+    ) -> Iterator[Dict[str, str]]:
+        """File labels of a planned part without slicing any content"""
+        for index, line_range in part:
+            path = file_contents[index].get('path', 'Unknown')
+            if line_range is None:
+                yield {"path": path}
+            else:
+                yield {"path": f"{path}:{line_range[0] + 1}-{line_range[1]}"}
+    
+    def _token_counter(self, model: str) -> Callable[..., int]:
+        """Token counter backed by the token service, or a rough estimate without it"""
+        try:
+            token_service = ServiceLocator.get("tokens")
+        except KeyError:
+            token_service = None
+        
+        def count(label: str, text: str, content_hash: Optional[str] = None) -> int:
+            if not text:
+                return 0
+            if token_service is None:
+                return self.formatter.estimate_token_count(text)
+            return token_service.count_content_tokens(label, text, model, content_hash=content_hash)
+        
+        return count
+    
+    def _iter_cache_stable(
+        self,
+        system_prompt: Optional[str],
+        user_prompt: Optional[str],
+        file_contents: List[Dict[str, Any]],
+        directory_tree: Optional[str],
+        attachments: List[Dict[str, Any]],
+        file_section: Optional[str]
+    ) -> Iterator[str]:
+        """Yield the stable prefix through the prefix tracker, then the user prompt"""
+        prefix = self.formatter.iter_stable_prefix(
+            system_prompt=system_prompt,
+            file_contents=file_contents,
+            directory_tree=directory_tree,
+            attachments=attachments,
+            file_section=file_section
+        )
+        yield from self.prefix_tracker.observe(prefix)
+        yield from self.formatter.iter_volatile_suffix(
+            user_prompt, after_prefix=self.prefix_tracker.last_stats.get("prefix_chars", 0) > 0
+        )
+    
+    def get_unresolved_variables(self) -> List[str]:
+        """Template placeholders the last build left unfilled (complete once it has been consumed)"""
+        return list(self._unresolved_variables)
+    
+    def get_file_contents(self) -> List[Dict[str, Any]]:
+        """File dicts read for the last build (path, content and read-pass metadata)"""
+        return list(self._file_contents_cache)
+    
+    def get_excerpted_files(self) -> List[str]:
+        """Files the last build included as a head/tail excerpt instead of in full"""
+        return list(self._excerpted_files)
+    
+    def _warn_unresolved(self):
+        """Log the placeholders the finished build left unfilled"""
+        if self._unresolved_variables:
+            logger.warning(f"Unresolved template variables: {', '.join(self._unresolved_variables)}")
+    
+    def get_prefix_stats(self) -> Dict[str, Any]:
+        """Prefix hash and unchanged prefix size of the last cache-stable build"""
+        return dict(self.prefix_tracker.last_stats)
+    
+    async def get_prompt_preview(self, max_length: int = 1000) -> str:
+        """Get a preview of the prompt, reading files only until max_length is reached.
+        
+        The checks a build would fail on run first (prompts, attachments and
+        file sizes, the latter from stats and read-pass records), so an
+        invalid selection shows the build error instead of a preview.
+        """
+        system = self.system_prompt or None
+        user = self.user_prompt or None
+        target_files = await self._get_checked_files_from_service()
+        attachments = await self._get_attachments()
+        
+        _, errors = self.validator.validate_complete_prompt(system, user, None, attachments)
+        errors.extend(self._selection_size_errors(target_files, len(system or "") + len(user or "")))
+        if errors:
             return f"Error building prompt: {', '.join(errors)}"
-        return self.formatter.truncate_prompt(prompt, max_length)
+        
+        file_contents = self._iter_file_contents(target_files)
+        if self.current_mode == "enhanced":
+            parts = self.formatter.iter_enhanced_prompt(
+                system_prompt=system,
+                user_prompt=user,
+                file_contents=file_contents,
+                attachments=attachments
+            )
+        else:
+            base_parts = self.formatter.iter_enhanced_prompt(
+                user_prompt=user,
+                file_contents=file_contents,
+                attachments=attachments
+            )
+            parts = self.formatter.iter_metaprompt(system or "{{CONTENT}}", base_parts)
+        
+        # Collect one character past max_length so truncation matches the full build
+        pieces = []
+        length = 0
+        for piece in parts:
+            pieces.append(piece[:max_length + 1 - length])
+            length += len(pieces[-1])
+            if length > max_length:
+                break
+        parts.close()
+        
+        preview = "".join(pieces)
+        if length > max_length:
+            preview = preview[:max_length - 3] + "..."
+        return preview
+    
+    def _selection_size_errors(self, file_paths: List[str], prompt_chars: int) -> List[str]:
+        """File and total size errors a build of file_paths would report, mostly without reading.
+        
+        A read-pass record that matches the file's current stat gives its
+        character count. Otherwise the byte size is an upper bound, and a
+        file is only read when that bound alone would fail a limit.
+        Unreadable and binary files are skipped, as builds skip them.
+        """
+        try:
+            file_service = ServiceLocator.get("file_system")
+        except KeyError:
+            return []
+        
+        counts: Dict[str, int] = {}
+        bounded: List[str] = []
+        for path in file_paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            record = file_service.get_file_record(path)
+            if record and record.mtime_ns == stat.st_mtime_ns and record.size == stat.st_size:
+                if not record.is_binary:
+                    counts[path] = record.char_count
+            elif stat.st_size > self.validator.max_file_size:
+                content = file_service.get_file_content(path)
+                if content:
+                    counts[path] = len(content)
+            else:
+                counts[path] = stat.st_size
+                bounded.append(path)
+        
+        if prompt_chars + sum(counts.values()) > self.validator.max_prompt_length:
+            for path in bounded:
+                content = file_service.get_file_content(path)
+                counts[path] = len(content) if content else 0
+        
+        errors = []
+        total = prompt_chars
+        for path, chars in counts.items():
+            valid, error = self.validator.validate_file_size(path, chars)
+            if valid:
+                total += chars
+            else:
+                errors.append(error)
+        if total > self.validator.max_prompt_length:
+            errors.append(f"Total prompt size too large: {total} characters (max: {self.validator.max_prompt_length})")
+        return errors
     
     def get_prompt_components(self) -> Dict[str, Any]:
         """Get all prompt components"""
@@ -151,7 +671,30 @@ class PromptService:
             "user_prompt": self.user_prompt,
             "mode": self.current_mode,
             "file_count": len(self._file_contents_cache),
-            "attachment_count": len(self._attachments_cache)
+            "attachment_count": len(self._attachments_cache),
+            "read_failures": dict(self._file_read_failures),
+            "duplicates": self._dedup_report
+        }
+    
+    async def find_duplicate_files(
+        self,
+        file_paths: Optional[List[str]] = None,
+        threshold: float = 0.85
+    ) -> Dict[str, Any]:
+        """Report exact and near-duplicate files without changing any prompt"""
+        target_files = file_paths if file_paths is not None else await self._get_checked_files_from_service()
+        file_contents = await self._get_file_contents(target_files)
+        _, exact = self.dedup_stage.dedup_exact(file_contents)
+        near = self.dedup_stage.find_near_duplicates(file_contents, threshold)
+        aliased = {path for paths in exact.values() for path in paths}
+        return {
+            "exact": exact,
+            "near": [
+                {"canonical": a, "duplicate": b, "similarity": round(sim, 3)}
+                for a, b, sim in near
+                if a not in aliased and b not in aliased
+            ],
+            "file_count": len(file_contents)
         }
     
     def clear_prompts(self, clear_system: bool = False, clear_user: bool = True):
@@ -172,6 +715,47 @@ class PromptService:
             attachments=self._attachments_cache
         )
     
+    async def _gather_inputs(
+        self,
+        include_files: bool,
+        include_attachments: bool,
+        include_system_prompt: bool,
+        include_user_prompt: bool,
+        files_to_include: Optional[List[str]],
+        outline_files: Optional[List[str]],
+        minify: bool,
+        dedup: bool,
+        near_dup_threshold: Optional[float],
+        sort_files: bool = False
+    ) -> Tuple[Optional[str], Optional[str], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Collect prompts, file contents (through the optional stages) and attachments"""
+        system = self.system_prompt if include_system_prompt else None
+        user = self.user_prompt if include_user_prompt else None
+        # A build without dedup must not keep reporting the previous build's duplicates
+        self._dedup_report = {"exact": {}, "near": []}
+        self._excerpted_files = []
+        
+        file_contents = []
+        if include_files:
+            target_files = files_to_include if files_to_include is not None else await self._get_checked_files_from_service()
+            file_contents = await self._get_file_contents(target_files)
+            if sort_files:
+                file_contents = sorted(file_contents, key=lambda f: f.get('path', ''))
+            if outline_files:
+                file_contents = await self.outline_builder.apply(file_contents, outline_files)
+            if minify:
+                file_contents = self.minify_stage.apply(file_contents)
+            if dedup or near_dup_threshold is not None:
+                file_contents, self._dedup_report = self.dedup_stage.apply(
+                    file_contents, exact=dedup, near_threshold=near_dup_threshold
+                )
+        
+        attachments = []
+        if include_attachments:
+            attachments = await self._get_attachments()
+        
+        return system, user, file_contents, attachments
+    
     async def _get_checked_files_from_service(self) -> List[str]:
         """Get only file paths from all checked items in the file service."""
         try:
@@ -192,11 +776,15 @@ class PromptService:
             if not file_service:
                 return []
             
-            file_contents = []
-            for file_path in file_paths:
-                content = file_service.get_file_content(file_path)
-                if content:
-                    file_contents.append({'path': file_path, 'content': content})
+            result = await file_service.read_files(file_paths)
+            file_contents = [f for f in result["files"] if f["content"]]
+            
+            self._file_read_failures = result["failures"]
+            if self._file_read_failures:
+                logger.warning(f"Could not read {len(self._file_read_failures)} of {len(file_paths)} files")
+            self._excerpted_files = [f["path"] for f in file_contents if f.get("is_excerpt")]
+            if self._excerpted_files:
+                logger.warning(f"Included {len(self._excerpted_files)} large files as head/tail excerpts")
             
             self._file_contents_cache = file_contents
             return file_contents
@@ -204,6 +792,16 @@ class PromptService:
             logger.error(f"Error getting file contents: {e}")
             return []
 
+    def _iter_file_contents(self, file_paths: List[str]) -> Iterator[Dict[str, str]]:
+        """Read files one at a time as the consumer asks for them"""
+        if not file_paths:
+            return
+        file_service = ServiceLocator.get("file_system")
+        for file_path in file_paths:
+            content = file_service.get_file_content(file_path)
+            if content:
+                yield {"path": file_path, "content": content}
+
     async def _get_attachments(self) -> List[Dict[str, Any]]:
         """Get attachment information"""
         try:
@@ -212,5 +810,4 @@ class PromptService:
             logger.error(f"Error getting attachments: {e}")
             return []
 
-from pathlib import Path
 import asyncio
@@ -53,6 +53,34 @@ class ClaudeTokenizer:
             logger.error(f"Error calling Claude tokenization API: {e}")
             return self._estimate_tokens(text)
     
+    def has_api_key(self) -> bool:
+        """Check if an API key is configured"""
+        return bool(self._api_key)
+    
+    def create_async_client(self) -> httpx.AsyncClient:
+        """Create an async HTTP client for batched remote counting"""
+        return httpx.AsyncClient(timeout=30.0)
+    
+    async def count_tokens_async(self, text: str, model: str, client: httpx.AsyncClient) -> int:
+        """Count tokens using the Claude API without blocking; raises on failure"""
+        if not self._api_key:
+            raise RuntimeError("No Claude API key available")
+        
+        response = await client.post(
+            self.api_endpoint,
+            headers={
+                "X-API-Key": self._api_key,
+                "Content-Type": "application/json",
+                "anthropic-version": "2023-06-01"
+            },
+            json={
+                "text": text,
+                "model": model
+            }
+        )
+        response.raise_for_status()
+        return response.json()["token_count"]
+    
     def _estimate_tokens(self, text: str) -> int:
         """Estimate tokens when API is not available"""
         # Claude uses roughly similar tokenization to GPT
@@ -1,4 +1,5 @@
 """Gemini tokenizer atom - calculates tokens for Google models"""
+import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 import google.generativeai as genai
@@ -42,6 +43,23 @@ class GeminiTokenizer:
             logger.error(f"Error counting Gemini tokens: {e}")
             return self._estimate_tokens(text)
     
+    def has_api_key(self) -> bool:
+        """Check if an API key is configured"""
+        return bool(self._api_key)
+    
+    async def count_tokens_async(self, text: str, model: str = "gemini-pro") -> int:
+        """Count tokens using the Gemini API off the event loop; raises on failure"""
+        if not self._api_key:
+            raise RuntimeError("No Gemini API key available")
+        
+        if model not in self._model_cache:
+            self._model_cache[model] = genai.GenerativeModel(model)
+        model_instance = self._model_cache[model]
+        
+        # The SDK call is blocking, so run it in a worker thread
+        token_count = await asyncio.to_thread(model_instance.count_tokens, text)
+        return token_count.total_tokens
+    
     def count_multimodal_tokens(
         self,
         text: str,
@@ -22,9 +22,13 @@ class GPTTokenizer:
             "text-davinci-002": "p50k_base",
         }
     
+    def get_encoding_name(self, model: str) -> str:
+        """Get the name of the encoding used by a model"""
+        return self._model_to_encoding.get(model, "cl100k_base")
+    
     def get_encoding(self, model: str) -> Optional[tiktoken.Encoding]:
         """Get encoding for a specific model"""
-        encoding_name = self._model_to_encoding.get(model, "cl100k_base")
+        encoding_name = self.get_encoding_name(model)
         
         if encoding_name not in self._encodings:
             try:
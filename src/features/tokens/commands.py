@@ -9,6 +9,12 @@ class CalculateTokens(Command):
     model: str = "gpt-4"  # gpt-4, claude, gemini
 
 
+class CalculateRemoteTokens(Command):
+    """Command to count tokens with the provider API (cached, with local fallback)"""
+    texts: List[str]
+    model: str = "gemini-pro"
+
+
 class CalculatePromptTokens(Command):
     """Command to calculate tokens for complete prompt"""
     include_files: bool = True
@@ -18,12 +24,24 @@ class CalculatePromptTokens(Command):
     model: str = "gpt-4"
 
 
+class CalculateMultiModelTokens(Command):
+    """Command to compare token counts across models in one pass per encoding"""
+    text: Optional[str] = None  # Defaults to the current built prompt
+    models: Optional[List[str]] = None  # Defaults to all models with known limits
+
+
 class CalculateFileTokens(Command):
     """Command to calculate tokens for a file"""
     file_path: str
     model: str = "gpt-4"
 
 
+class EstimateTokens(Command):
+    """Command to get a fast sampled token estimate with error bounds"""
+    file_paths: Optional[List[str]] = None  # Defaults to checked files
+    model: str = "gpt-4"
+
+
 class CalculateMultimodalTokens(Command):
     """Command to calculate tokens for multimodal content (Gemini)"""
     text_content: str
@@ -5,7 +5,8 @@ from src.gateway import EventBus, ServiceLocator
 from .commands import (
     CalculateTokens, CalculatePromptTokens, CalculateFileTokens,
     CalculateMultimodalTokens, GetTokenUsage, GetTokenLimits,
-    GetModelInfo
+    GetModelInfo, EstimateTokens, CalculateRemoteTokens,
+    CalculateMultiModelTokens
 )
 from .organisms.token_service import TokenService
 
@@ -31,6 +32,15 @@ async def handle_calculate_tokens(cmd: CalculateTokens):
     }
 
 
+@TokensCommandBus.register(CalculateRemoteTokens)
+async def handle_calculate_remote_tokens(cmd: CalculateRemoteTokens):
+    """Count tokens with the provider API"""
+    service = ServiceLocator.get("tokens")
+    result = await service.calculate_remote_tokens(cmd.texts, cmd.model)
+    
+    return result
+
+
 @TokensCommandBus.register(CalculatePromptTokens)
 async def handle_calculate_prompt_tokens(cmd: CalculatePromptTokens):
     """Calculate tokens for complete prompt"""
@@ -46,6 +56,21 @@ async def handle_calculate_prompt_tokens(cmd: CalculatePromptTokens):
     return result
 
 
+@TokensCommandBus.register(CalculateMultiModelTokens)
+async def handle_calculate_multi_model_tokens(cmd: CalculateMultiModelTokens):
+    """Compare token counts across models"""
+    service = ServiceLocator.get("tokens")
+    
+    text = cmd.text
+    if text is None:
+        prompt_service = ServiceLocator.get("prompt_builder")
+        success, text, errors = await prompt_service.build_prompt()
+        if not success:
+            return {"error": f"Failed to build prompt: {errors}", "models": {}}
+    
+    return service.calculate_multi_model_report(text, cmd.models)
+
+
 @TokensCommandBus.register(CalculateFileTokens)
 async def handle_calculate_file_tokens(cmd: CalculateFileTokens):
     """Calculate tokens for a file"""
@@ -55,6 +80,20 @@ async def handle_calculate_file_tokens(cmd: CalculateFileTokens):
     return result
 
 
+@TokensCommandBus.register(EstimateTokens)
+async def handle_estimate_tokens(cmd: EstimateTokens):
+    """Get a fast sampled token estimate with error bounds"""
+    service = ServiceLocator.get("tokens")
+    
+    file_paths = cmd.file_paths
+    if file_paths is None:
+        from pathlib import Path
+        file_service = ServiceLocator.get("file_system")
+        file_paths = [p for p in file_service.get_checked_paths() if not Path(p).is_dir()]
+    
+    return service.estimate_file_tokens(file_paths, cmd.model)
+
+
 @TokensCommandBus.register(CalculateMultimodalTokens)
 async def handle_calculate_multimodal_tokens(cmd: CalculateMultimodalTokens):
     """Calculate tokens for multimodal content"""
@@ -0,0 +1,198 @@
+"""Remote token counter molecule - cached, coalesced async remote token counting"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def _no_session():
+    """Default session factory for remote counters that need no shared client"""
+    yield None
+
+
+class RemoteTokenCounter:
+    """Async layer in front of a provider's remote token counting API.
+
+    - Results are cached by a hash of (model, text).
+    - Identical texts requested concurrently share a single remote call,
+      even across the per-command event loops used by the UI bridge.
+    - At most max_concurrency remote calls run at once per event loop.
+    - A slow or failing remote call falls back to the local count scaled by a
+      calibration factor learned from earlier remote results. After a failure
+      the remote API is skipped for cooldown seconds.
+    - The local count of a text is computed at most once and shared between
+      calibration and the fallback estimate.
+    """
+
+    def __init__(
+        self,
+        remote_count: Callable[[str, str, Any], Awaitable[int]],
+        local_count: Callable[[str], int],
+        session_factory: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+        max_concurrency: int = 4,
+        timeout: float = 3.0,
+        cooldown: float = 30.0,
+        max_cache_entries: int = 4096
+    ):
+        self.remote_count = remote_count
+        self.local_count = local_count
+        self.session_factory = session_factory or _no_session
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self.max_cache_entries = max_cache_entries
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._local_cache: "OrderedDict[str, int]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._calibration: Dict[str, float] = {}
+        self._remote_disabled_until = 0.0
+        self.stats = {"cache_hits": 0, "remote_calls": 0, "coalesced": 0, "fallbacks": 0}
+
+    async def count(self, text: str, model: str) -> Dict[str, Any]:
+        """Count tokens for a single text"""
+        results = await self.count_many([text], model)
+        return results[0]
+
+    async def count_many(self, texts: List[str], model: str) -> List[Dict[str, Any]]:
+        """Count tokens for several texts concurrently, preserving order"""
+        async with self.session_factory() as session:
+            return list(await asyncio.gather(
+                *(self._count_one(text, model, session) for text in texts)
+            ))
+
+    def cache_key(self, text: str, model: str) -> str:
+        """Hash key for a (model, text) pair"""
+        digest = hashlib.sha256(text.encode('utf-8', errors='surrogatepass'))
+        return f"{model}:{digest.hexdigest()}"
+
+    def estimate(self, text: str, model: str, key: Optional[str] = None) -> int:
+        """Local token count scaled by the learned calibration for the model"""
+        factor = self._calibration.get(model, 1.0)
+        local = self._local_tokens(key or self.cache_key(text, model), text)
+        return int(round(local * factor))
+
+    def clear_cache(self):
+        """Drop all cached remote results and local counts"""
+        with self._lock:
+            self._cache.clear()
+            self._local_cache.clear()
+
+    def _local_tokens(self, key: str, text: str) -> int:
+        """Local token count for a text, memoized under its cache key"""
+        with self._lock:
+            cached = self._local_cache.get(key)
+            if cached is not None:
+                self._local_cache.move_to_end(key)
+                return cached
+
+        tokens = self.local_count(text)
+        with self._lock:
+            self._local_cache[key] = tokens
+            while len(self._local_cache) > self.max_cache_entries:
+                self._local_cache.popitem(last=False)
+        return tokens
+
+    async def _count_one(self, text: str, model: str, session: Any) -> Dict[str, Any]:
+        """Resolve one text through cache, in-flight calls, remote API or fallback"""
+        if not text:
+            return {"tokens": 0, "source": "empty"}
+
+        key = self.cache_key(text, model)
+        leader = False
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return {"tokens": cached, "source": "cache"}
+
+            remote_disabled = time.monotonic() < self._remote_disabled_until
+            if remote_disabled:
+                self.stats["fallbacks"] += 1
+                future = None
+            else:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    leader = True
+                else:
+                    self.stats["coalesced"] += 1
+
+        if remote_disabled:
+            return {"tokens": self.estimate(text, model, key), "source": "estimate"}
+
+        if leader:
+            await self._run_remote(future, key, text, model, session)
+
+        try:
+            tokens = await asyncio.wrap_future(future)
+            return {"tokens": tokens, "source": "remote"}
+        except Exception:
+            with self._lock:
+                self.stats["fallbacks"] += 1
+            return {"tokens": self.estimate(text, model, key), "source": "estimate"}
+
+    async def _run_remote(self, future: Future, key: str, text: str, model: str, session: Any):
+        """Perform the remote call for a leader request and publish its result"""
+        try:
+            async with self._get_semaphore():
+                with self._lock:
+                    self.stats["remote_calls"] += 1
+                tokens = await asyncio.wait_for(
+                    self.remote_count(text, model, session),
+                    timeout=self.timeout
+                )
+        except asyncio.CancelledError:
+            # Followers were not cancelled themselves: hand them an ordinary
+            # error so they fall back to the estimate, then propagate
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(RuntimeError("Remote token count was cancelled"))
+            raise
+        except Exception as e:
+            logger.warning(f"Remote token count failed for {model}, using local estimate: {e!r}")
+            with self._lock:
+                self._remote_disabled_until = time.monotonic() + self.cooldown
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._cache[key] = tokens
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+            self._inflight.pop(key, None)
+        self._calibrate(model, tokens, self._local_tokens(key, text))
+        future.set_result(tokens)
+
+    def _calibrate(self, model: str, remote_tokens: int, local: int):
+        """Update the remote/local ratio used by fallback estimates"""
+        if local <= 0 or remote_tokens <= 0:
+            return
+        ratio = remote_tokens / local
+        previous = self._calibration.get(model)
+        # Exponential moving average keeps the factor stable across texts
+        self._calibration[model] = ratio if previous is None else previous * 0.8 + ratio * 0.2
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
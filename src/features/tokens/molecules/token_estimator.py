@@ -0,0 +1,288 @@
+"""Token estimator molecule - sampling-based token estimates with error bounds"""
+import logging
+import math
+import os
+import random
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+
+# Fallback tokens-per-byte ratios used until a stratum has been sampled.
+# Hangul takes 3 UTF-8 bytes per syllable but often one token or more,
+# which is why a flat len(text) // 4 badly undercounts Korean text.
+DEFAULT_TOKENS_PER_BYTE = {
+    "latin": 0.25,
+    "hangul": 0.40,
+    "cjk": 0.35,
+    "minified": 0.33,
+}
+
+
+def classify_script(text: str) -> str:
+    """Classify a text sample as 'hangul', 'cjk', 'minified' or 'latin'"""
+    if not text:
+        return "latin"
+
+    hangul = 0
+    cjk = 0
+    for ch in text:
+        code = ord(ch)
+        if code < 0x1100:
+            continue
+        if 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+            hangul += 1
+        elif 0x4E00 <= code <= 0x9FFF or 0x3040 <= code <= 0x30FF:
+            cjk += 1
+
+    # A few percent of wide characters already dominates the token count
+    if hangul and hangul * 20 >= len(text):
+        return "hangul"
+    if cjk and cjk * 20 >= len(text):
+        return "cjk"
+
+    lines = text.count("\n") + 1
+    if len(text) / lines > 300:
+        return "minified"
+    return "latin"
+
+
+class StratumStats:
+    """Running tokens-per-byte statistics for one (extension, script) stratum"""
+
+    def __init__(self, script: str):
+        self.script = script
+        self.samples = 0
+        self.total_bytes = 0
+        self.total_tokens = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, sample_bytes: int, sample_tokens: int):
+        """Add one observation (a sampled chunk or an exactly counted file)"""
+        if sample_bytes <= 0:
+            return
+        ratio = sample_tokens / sample_bytes
+        self.samples += 1
+        self.total_bytes += sample_bytes
+        self.total_tokens += sample_tokens
+        # Welford update of the ratio variance
+        delta = ratio - self._mean
+        self._mean += delta / self.samples
+        self._m2 += delta * (ratio - self._mean)
+
+    def remove(self, sample_bytes: int, sample_tokens: int):
+        """Take back an observation previously passed to add()"""
+        if sample_bytes <= 0 or self.samples == 0:
+            return
+        if self.samples == 1:
+            self.samples = 0
+            self.total_bytes = 0
+            self.total_tokens = 0
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        ratio = sample_tokens / sample_bytes
+        self.samples -= 1
+        self.total_bytes -= sample_bytes
+        self.total_tokens -= sample_tokens
+        # Welford update run backwards
+        previous_mean = self._mean
+        self._mean = (previous_mean * (self.samples + 1) - ratio) / self.samples
+        self._m2 = max(0.0, self._m2 - (ratio - self._mean) * (ratio - previous_mean))
+
+    @property
+    def ratio(self) -> float:
+        """Tokens per byte (ratio estimator over all observations)"""
+        if self.total_bytes:
+            return self.total_tokens / self.total_bytes
+        return DEFAULT_TOKENS_PER_BYTE.get(self.script, 0.25)
+
+    @property
+    def ratio_stderr(self) -> float:
+        """Standard error of the tokens-per-byte ratio"""
+        if self.samples < 2:
+            # Not enough data for a variance; assume +/-25% relative error
+            return self.ratio * 0.25
+        variance = self._m2 / (self.samples - 1)
+        return math.sqrt(variance / self.samples)
+
+
+class SamplingTokenEstimator:
+    """Estimates token counts for many files from a stratified sample of chunks.
+
+    Files are grouped by (extension, script). A few chunks per group are
+    tokenized to learn a tokens-per-byte ratio, which is applied to the byte
+    size of every file in the group. Exact counts reported through
+    record_exact() replace a file's estimate and sharpen its group's ratio;
+    each file contributes at most one exact observation, which is withdrawn
+    again once the file's size or mtime changes.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        chunk_size: int = 4096,
+        samples_per_stratum: int = 8,
+        sniff_size: int = 1024,
+        z_score: float = 1.96,
+        seed: Optional[int] = None
+    ):
+        self.count_tokens = count_tokens
+        self.chunk_size = chunk_size
+        self.samples_per_stratum = samples_per_stratum
+        self.sniff_size = sniff_size
+        self.z_score = z_score
+        self._random = random.Random(seed)
+
+        self._strata: Dict[Tuple[str, str], StratumStats] = {}
+        self._files: Dict[str, Tuple[Tuple[str, str], int]] = {}
+        # file path -> (stratum key, size, mtime_ns, exact tokens)
+        self._exact: Dict[str, Tuple[Tuple[str, str], int, int, int]] = {}
+
+    def estimate(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Profile and sample the given files, then return the current estimate"""
+        self._files = {}
+        new_by_stratum: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+
+        for file_path in file_paths:
+            profile = self._profile_file(file_path)
+            if profile is None:
+                continue
+            key, size, mtime_ns = profile
+            self._files[file_path] = (key, size)
+            exact = self._exact.get(file_path)
+            if exact and exact[1:3] != (size, mtime_ns):
+                self._forget_exact(file_path)
+                exact = None
+            if exact is None and size > 0:
+                new_by_stratum.setdefault(key, []).append((file_path, size))
+
+        for key, members in new_by_stratum.items():
+            stats = self._strata.setdefault(key, StratumStats(key[1]))
+            needed = self.samples_per_stratum - stats.samples
+            if needed <= 0:
+                continue
+            picks = members if len(members) <= needed else self._random.sample(members, needed)
+            for file_path, size in picks:
+                self._sample_chunk(stats, file_path, size)
+
+        return self.current()
+
+    def record_exact(self, file_path: str, tokens: int) -> Dict[str, Any]:
+        """Record an exact token count for a file and return the refined estimate"""
+        self._forget_exact(file_path)
+        profile = self._profile_file(file_path)
+        if profile is None:
+            return self.current()
+        key, size, mtime_ns = profile
+        self._exact[file_path] = (key, size, mtime_ns, tokens)
+        self._strata.setdefault(key, StratumStats(key[1])).add(size, tokens)
+        if file_path in self._files:
+            self._files[file_path] = (key, size)
+        return self.current()
+
+    def invalidate(self, file_path: str):
+        """Drop a file's exact count, e.g. after it changed on disk"""
+        self._forget_exact(file_path)
+
+    def current(self) -> Dict[str, Any]:
+        """Return the estimate for the last profiled file set without any I/O"""
+        exact_tokens = 0
+        exact_files = 0
+        bytes_by_stratum: Dict[Tuple[str, str], int] = {}
+
+        for file_path, (key, size) in self._files.items():
+            exact = self._exact.get(file_path)
+            if exact is not None:
+                exact_tokens += exact[3]
+                exact_files += 1
+            else:
+                bytes_by_stratum[key] = bytes_by_stratum.get(key, 0) + size
+
+        estimated_tokens = 0.0
+        variance = 0.0
+        strata = {}
+        for key, total_bytes in bytes_by_stratum.items():
+            stats = self._strata.get(key) or StratumStats(key[1])
+            stratum_tokens = total_bytes * stats.ratio
+            estimated_tokens += stratum_tokens
+            variance += (total_bytes * stats.ratio_stderr) ** 2
+            strata[f"{key[0] or '(none)'}:{key[1]}"] = {
+                "bytes": total_bytes,
+                "tokens": int(round(stratum_tokens)),
+                "bytes_per_token": round(1 / stats.ratio, 2) if stats.ratio else None,
+                "samples": stats.samples
+            }
+
+        margin = self.z_score * math.sqrt(variance)
+        total = exact_tokens + estimated_tokens
+        return {
+            "estimated_tokens": int(round(total)),
+            "lower_bound": int(max(exact_tokens, math.floor(total - margin))),
+            "upper_bound": int(math.ceil(total + margin)),
+            "confidence": 0.95 if self.z_score == 1.96 else None,
+            "file_count": len(self._files),
+            "exact_files": exact_files,
+            "exact_tokens": exact_tokens,
+            # Nothing profiled means nothing was counted, which is not exact
+            "is_exact": bool(self._files) and exact_files == len(self._files),
+            "strata": strata
+        }
+
+    def reset(self):
+        """Forget all learned ratios and exact counts"""
+        self._strata.clear()
+        self._files.clear()
+        self._exact.clear()
+
+    def _forget_exact(self, file_path: str):
+        """Remove a file's exact count and withdraw its observation from the stratum"""
+        exact = self._exact.pop(file_path, None)
+        if exact is None:
+            return
+        key, size, _, tokens = exact
+        stats = self._strata.get(key)
+        if stats is not None:
+            stats.remove(size, tokens)
+
+    def _profile_file(self, file_path: str) -> Optional[Tuple[Tuple[str, str], int, int]]:
+        """Return the stratum key, byte size and mtime (ns) for a file"""
+        try:
+            with open(file_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                size = stat.st_size
+                head = f.read(self.sniff_size)
+        except OSError as e:
+            logger.debug(f"Skipping {file_path} in token estimate: {e}")
+            return None
+
+        if b'\x00' in head:
+            return None
+
+        extension = Path(file_path).suffix.lower()
+        script = classify_script(head.decode('utf-8', errors='ignore'))
+        return (extension, script), size, stat.st_mtime_ns
+
+    def _sample_chunk(self, stats: StratumStats, file_path: str, size: int):
+        """Tokenize one random chunk of a file and add it to the stratum"""
+        offset = 0
+        if size > self.chunk_size:
+            offset = self._random.randrange(0, size - self.chunk_size + 1)
+        try:
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                raw = f.read(self.chunk_size)
+        except OSError as e:
+            logger.debug(f"Could not sample {file_path}: {e}")
+            return
+
+        # Partial multi-byte sequences at the chunk edges are dropped
+        text = raw.decode('utf-8', errors='ignore')
+        try:
+            tokens = self.count_tokens(text)
+        except Exception as e:
+            logger.warning(f"Token counting failed while sampling {file_path}: {e}")
+            return
+        stats.add(len(raw), tokens)
@@ -1,10 +1,14 @@
 """Token service organism - manages token calculation operations"""
+import hashlib
 import logging
-from typing import Dict, Any, Optional, Tuple
+import threading
+from typing import Dict, Any, Optional, Tuple, List
 from src.gateway import ServiceLocator, EventBus, Event
 from ..atoms.gpt_tokenizer import GPTTokenizer
 from ..atoms.claude_tokenizer import ClaudeTokenizer
 from ..atoms.gemini_tokenizer import GeminiTokenizer
+from ..molecules.token_estimator import SamplingTokenEstimator
+from ..molecules.remote_token_counter import RemoteTokenCounter
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +21,13 @@ class TokensCalculatedEvent(Event):
         self.token_count = token_count
 
 
+class TokenEstimateUpdatedEvent(Event):
+    """Event emitted when a sampled token estimate is refined by an exact count"""
+    def __init__(self, model: str, estimate: Dict[str, Any]):
+        self.model = model
+        self.estimate = estimate
+
+
 class TokenService:
     """High-level token calculation service"""
     
@@ -32,6 +43,24 @@ class TokenService:
             "by_model": {}
         }
         
+        # Per-file token counts keyed by (tiktoken model, path) -> (content digest, tokens)
+        self._content_token_cache: Dict[Tuple[str, str], Tuple[bytes, int]] = {}
+        self._content_token_lock = threading.Lock()
+        
+        # Sampling estimators, one per tiktoken model
+        self._estimators: Dict[str, SamplingTokenEstimator] = {}
+        
+        # Async remote counting for provider APIs (cached, coalesced, with local fallback)
+        self.claude_remote = RemoteTokenCounter(
+            remote_count=lambda text, model, client: self.claude_tokenizer.count_tokens_async(text, model, client),
+            local_count=lambda text: self.gpt_tokenizer.count_tokens(text, "gpt-4"),
+            session_factory=self.claude_tokenizer.create_async_client
+        )
+        self.gemini_remote = RemoteTokenCounter(
+            remote_count=lambda text, model, _session: self.gemini_tokenizer.count_tokens_async(text, model),
+            local_count=lambda text: self.gpt_tokenizer.count_tokens(text, "gpt-4")
+        )
+        
         # API keys are initialized asynchronously when needed
     
     async def _initialize_api_keys(self):
@@ -78,6 +107,68 @@ class TokenService:
         
         return tokens
     
+    async def calculate_remote_tokens(self, texts: List[str], model: str) -> Dict[str, Any]:
+        """Count tokens with the provider API, using the cache and local fallback"""
+        if model.startswith("claude"):
+            counter, tokenizer = self.claude_remote, self.claude_tokenizer
+        elif model.startswith("gemini"):
+            counter, tokenizer = self.gemini_remote, self.gemini_tokenizer
+        else:
+            counter, tokenizer = None, None
+        
+        if counter is None:
+            # OpenAI models are counted locally with tiktoken
+            tiktoken_model = self._get_tiktoken_model(model)
+            results = [
+                {"tokens": self.gpt_tokenizer.count_tokens(text, tiktoken_model), "source": "local"}
+                for text in texts
+            ]
+        else:
+            if not tokenizer.has_api_key():
+                await self._initialize_api_keys()
+            
+            if tokenizer.has_api_key():
+                results = await counter.count_many(texts, model)
+            else:
+                results = [{"tokens": counter.estimate(text, model), "source": "estimate"} for text in texts]
+        
+        total = sum(r["tokens"] for r in results)
+        EventBus.emit(TokensCalculatedEvent(model=model, token_count=total))
+        self._update_usage_stats(model, total, 0)
+        
+        return {
+            "model": model,
+            "total_tokens": total,
+            "results": results,
+            "cache_stats": counter.stats.copy() if counter else {}
+        }
+    
+    def count_content_tokens(
+        self,
+        file_path: str,
+        content: str,
+        model: str = "gpt-4",
+        content_hash: Optional[str] = None
+    ) -> int:
+        """Token count for a file's content, memoized by content digest.
+        
+        content_hash is the digest recorded by the file reader, when known,
+        so the content does not have to be hashed again.
+        """
+        tiktoken_model = self._get_tiktoken_model(model)
+        digest = content_hash or hashlib.blake2b(content.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+        key = (tiktoken_model, file_path)
+        
+        with self._content_token_lock:
+            cached = self._content_token_cache.get(key)
+        if cached and cached[0] == digest:
+            return cached[1]
+        
+        tokens = self.gpt_tokenizer.count_tokens(content, tiktoken_model)
+        with self._content_token_lock:
+            self._content_token_cache[key] = (digest, tokens)
+        return tokens
+    
     def _get_tiktoken_model(self, model: str) -> str:
         """Map any model to appropriate tiktoken model"""
         # Claude and Gemini models use similar tokenization to GPT-4
@@ -98,7 +189,13 @@ class TokenService:
         include_user_prompt: bool = True,
         model: str = "gpt-4"
     ) -> Dict[str, Any]:
-        """Calculate tokens for complete prompt"""
+        """Calculate tokens for complete prompt.
+        
+        File bodies are counted through count_content_tokens, so counts warmed
+        by the prefetcher (or an earlier call) are reused; only the text
+        around them (prompts, headers, tree, template) is tokenized. Tokens
+        that would merge across a file boundary make the sum approximate.
+        """
         try:
             # Get prompt builder service
             prompt_service = ServiceLocator.get("prompt_builder")
@@ -106,8 +203,8 @@ class TokenService:
                 logger.error("Prompt builder service not available")
                 return {"error": "Service not available", "tokens": 0}
             
-            # Build prompt
-            success, prompt, errors = await prompt_service.build_prompt(
+            # Build the prompt as pieces; file bodies come through unchanged
+            success, parts, errors = await prompt_service.iter_prompt(
                 include_files=include_files,
                 include_attachments=include_attachments,
                 include_system_prompt=include_system_prompt,
@@ -117,23 +214,74 @@ class TokenService:
             if not success:
                 return {"error": f"Failed to build prompt: {errors}", "tokens": 0}
             
-            # Calculate tokens
-            tokens = self.calculate_tokens(prompt, model)
+            files_by_content = {id(f["content"]): f for f in prompt_service.get_file_contents()}
+            file_tokens = 0
+            overhead = []
+            prompt_length = 0
+            for piece in parts:
+                prompt_length += len(piece)
+                file_info = files_by_content.get(id(piece))
+                if file_info is not None and file_info["content"] is piece:
+                    file_tokens += self.count_content_tokens(
+                        file_info["path"], piece, model, content_hash=file_info.get("hash")
+                    )
+                else:
+                    overhead.append(piece)
+            overhead_tokens = self.gpt_tokenizer.count_tokens("".join(overhead), self._get_tiktoken_model(model))
+            tokens = file_tokens + overhead_tokens
+            EventBus.emit(TokensCalculatedEvent(model=model, token_count=tokens))
+            self._update_usage_stats(model, tokens, 0)
             
             # Get breakdown
             components = prompt_service.get_prompt_components()
             
             return {
                 "total_tokens": tokens,
+                "file_tokens": file_tokens,
+                "overhead_tokens": overhead_tokens,
                 "model": model,
                 "components": components,
-                "prompt_length": len(prompt)
+                "prompt_length": prompt_length
             }
             
         except Exception as e:
             logger.error(f"Error calculating prompt tokens: {e}")
             return {"error": str(e), "tokens": 0}
     
+    def calculate_multi_model_report(self, text: str, models: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Token counts and context utilization for several models, one encode per encoding"""
+        limits = self.get_token_limits()
+        models = models or list(limits.keys())
+        
+        # Group models by the tiktoken encoding they map to
+        groups: Dict[str, List[str]] = {}
+        for model in models:
+            encoding_name = self.gpt_tokenizer.get_encoding_name(self._get_tiktoken_model(model))
+            groups.setdefault(encoding_name, []).append(model)
+        
+        report = {}
+        for encoding_name, group in groups.items():
+            tokens = self.gpt_tokenizer.count_tokens(text, self._get_tiktoken_model(group[0]))
+            for model in group:
+                model_limits = limits.get(model) or self.get_model_info(model)["limits"]
+                context = model_limits.get("context", 0)
+                report[model] = {
+                    "tokens": tokens,
+                    "encoding": encoding_name,
+                    "provider": self._get_provider(model),
+                    "context": context,
+                    "utilization": tokens / context if context else None,
+                    "remaining": context - tokens if context else None,
+                    "fits": tokens <= context if context else None
+                }
+        
+        logger.debug(f"Multi-model report: {len(models)} models, {len(groups)} encodings")
+        return {
+            "text_length": len(text),
+            "encodings_used": list(groups.keys()),
+            "models": report
+        }
+    
     def calculate_file_tokens(self, file_path: str, model: str = "gpt-4") -> Dict[str, Any]:
         """Calculate tokens for a file"""
         try:
@@ -146,8 +294,15 @@ class TokenService:
             if not content:
                 return {"error": "Could not read file", "tokens": 0}
             
-            # Calculate tokens
-            tokens = self.calculate_tokens(content, model)
+            # Calculate tokens (reuses counts warmed by the prefetcher)
+            record = file_service.get_file_record(file_path)
+            tokens = self.count_content_tokens(
+                file_path, content, model,
+                content_hash=record.content_hash if record else None
+            )
+            EventBus.emit(TokensCalculatedEvent(model=model, token_count=tokens))
+            self._update_usage_stats(model, tokens, 0)
+            self.refine_token_estimate(file_path, tokens, model)
             
             return {
                 "file": file_path,
@@ -160,6 +315,34 @@ class TokenService:
             logger.error(f"Error calculating file tokens: {e}")
             return {"error": str(e), "tokens": 0}
     
+    def estimate_file_tokens(self, file_paths: List[str], model: str = "gpt-4") -> Dict[str, Any]:
+        """Fast token estimate with a confidence interval for many files"""
+        estimator = self._get_estimator(model)
+        estimate = estimator.estimate(file_paths)
+        estimate["model"] = model
+        return estimate
+    
+    def refine_token_estimate(self, file_path: str, tokens: int, model: str = "gpt-4") -> Optional[Dict[str, Any]]:
+        """Feed an exact file token count into the running estimate"""
+        tiktoken_model = self._get_tiktoken_model(model)
+        estimator = self._estimators.get(tiktoken_model)
+        if not estimator:
+            return None
+        
+        estimate = estimator.record_exact(file_path, tokens)
+        estimate["model"] = model
+        EventBus.emit(TokenEstimateUpdatedEvent(model=model, estimate=estimate))
+        return estimate
+    
+    def _get_estimator(self, model: str) -> SamplingTokenEstimator:
+        """Get or create the sampling estimator for a model's tokenizer"""
+        tiktoken_model = self._get_tiktoken_model(model)
+        if tiktoken_model not in self._estimators:
+            self._estimators[tiktoken_model] = SamplingTokenEstimator(
+                lambda text: self.gpt_tokenizer.count_tokens(text, tiktoken_model)
+            )
+        return self._estimators[tiktoken_model]
+    
     def calculate_multimodal_tokens(
         self,
         text_content: str,
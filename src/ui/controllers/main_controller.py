@@ -3,7 +3,7 @@ import logging
 from typing import Optional, Dict, Any
 from pathlib import Path
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, Qt
-from PyQt6.QtWidgets import QFileDialog, QMessageBox, QApplication
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QApplication, QInputDialog, QMenu
 from ..bridges.fah_bridge import FAHBridge
 
 logger = logging.getLogger(__name__)
@@ -15,10 +15,12 @@ class MainController(QObject):
     # Signals
     project_folder_changed = pyqtSignal(str)
     prompt_built = pyqtSignal(str)
+    prompt_exported = pyqtSignal(dict)
     tokens_calculated = pyqtSignal(dict)
     status_message = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
     file_tree_ready = pyqtSignal(dict)
+    file_selection_changed = pyqtSignal(object, bool)  # paths (None = all files), checked
     
     def __init__(self, main_window):
         super().__init__()
@@ -29,6 +31,13 @@ class MainController(QObject):
         self.bridge.command_completed.connect(self._handle_command_completion)
         self.bridge.command_failed.connect(self._handle_command_failure)
         
+        # Selections made by the file service run on worker threads; the
+        # signal hands them to the UI thread before the proxy is touched
+        from src.gateway import EventBus
+        from src.features.file_management.organisms.file_system_service import FileSelectionChangedEvent
+        EventBus.on(FileSelectionChangedEvent)(self._on_file_selection_changed)
+        self.file_selection_changed.connect(self._apply_file_selection)
+        
         # Initialize application
         self._initialize_app()
     
@@ -160,6 +169,15 @@ class MainController(QObject):
         from src.features.file_management.commands import CheckAllFiles
         self.bridge.execute_command("file_management", CheckAllFiles(checked=checked))
     
+    def _on_file_selection_changed(self, event):
+        """EventBus handler; may run on a command worker thread"""
+        self.file_selection_changed.emit(event.paths, event.checked)
+    
+    @pyqtSlot(object, bool)
+    def _apply_file_selection(self, paths, checked: bool):
+        """Mirror a service-side selection in the file tree, which Build and Export read"""
+        self.main_window.checkable_proxy.apply_selection_change(paths, checked)
+    
     @pyqtSlot(str)
     def update_system_prompt(self, content: str):
         """Update system prompt content"""
@@ -187,7 +205,7 @@ class MainController(QObject):
         
         def _on_tree_generated(result):
             tree_text = result.get("tree", "")
-            checked_files = [p for p in self.main_window.checkable_proxy.get_all_checked_paths() if not Path(p).is_dir()]
+            checked_files = [p for p in self.main_window.checkable_proxy.get_checked_selection() if not Path(p).is_dir()]
             self.bridge.execute_command(
                 "prompt_builder", 
                 BuildPrompt(files_to_include=checked_files, directory_tree=tree_text), 
@@ -205,6 +223,60 @@ class MainController(QObject):
 
         self.bridge.execute_command("file_management", GetProjectFolder(), callback=_on_folder_retrieved)
     
+    @pyqtSlot()
+    def export_prompt(self):
+        """Stream the prompt for checked files to a file instead of the clipboard."""
+        from src.features.prompt_builder.commands import ExportPrompt
+        from src.features.file_management.commands import GetDirectoryTree, GetProjectFolder
+
+        output_dir = QFileDialog.getExistingDirectory(
+            self.main_window,
+            "Select Export Folder",
+            "",
+            QFileDialog.Option.ShowDirsOnly
+        )
+        if not output_dir:
+            return
+        compress = self.main_window.export_gzip_checkbox.isChecked()
+        split_size_mb = self.main_window.export_split_spin.value() or None
+
+        def _on_prompt_exported(result):
+            if result.get("success"):
+                paths = result.get("paths", [])
+                self.prompt_exported.emit(result)
+                self.status_message.emit(
+                    f"Prompt ({result.get('size', 0):,} bytes) exported to {len(paths)} file(s): {paths[0] if paths else ''}"
+                )
+            else:
+                errors = result.get("errors", [])
+                self.error_occurred.emit(f"Failed to export prompt: {', '.join(errors)}")
+
+        def _on_tree_generated(result):
+            tree_text = result.get("tree", "")
+            checked_files = [p for p in self.main_window.checkable_proxy.get_checked_selection() if not Path(p).is_dir()]
+            self.bridge.execute_command(
+                "prompt_builder",
+                ExportPrompt(
+                    output_dir=output_dir,
+                    compress=compress,
+                    split_size_mb=split_size_mb,
+                    files_to_include=checked_files,
+                    directory_tree=tree_text
+                ),
+                callback=_on_prompt_exported
+            )
+
+        def _on_folder_retrieved(result):
+            folder = result.get("path")
+            if folder:
+                self.bridge.execute_command(
+                    "file_management",
+                    GetDirectoryTree(root_path=folder, checked_only=True),
+                    callback=_on_tree_generated
+                )
+
+        self.bridge.execute_command("file_management", GetProjectFolder(), callback=_on_folder_retrieved)
+    
     @pyqtSlot()
     def calculate_prompt_tokens(self):
         """Calculate tokens for the current prompt"""
@@ -215,6 +287,73 @@ class MainController(QObject):
                 self.tokens_calculated.emit(result)
         self.bridge.execute_command("tokens", CalculatePromptTokens(model=model), callback=handle_result)
     
+    def show_file_tree_context_menu(self, pos):
+        """Show the file tree context menu for the file under the cursor"""
+        tree_view = self.main_window.tree_view
+        file_path = self.main_window.checkable_proxy.get_file_path_from_index(tree_view.indexAt(pos))
+        if not file_path or Path(file_path).is_dir():
+            return
+        menu = QMenu(tree_view)
+        menu.addAction("✂️ 줄 범위 선택...", lambda: self.edit_line_ranges(file_path))
+        menu.exec(tree_view.viewport().mapToGlobal(pos))
+    
+    def edit_line_ranges(self, file_path: str):
+        """Ask for the line ranges of a file to include (empty input clears them)"""
+        from src.features.file_management.commands import SetLineRanges
+        from src.ui.models.file_system_models import format_line_ranges, parse_line_ranges
+        
+        proxy = self.main_window.checkable_proxy
+        current = format_line_ranges(proxy.line_ranges_dict.get(file_path, []))
+        text, ok = QInputDialog.getText(
+            self.main_window,
+            "줄 범위 선택",
+            f"{Path(file_path).name}에서 포함할 줄 범위 (예: 1-40, 100-)\n비워 두면 선택이 해제됩니다:",
+            text=current
+        )
+        if not ok:
+            return
+        try:
+            ranges = parse_line_ranges(text)
+        except ValueError as e:
+            self.error_occurred.emit(f"Invalid line ranges: {e}")
+            return
+        
+        def handle_result(result):
+            if result.get("success"):
+                stored = [tuple(r) for r in result.get("ranges", [])]
+                proxy.set_line_ranges(file_path, stored)
+                self.status_message.emit(
+                    f"Line ranges for {Path(file_path).name}: {format_line_ranges(stored) or 'cleared'} "
+                    f"({result.get('line_count', 0)} lines)"
+                )
+            else:
+                self.error_occurred.emit(f"Failed to set line ranges: {result.get('error', '')}")
+        
+        self.bridge.execute_command("file_management", SetLineRanges(file_path=file_path, ranges=ranges), callback=handle_result)
+    
+    @pyqtSlot(str)
+    def filter_file_tree(self, text: str):
+        """Filter the file tree to fuzzy file name matches (empty text shows everything)"""
+        proxy = self.main_window.checkable_proxy
+        query = text.strip()
+        if not query:
+            proxy.set_path_filter(None)
+            return
+        
+        from src.features.file_management.commands import SearchFileNames
+        
+        def handle_result(result):
+            # Drop results for a query the user has already typed past
+            if self.main_window.file_filter_edit.text().strip() != query:
+                return
+            matches = result.get("matches", [])
+            proxy.set_path_filter([m["path"] for m in matches])
+            if matches:
+                self.main_window.tree_view.expandAll()
+            self.status_message.emit(f"File filter '{query}': {len(matches)} matches")
+        
+        self.bridge.execute_command("file_management", SearchFileNames(query=query), callback=handle_result)
+    
     @pyqtSlot()
     def refresh_file_tree(self):
         """Refresh the file tree"""
@@ -9,7 +9,7 @@ from PyQt6.QtWidgets import ( # PyQt5 -> PyQt6
     QStatusBar, QPushButton, QLabel, QCheckBox, QGroupBox,
     QAbstractItemView, QMenuBar, QSplitter, QStyleFactory, QApplication, QMenu,
     QTreeWidget, QTreeWidgetItem, QComboBox, QFileDialog, QInputDialog, QMessageBox,
-    QFrame, QLineEdit, QDialog, QListWidget, QListWidgetItem, QStyle
+    QFrame, QLineEdit, QDialog, QListWidget, QListWidgetItem, QStyle, QDoubleSpinBox
 )
 from PyQt6.QtGui import QKeySequence, QIcon, QCursor, QMouseEvent, QFont, QDesktopServices, QPixmap, QImage, QAction, QKeyEvent # PyQt5 -> PyQt6, QAction, QKeyEvent 추가
 from PyQt6.QtCore import Qt, QSize, QStandardPaths, QModelIndex, QItemSelection, QUrl, QThread, pyqtSignal, QObject, QBuffer, QIODevice, QTimer, QEvent # PyQt5 -> PyQt6, QEvent 추가
@@ -112,6 +112,16 @@ class MainWindow(QMainWindow):
         self.tree_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.tree_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
 
+        # --- 파일 이름 필터 ---
+        self.file_filter_edit = QLineEdit()
+        self.file_filter_edit.setPlaceholderText("🔍 파일 이름 필터 (퍼지 검색)")
+        self.file_filter_edit.setClearButtonEnabled(True)
+        # 입력이 멈춘 뒤에만 검색하도록 디바운스
+        self.file_filter_timer = QTimer(self)
+        self.file_filter_timer.setInterval(150)
+        self.file_filter_timer.setSingleShot(True)
+        self.file_filter_edit.textChanged.connect(lambda _: self.file_filter_timer.start())
+
         self.attachment_group = QGroupBox("첨부 파일")
         attachment_layout = QVBoxLayout(self.attachment_group)
         self.attach_file_btn = QPushButton("📎 파일 첨부")
@@ -147,7 +157,16 @@ class MainWindow(QMainWindow):
         self.copy_btn = QPushButton("📋 클립보드에 복사")
         self.run_dmp_parser_btn = QPushButton("▶️ DMP 패치 적용")
         self.generate_all_btn = QPushButton("⚡️ 한번에 실행")
-        self.run_buttons = [self.generate_tree_btn, self.generate_btn, self.send_to_gemini_btn, self.copy_btn, self.run_dmp_parser_btn, self.generate_all_btn]
+        self.export_btn = QPushButton("💾 파일로 내보내기")
+        self.export_gzip_checkbox = QCheckBox("gzip")
+        # Export part size in MB; 0 writes a single file
+        self.export_split_spin = QDoubleSpinBox()
+        self.export_split_spin.setRange(0, 4096)
+        self.export_split_spin.setDecimals(1)
+        self.export_split_spin.setSuffix(" MB")
+        self.export_split_spin.setSpecialValueText("분할 안 함")
+        self.export_split_spin.setToolTip("내보낼 파일을 이 크기 이하의 여러 파일로 분할합니다")
+        self.run_buttons = [self.generate_tree_btn, self.generate_btn, self.send_to_gemini_btn, self.copy_btn, self.run_dmp_parser_btn, self.generate_all_btn, self.export_btn]
         
         self.llm_combo = QComboBox(); self.llm_combo.addItems(["Gemini", "Claude", "GPT"])
         self.model_name_combo = QComboBox(); self.model_name_combo.setEditable(True)
@@ -208,9 +227,14 @@ class MainWindow(QMainWindow):
 
         # Vertical splitter for tree and attachments
         left_v_splitter = QSplitter(Qt.Orientation.Vertical)
-        left_v_splitter.addWidget(self.tree_view)
+        tree_container = QWidget()
+        tree_layout = QVBoxLayout(tree_container)
+        tree_layout.setContentsMargins(0,0,0,0)
+        tree_layout.addWidget(self.file_filter_edit)
+        tree_layout.addWidget(self.tree_view)
+        left_v_splitter.addWidget(tree_container)
         left_v_splitter.addWidget(self.attachment_group)
-        left_v_splitter.setStretchFactor(0, 1) # tree_view will stretch
+        left_v_splitter.setStretchFactor(0, 1) # tree_view (with its filter box) will stretch
         left_v_splitter.setStretchFactor(1, 0) # attachment_group will not stretch vertically
 
         left_layout.addWidget(left_v_splitter)
@@ -222,6 +246,8 @@ class MainWindow(QMainWindow):
         run_buttons_layout = QHBoxLayout()
         for btn in self.run_buttons:
             run_buttons_layout.addWidget(btn)
+        run_buttons_layout.addWidget(self.export_gzip_checkbox)
+        run_buttons_layout.addWidget(self.export_split_spin)
         right_layout.addLayout(run_buttons_layout)
         right_layout.addWidget(self.build_tabs, 1) # Add stretch factor
         self.center_splitter.addWidget(right_panel)
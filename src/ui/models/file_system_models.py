@@ -3,8 +3,9 @@ import fnmatch
 from PyQt6.QtCore import QSortFilterProxyModel, Qt, QModelIndex, QFileInfo, QAbstractItemModel, pyqtSignal
 from PyQt6.QtGui import QStandardItemModel, QStandardItem, QIcon, QColor, QBrush
 from PyQt6.QtWidgets import QTreeView, QApplication, QStyle
-from typing import Callable, Optional, Set, List, Dict, Any
+from typing import Callable, Optional, Set, List, Dict, Any, Tuple
 from src.features.file_management.molecules.file_tree_builder import FileTreeNode
+from src.features.file_management.atoms.line_index import format_line_range
 from pathlib import Path
 import logging
 
@@ -19,6 +20,7 @@ def dict_to_file_tree_node(node_dict: Dict[str, Any]) -> FileTreeNode:
     path = Path(node_dict['path'])
     node = FileTreeNode(path, node_dict['is_dir'])
     node.checked = node_dict.get('checked', False)
+    node.line_ranges = [tuple(r) for r in node_dict.get('line_ranges', [])]
     
     for child_dict in node_dict.get('children', []):
         child_node = dict_to_file_tree_node(child_dict)
@@ -26,6 +28,26 @@ def dict_to_file_tree_node(node_dict: Dict[str, Any]) -> FileTreeNode:
         
     return node
 
+def format_line_ranges(ranges: List[Tuple[int, Optional[int]]]) -> str:
+    """Formats line ranges for display, e.g. "1-40, 100-"."""
+    return ", ".join(f"{first}-{last if last is not None else ''}" for first, last in ranges)
+
+
+def parse_line_ranges(text: str) -> List[Tuple[int, Optional[int]]]:
+    """Parses "1-40, 100-, 120" into [(1, 40), (100, None), (120, 120)]; raises ValueError."""
+    ranges = []
+    for part in text.replace(';', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        first_line = int(first)
+        last_line = (int(last) if last.strip() else None) if sep else first_line
+        if first_line < 1 or (last_line is not None and last_line < first_line):
+            raise ValueError(f"Invalid line range: {part}")
+        ranges.append((first_line, last_line))
+    return ranges
+
 # --- Cached File System Model (using QStandardItemModel) ---
 class CachedFileSystemModel(QStandardItemModel):
     """
@@ -119,14 +141,43 @@ class CheckableProxyModel(QSortFilterProxyModel):
         self.tree_view = tree_view
         self.checked_files_dict: Dict[str, bool] = {} # {file_path: bool} - Stores the check state
         self._is_setting_data = False
+        self._visible_paths: Optional[Set[str]] = None # None means no filter is active
+        self.line_ranges_dict: Dict[str, List[Tuple[int, Optional[int]]]] = {} # {file_path: [(first, last)]} - Partial selections
+
+    def set_path_filter(self, paths: Optional[List[str]]):
+        """
+        Shows only the given file paths and the folders leading to them.
+        Passing None removes the filter. Only the proxy is re-filtered;
+        the source model is left untouched.
+        """
+        if paths is None:
+            self._visible_paths = None
+        else:
+            visible: Set[str] = set()
+            for path in paths:
+                current = Path(path)
+                while str(current) not in visible:
+                    visible.add(str(current))
+                    if current.parent == current:
+                        break
+                    current = current.parent
+            self._visible_paths = visible
+        self.invalidateFilter()
+
+    def is_path_filter_active(self) -> bool:
+        """Whether a path filter is currently applied."""
+        return self._visible_paths is not None
 
     def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
         """
-        Determines if a row should be shown. In the new FAH architecture,
-        the file list is pre-filtered by the FileSystemService, so this
-        proxy model no longer needs to perform filtering. It just accepts all rows.
+        Determines if a row should be shown. The file list is pre-filtered by
+        the FileSystemService, so all rows are accepted unless a path filter
+        (from the file name filter box) is active.
         """
-        return True
+        if self._visible_paths is None:
+            return True
+        source_index = self.sourceModel().index(source_row, 0, source_parent)
+        return source_index.data(PATH_ROLE) in self._visible_paths
 
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
         """
@@ -138,10 +189,18 @@ class CheckableProxyModel(QSortFilterProxyModel):
         if index.column() == 0 and role == Qt.ItemDataRole.CheckStateRole:
             file_path = self.mapToSource(index).data(PATH_ROLE)
             if file_path:
-                is_checked = self.checked_files_dict.get(file_path, False)
-                return Qt.CheckState.Checked if is_checked else Qt.CheckState.Unchecked
+                if self.checked_files_dict.get(file_path, False):
+                    return Qt.CheckState.Checked
+                if file_path in self.line_ranges_dict:
+                    return Qt.CheckState.PartiallyChecked
             return Qt.CheckState.Unchecked
 
+        if index.column() == 0 and role == Qt.ItemDataRole.DisplayRole:
+            file_path = self.mapToSource(index).data(PATH_ROLE)
+            ranges = self.line_ranges_dict.get(file_path) if file_path else None
+            if ranges:
+                return f"{super().data(index, role)} [{format_line_ranges(ranges)}]"
+
         return super().data(index, role)
 
     def flags(self, index: QModelIndex) -> Qt.ItemFlag:
@@ -263,6 +322,39 @@ class CheckableProxyModel(QSortFilterProxyModel):
         """Returns a list of all paths currently marked as checked in the dictionary."""
         return [path for path, checked in self.checked_files_dict.items() if checked]
 
+    def get_checked_selection(self) -> List[str]:
+        """
+        Returns the checked paths plus "path:first-last" specs for files that
+        only have line ranges selected (a fully checked file needs no ranges).
+        """
+        selection = self.get_all_checked_paths()
+        for path, ranges in self.line_ranges_dict.items():
+            if not self.checked_files_dict.get(path, False):
+                selection.extend(format_line_range(path, first, last) for first, last in ranges)
+        return selection
+
+    def set_line_ranges(self, path: str, ranges: List[Tuple[int, Optional[int]]]):
+        """Sets (or, with an empty list, clears) the line ranges shown for a file."""
+        if ranges:
+            self.line_ranges_dict[path] = list(ranges)
+        else:
+            self.line_ranges_dict.pop(path, None)
+        source_item = self.sourceModel().find_item_by_path(path)
+        if source_item:
+            proxy_index = self.mapFromSource(self.sourceModel().indexFromItem(source_item))
+            if proxy_index.isValid():
+                self.dataChanged.emit(proxy_index, proxy_index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.CheckStateRole])
+
+    def load_line_ranges(self, root_node: Optional[FileTreeNode]):
+        """Replaces the line ranges with those stored on a (rebuilt) file tree."""
+        self.line_ranges_dict = {}
+        stack = [root_node] if root_node else []
+        while stack:
+            node = stack.pop()
+            if node.line_ranges:
+                self.line_ranges_dict[str(node.path)] = list(node.line_ranges)
+            stack.extend(node.children)
+
     def get_checked_files(self) -> List[str]:
         """
         Returns a list of checked paths that correspond to actual files.
@@ -291,6 +383,35 @@ class CheckableProxyModel(QSortFilterProxyModel):
         self.endResetModel()
         logger.debug("Finished updating visual check states.")
 
+    def apply_selection_change(self, paths: Optional[List[str]], checked: bool):
+        """
+        Mirrors a bulk selection made by the file service (pattern selection,
+        relevance ranking, content search, import expansion, check all).
+        paths=None stands for every file. Only the dictionaries change, so
+        the view is repainted rather than reset and keeps its expansion state.
+        """
+        if paths is None:
+            if checked:
+                root = self.sourceModel().invisibleRootItem()
+                stack = [root.child(row, 0) for row in range(root.rowCount())]
+                while stack:
+                    item = stack.pop()
+                    if not item: continue
+                    path = item.data(PATH_ROLE)
+                    if path:
+                        self.checked_files_dict[path] = True
+                    stack.extend(item.child(row, 0) for row in range(item.rowCount()))
+            else:
+                self.checked_files_dict.clear()
+                self.line_ranges_dict.clear()
+        elif checked:
+            for path in paths:
+                self.checked_files_dict[path] = True
+        else:
+            for path in paths:
+                self.checked_files_dict.pop(path, None)
+        self.tree_view.viewport().update()
+
     def set_check_state_for_path(self, path: str, checked: bool):
         """Externally set the check state for a path and its children."""
         source_item = self.sourceModel().find_item_by_path(path)
@@ -0,0 +1,32 @@
+"""Tests for the content matcher atom"""
+import re
+import string
+
+from src.features.file_management.atoms import content_matcher
+from src.features.file_management.atoms.content_matcher import search_files
+
+
+def test_non_ascii_fold_letters_are_complete():
+    folding = {
+        char for char in string.ascii_letters
+        if any(re.fullmatch(re.escape(char), chr(code), re.IGNORECASE) for code in range(128, 0x3000))
+        or re.fullmatch(re.escape(char), "K", re.IGNORECASE)
+    }
+    assert folding == set(content_matcher._NON_ASCII_FOLDS)
+
+
+def test_case_insensitive_literal_matches_after_unicode_folding(tmp_path):
+    path = tmp_path / "units.txt"
+    path.write_text("temperature: 300 K\n", encoding="utf-8")
+
+    results = search_files([str(path)], "300 k", case_sensitive=False)
+
+    assert [(p, [h["line"] for h in hits]) for p, hits, _ in results] == [(str(path), [1])]
+
+
+def test_prefilter_still_skips_files_without_the_literal(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("nothing here\n")
+
+    assert search_files([str(path)], "needle", case_sensitive=False) == []
+    assert search_files([str(path)], "here", case_sensitive=False)[0][1][0]["column"] == 9
@@ -0,0 +1,32 @@
+"""Tests for the dedup stage molecule"""
+from src.features.prompt_builder.molecules.dedup_stage import DedupStage
+
+
+def _near_copies(count):
+    base = [f"value_{n} = compute({n}, {n * 7})" for n in range(200)]
+    files = []
+    for copy in range(count):
+        lines = list(base)
+        lines[copy % len(lines)] = f"value_{copy} = override({copy})"
+        files.append({"path": f"gen/copy_{copy:03d}.py", "content": "\n".join(lines)})
+    return files
+
+
+def test_more_near_copies_than_the_bucket_cap_are_all_collapsed():
+    stage = DedupStage(max_bucket=64)
+    files = _near_copies(150)
+
+    result, report = stage.collapse_near_duplicates(files, threshold=0.9)
+
+    collapsed = [f for f in result if f.get("mode") == "near-duplicate"]
+    assert len(collapsed) == 149
+    assert result[0] is files[0]
+    assert all(entry["similarity"] >= 0.9 for entry in report)
+
+
+def test_distinct_files_are_not_paired():
+    files = [
+        {"path": f"f{i}.py", "content": "\n".join(f"line {i}-{n}" for n in range(50))}
+        for i in range(10)
+    ]
+    assert DedupStage().find_near_duplicates(files, threshold=0.5) == []
@@ -0,0 +1,54 @@
+"""Tests for the file system service organism"""
+import os
+
+from src.features.file_management.organisms.file_system_service import FileSystemService
+
+
+def test_build_reads_see_writes_before_the_watcher_event(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("old = 1\n")
+    service = FileSystemService()
+    service.watcher.covers = lambda p: True  # Watched, but the change event has not arrived yet
+    assert service.get_file_content(str(path)) == "old = 1\n"
+
+    path.write_text("new = 22\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert service.get_file_content(str(path)) == "new = 22\n"
+    assert service.get_file_content(str(path), trusted=True) == "new = 22\n"
+
+
+def test_bulk_selections_emit_selection_changed_events(tmp_path):
+    from src.gateway import EventBus
+    from src.features.file_management.organisms.file_system_service import FileSelectionChangedEvent
+
+    received = []
+    handler = EventBus.on(FileSelectionChangedEvent)(lambda event: received.append((event.paths, event.checked)))
+    try:
+        service = FileSystemService()
+        path = str(tmp_path / "a.py")
+        service.check_files([path], True)
+        service.check_all_files(False)
+    finally:
+        EventBus._subs[FileSelectionChangedEvent].remove(handler)
+
+    assert received == [([path], True), (None, False)]
+
+
+def test_large_files_are_read_in_full_unless_excerpting_is_enabled(tmp_path):
+    import asyncio
+
+    path = tmp_path / "big.txt"
+    path.write_text("line\n" * 50_000)
+    service = FileSystemService()
+
+    files = asyncio.run(service.read_files([str(path)]))["files"]
+    assert files[0]["content"] == path.read_text()
+    assert files[0]["is_excerpt"] is False
+
+    service.max_content_bytes = 64 * 1024
+    service.content_cache.clear()
+    files = asyncio.run(service.read_files([str(path)]))["files"]
+    assert files[0]["is_excerpt"] is True
+    assert len(files[0]["content"]) < path.stat().st_size
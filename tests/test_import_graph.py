@@ -0,0 +1,68 @@
+"""Tests for the import graph molecule"""
+import asyncio
+import os
+
+from src.features.file_management.molecules.import_graph import ImportGraph
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _all_files(root):
+    return lambda: [os.path.join(d, f) for d, _, files in os.walk(root) for f in files]
+
+
+def test_directory_event_keeps_modules(tmp_path):
+    _write(tmp_path / "pkg" / "__init__.py", "")
+    _write(tmp_path / "pkg" / "a.py", "from . import b\n")
+    _write(tmp_path / "pkg" / "b.py", "import pkg.c\n")
+    _write(tmp_path / "pkg" / "c.py", "x = 1\n")
+    graph = ImportGraph()
+    graph.reset(tmp_path)
+    all_files = _all_files(tmp_path)
+    asyncio.run(graph.refresh(all_files))
+    before = graph.get_stats()
+
+    graph.mark_dirty(str(tmp_path / "pkg"))
+    asyncio.run(graph.refresh(all_files))
+
+    assert graph.get_stats()["modules"] == before["modules"]
+    assert graph.get_stats()["edges"] == before["edges"]
+    added = {entry["path"] for entry in graph.expand([str(tmp_path / "pkg" / "a.py")])}
+    assert str(tmp_path / "pkg" / "c.py") in added
+
+
+def test_directory_event_picks_up_new_and_removed_files(tmp_path):
+    _write(tmp_path / "pkg" / "__init__.py", "")
+    _write(tmp_path / "pkg" / "a.py", "x = 1\n")
+    _write(tmp_path / "pkg" / "old.py", "import pkg.a\n")
+    graph = ImportGraph()
+    graph.reset(tmp_path)
+    all_files = _all_files(tmp_path)
+    asyncio.run(graph.refresh(all_files))
+
+    _write(tmp_path / "pkg" / "new.py", "import pkg.a\n")
+    (tmp_path / "pkg" / "old.py").unlink()
+    graph.mark_dirty(str(tmp_path / "pkg"))
+    asyncio.run(graph.refresh(all_files))
+
+    importers = {e["path"] for e in graph.expand([str(tmp_path / "pkg" / "a.py")], direction="importers")}
+    assert importers == {str(tmp_path / "pkg" / "new.py")}
+
+
+def test_deleted_directory_is_dropped(tmp_path):
+    _write(tmp_path / "pkg" / "a.py", "x = 1\n")
+    graph = ImportGraph()
+    graph.reset(tmp_path)
+    all_files = _all_files(tmp_path)
+    asyncio.run(graph.refresh(all_files))
+
+    for child in (tmp_path / "pkg").iterdir():
+        child.unlink()
+    (tmp_path / "pkg").rmdir()
+    graph.mark_dirty(str(tmp_path / "pkg"))
+    asyncio.run(graph.refresh(all_files))
+
+    assert graph.get_stats()["modules"] == 0
@@ -0,0 +1,69 @@
+"""Tests for prompt previews in the prompt service organism"""
+import asyncio
+
+import pytest
+
+from src.gateway import ServiceLocator
+from src.features.file_management.organisms.file_system_service import FileSystemService
+from src.features.prompt_builder.organisms.prompt_service import PromptService
+
+
+@pytest.fixture
+def services(tmp_path):
+    ServiceLocator.reset()
+    file_service = FileSystemService()
+    prompt_service = PromptService()
+    ServiceLocator.provide("file_system", file_service)
+    ServiceLocator.provide("prompt_builder", prompt_service)
+    prompt_service.set_user_prompt("Explain")
+    yield tmp_path, file_service, prompt_service
+    ServiceLocator.reset()
+
+
+def _select(file_service, *paths):
+    file_service.check_files([str(p) for p in paths], True)
+
+
+def test_preview_shows_the_selected_files(services):
+    tmp_path, file_service, prompt_service = services
+    small = tmp_path / "small.py"
+    small.write_text("a = 1\n")
+    _select(file_service, small)
+
+    preview = asyncio.run(prompt_service.get_prompt_preview(5000))
+
+    assert "a = 1" in preview
+    assert not preview.startswith("Error")
+
+
+def test_preview_reports_an_oversized_file_like_a_build(services):
+    tmp_path, file_service, prompt_service = services
+    big = tmp_path / "big.py"
+    big.write_text("x" * (prompt_service.validator.max_file_size + 1))
+    _select(file_service, big)
+
+    preview = asyncio.run(prompt_service.get_prompt_preview(100))
+    success, _, errors = asyncio.run(prompt_service.build_prompt(files_to_include=[str(big)]))
+
+    assert not success
+    assert preview == f"Error building prompt: {', '.join(errors)}"
+
+
+def test_multibyte_file_under_the_character_limit_is_not_rejected(services):
+    tmp_path, file_service, prompt_service = services
+    korean = tmp_path / "ko.txt"
+    korean.write_text("가" * (prompt_service.validator.max_file_size // 2), encoding="utf-8")
+    _select(file_service, korean)
+
+    preview = asyncio.run(prompt_service.get_prompt_preview(100))
+
+    assert not preview.startswith("Error")
+
+
+def test_preview_reports_an_invalid_system_prompt(services):
+    _, _, prompt_service = services
+    prompt_service.system_prompt = "Use {{CONTENT here"
+
+    preview = asyncio.run(prompt_service.get_prompt_preview(100))
+
+    assert preview.startswith("Error building prompt: Unmatched template variables")
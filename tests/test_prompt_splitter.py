@@ -0,0 +1,41 @@
+"""Tests for the prompt splitter molecule"""
+from src.features.file_management.molecules.line_slice_reader import LineSliceReader
+from src.features.prompt_builder.molecules.prompt_splitter import PromptSplitter
+
+
+def _big_content():
+    # "\r", "\x0c" and "\u2028" break lines for str.splitlines but not in path:first-last specs
+    return "".join(
+        f"line {i} = {'x' * (i % 37)}\r\n" if i % 5 else f"page {i}\x0cbreak\u2028here\n"
+        for i in range(2000)
+    )
+
+
+def test_line_range_chunks_reassemble_an_oversized_file():
+    content = _big_content()
+    files = [{"path": "small.py", "content": "a = 1\n"}, {"path": "big.py", "content": content}]
+    splitter = PromptSplitter("\n---\n")
+
+    plan = splitter.plan(files, [3, len(content) // 4], part_budget=2000)
+    chunks = [f for part in plan for f in splitter.iter_part_files(files, part)]
+
+    big = [f for f in chunks if f["path"].startswith("big.py:")]
+    assert len(big) > 1
+    assert "".join(f["content"] for f in big) == content
+
+
+def test_chunk_labels_match_slices_read_back_from_disk(tmp_path):
+    content = _big_content()
+    path = tmp_path / "big.txt"
+    path.write_bytes(content.encode("utf-8"))
+    files = [{"path": str(path), "content": content}]
+    splitter = PromptSplitter("\n---\n")
+    reader = LineSliceReader()
+
+    plan = splitter.plan(files, [len(content) // 4], part_budget=2000)
+
+    for part in plan:
+        for chunk in splitter.iter_part_files(files, part):
+            first, last = map(int, chunk["path"].rsplit(":", 1)[1].split("-"))
+            sliced, _ = reader.read_slice(str(path), first, last)
+            assert sliced == chunk["content"]
@@ -0,0 +1,21 @@
+"""Tests for the prompt validator molecule"""
+import pytest
+
+from src.features.prompt_builder.molecules.prompt_validator import PromptValidator
+
+
+@pytest.mark.parametrize("prompt", [
+    "Use {{CONTENT}} here",
+    "{{}}",
+    "{{ a {b} }}",
+    "Hello {{ user.name }}, see {{CONTENT}}",
+    "{% for x in xs %}{{ x }}{% endfor %}",
+])
+def test_balanced_markers_are_accepted(prompt):
+    assert PromptValidator().validate_system_prompt(prompt) == (True, None)
+
+
+def test_unbalanced_markers_are_rejected():
+    valid, error = PromptValidator().validate_system_prompt("Use {{CONTENT here")
+    assert not valid
+    assert "Unmatched" in error
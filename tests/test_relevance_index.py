@@ -0,0 +1,36 @@
+"""Tests for the relevance index molecule"""
+import threading
+
+from src.features.file_management.molecules import relevance_index as module
+from src.features.file_management.molecules.relevance_index import RelevanceIndex
+
+
+def test_search_is_not_blocked_while_a_file_is_tokenized(monkeypatch):
+    index = RelevanceIndex(load_fn=lambda path: "alpha beta gamma")
+    index._update("/p/first.py")
+
+    tokenizing = threading.Event()
+    release = threading.Event()
+    real_term_frequencies = module.term_frequencies
+
+    def slow_term_frequencies(*args):
+        tokenizing.set()
+        release.wait(5)
+        return real_term_frequencies(*args)
+
+    monkeypatch.setattr(module, "term_frequencies", slow_term_frequencies)
+    worker = threading.Thread(target=index._update, args=("/p/second.py",))
+    worker.start()
+    try:
+        assert tokenizing.wait(5)
+        results = []
+        searcher = threading.Thread(target=lambda: results.append(index.search("alpha")))
+        searcher.start()
+        searcher.join(1)
+        assert not searcher.is_alive()
+        assert [path for path, _ in results[0]] == ["/p/first.py"]
+    finally:
+        release.set()
+        worker.join()
+
+    assert {path for path, _ in index.search("alpha")} == {"/p/first.py", "/p/second.py"}
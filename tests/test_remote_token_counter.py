@@ -0,0 +1,141 @@
+"""Tests for the remote token counter molecule against a local stub HTTP server"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.features.tokens.atoms.claude_tokenizer import ClaudeTokenizer
+from src.features.tokens.molecules.remote_token_counter import RemoteTokenCounter
+
+
+class _StubState:
+    def __init__(self):
+        self.delay = 0.0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def _make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with state.lock:
+                state.requests += 1
+            time.sleep(state.delay)
+            payload = json.dumps({"token_count": len(body["text"].split()) * 2}).encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            except OSError:
+                pass  # The client gave up (timeout or cancellation)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1,localhost")
+    state = _StubState()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}/v1/tokenize"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _counter(state, timeout=2.0, cooldown=30.0):
+    tokenizer = ClaudeTokenizer()
+    tokenizer.api_endpoint = state.url
+    tokenizer.set_api_key("test-key")
+    return RemoteTokenCounter(
+        remote_count=tokenizer.count_tokens_async,
+        local_count=lambda text: len(text.split()),
+        session_factory=tokenizer.create_async_client,
+        timeout=timeout,
+        cooldown=cooldown
+    )
+
+
+def test_identical_texts_share_one_remote_call(stub_server):
+    stub_server.delay = 0.2
+    counter = _counter(stub_server)
+
+    results = asyncio.run(counter.count_many(["one two three"] * 5, "claude-3"))
+
+    assert [r["tokens"] for r in results] == [6] * 5
+    assert {r["source"] for r in results} == {"remote"}
+    assert stub_server.requests == 1
+    assert counter.stats["coalesced"] == 4
+
+
+def test_repeated_text_is_served_from_cache(stub_server):
+    counter = _counter(stub_server)
+    asyncio.run(counter.count("alpha beta", "claude-3"))
+
+    result = asyncio.run(counter.count("alpha beta", "claude-3"))
+
+    assert result == {"tokens": 4, "source": "cache"}
+    assert stub_server.requests == 1
+
+
+def test_timeout_falls_back_to_estimate_and_starts_cooldown(stub_server):
+    stub_server.delay = 0.5
+    counter = _counter(stub_server, timeout=0.1)
+
+    result = asyncio.run(counter.count("a b c", "claude-3"))
+    assert result == {"tokens": 3, "source": "estimate"}
+    assert stub_server.requests == 1
+
+    # During the cooldown the remote API is not called at all
+    result = asyncio.run(counter.count("d e f g", "claude-3"))
+    assert result == {"tokens": 4, "source": "estimate"}
+    assert stub_server.requests == 1
+
+
+def test_estimate_uses_calibration_from_remote_results(stub_server):
+    counter = _counter(stub_server)
+    asyncio.run(counter.count("one two three four", "claude-3"))  # remote 8, local 4
+
+    assert counter.estimate("x y z", "claude-3") == 6
+
+
+def test_local_count_is_computed_once_per_text(stub_server):
+    counter = _counter(stub_server)
+    calls = []
+    local_count = counter.local_count
+    counter.local_count = lambda text: calls.append(text) or local_count(text)
+
+    asyncio.run(counter.count("one two three four", "claude-3"))
+    assert counter.estimate("one two three four", "claude-3") == 8
+
+    assert calls == ["one two three four"]
+
+
+def test_cancelled_leader_hands_followers_the_estimate(stub_server):
+    stub_server.delay = 0.3
+    counter = _counter(stub_server)
+
+    async def scenario():
+        leader = asyncio.create_task(counter.count("w x y z", "claude-3"))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(counter.count("w x y z", "claude-3"))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    result = asyncio.run(scenario())
+    assert result == {"tokens": 4, "source": "estimate"}
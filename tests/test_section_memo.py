@@ -0,0 +1,42 @@
+"""Tests for the section memo molecule"""
+import random
+
+from src.features.prompt_builder.atoms.prompt_formatter import PromptFormatter
+from src.features.prompt_builder.molecules.section_memo import SectionMemo
+
+
+def _expected(formatter, files):
+    return formatter.file_separator.join(
+        formatter.format_file_content(f["path"], f["content"]) for f in files
+    )
+
+
+def test_spliced_sections_match_a_full_join():
+    rng = random.Random(7)
+    formatter = PromptFormatter()
+    memo = SectionMemo()
+    files = [{"path": f"f{i}.py", "content": f"body {i}\n"} for i in range(20)]
+
+    for _ in range(300):
+        action = rng.choice(["edit", "insert", "remove", "same"])
+        if action == "edit" and files:
+            i = rng.randrange(len(files))
+            files[i] = {"path": files[i]["path"], "content": files[i]["content"] + "x"}
+        elif action == "insert":
+            files.insert(rng.randrange(len(files) + 1), {"path": f"n{rng.random()}.py", "content": "new\n"})
+        elif action == "remove" and files:
+            files.pop(rng.randrange(len(files)))
+        files = list(files)
+        assert memo.render_file_section(formatter, files) == _expected(formatter, files)
+
+
+def test_unchanged_blocks_are_not_formatted_again():
+    formatter = PromptFormatter()
+    memo = SectionMemo()
+    files = [{"path": f"f{i}.py", "content": f"body {i}\n"} for i in range(10)]
+    memo.render_file_section(formatter, files)
+
+    files[4] = {"path": "f4.py", "content": "changed\n"}
+    memo.render_file_section(formatter, files)
+
+    assert memo.get_stats()["misses"] == 11
@@ -0,0 +1,39 @@
+"""Regression tests for the source minifier atom"""
+import ast
+
+import pytest
+
+from src.features.prompt_builder.atoms.source_minifier import minify_source
+
+PYTHON_SAMPLES = [
+    'x = """abc   \n  def"""\n',
+    "def f():\n    # comment\n    s = '''first  \t\n    second   \n'''  # trailing\n    return s\n",
+    'y = f"""{1 + 1}   \n   end"""\n\n\nz = 1   \n',
+    "s = 'one \\\n   two'\n",
+    'class A:\n\n    doc = """\n    indented   \n    """\n    def m(self):\n        return b"""x  \n"""\n',
+]
+
+
+@pytest.mark.parametrize("source", PYTHON_SAMPLES)
+def test_python_minify_preserves_ast(source):
+    minified = minify_source(source, 'python')
+    assert ast.dump(ast.parse(minified)) == ast.dump(ast.parse(source))
+
+
+def test_python_minify_strips_comments_and_blank_lines():
+    minified = minify_source("def f():\n\n    # note\n    return 1  # one\n", 'python')
+    assert minified == "def f():\n return 1\n"
+
+
+def test_javascript_template_literal_keeps_trailing_whitespace():
+    source = "const t = `head   \n  body  `;   \n// gone\nconst u = 1;\n"
+    minified = minify_source(source, 'javascript')
+    assert "`head   \n  body  `" in minified
+    assert "gone" not in minified
+    assert minified.endswith("const u = 1;\n")
+
+
+def test_java_text_block_keeps_trailing_whitespace():
+    source = 'String s = """   \n    text   \n    """;   \n'
+    minified = minify_source(source, 'java')
+    assert minified.startswith('String s = """   \n    text   \n    """;')
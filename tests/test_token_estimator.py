@@ -0,0 +1,65 @@
+"""Tests for the sampling token estimator molecule"""
+import os
+
+from src.features.tokens.molecules.token_estimator import SamplingTokenEstimator, StratumStats
+
+
+def _estimator():
+    return SamplingTokenEstimator(lambda text: len(text.split()), seed=0)
+
+
+def test_remove_undoes_add():
+    stats = StratumStats("latin")
+    for size, tokens in [(100, 25), (200, 60), (50, 10)]:
+        stats.add(size, tokens)
+    expected = (stats.samples, stats.total_bytes, stats.total_tokens, stats.ratio_stderr)
+
+    stats.add(400, 300)
+    stats.remove(400, 300)
+
+    assert (stats.samples, stats.total_bytes, stats.total_tokens) == expected[:3]
+    assert abs(stats.ratio_stderr - expected[3]) < 1e-12
+
+
+def test_repeated_exact_counts_keep_one_observation_per_file(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("one two three four\n" * 50)
+    estimator = _estimator()
+    estimator.estimate([str(path)])
+
+    estimator.record_exact(str(path), 200)
+    stats = estimator._strata[(".py", "latin")]
+    samples = stats.samples
+    for _ in range(5):
+        estimator.record_exact(str(path), 200)
+
+    assert stats.samples == samples
+    assert estimator.current()["exact_tokens"] == 200
+
+
+def test_changed_file_drops_its_exact_count(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("one two three four\n" * 50)
+    estimator = _estimator()
+    estimator.estimate([str(path)])
+    estimator.record_exact(str(path), 200)
+
+    path.write_text("one two\n" * 80)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    estimate = estimator.estimate([str(path)])
+
+    assert estimate["exact_files"] == 0
+    assert not estimate["is_exact"]
+
+
+def test_empty_or_unreadable_file_sets_are_not_exact(tmp_path):
+    binary = tmp_path / "blob.bin"
+    binary.write_bytes(b"\x00\x01\x02")
+    estimator = _estimator()
+
+    for paths in ([], [str(tmp_path / "missing.py"), str(binary)]):
+        estimate = estimator.estimate(paths)
+        assert estimate["is_exact"] is False
+        assert estimate["estimated_tokens"] == estimate["lower_bound"] == estimate["upper_bound"] == 0
+        assert estimate["file_count"] == 0